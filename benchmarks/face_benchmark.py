@@ -0,0 +1,106 @@
+"""
+Throughput and accuracy of the Haar cascade against the batched DNN face engine.
+
+    python benchmarks/face_benchmark.py --faces-dir thumbs/faces --faceless-dir thumbs/faceless
+
+Images under --faces-dir are labelled as containing a face and those under --faceless-dir
+as faceless. Without --faceless-dir, the mock API's synthetic text cards are used. Every
+image is resized to the 480x360 'high' thumbnail frame and every engine scans every image
+(no result cache or pre-filter), so both see exactly the same pixels.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_images(directory: str, limit: int):
+    import cv2
+
+    names = sorted(name for name in os.listdir(directory) if name.lower().endswith(('.jpg', '.jpeg', '.png')))
+    images = []
+    for name in names[:limit]:
+        image = cv2.imread(os.path.join(directory, name), cv2.IMREAD_COLOR)
+        if image is not None:
+            images.append(cv2.resize(image, (480, 360)))
+    return images
+
+
+def synthetic_cards(count: int):
+    import cv2
+    import numpy as np
+    from mock_youtube_api import MockYouTubeAPI
+
+    api = MockYouTubeAPI({'videos': [], 'channels': []})
+    try:
+        return [cv2.imdecode(np.frombuffer(api.thumbnail(f'card{i:06d}', 'high'), dtype=np.uint8), cv2.IMREAD_COLOR)
+                for i in range(count)]
+    finally:
+        api.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the Haar and DNN face detection engines')
+    parser.add_argument('--faces-dir', required=True, help='Thumbnails that contain a face')
+    parser.add_argument('--faceless-dir', help='Thumbnails without a face (default: synthetic text cards)')
+    parser.add_argument('--limit', type=int, default=500, help='Images per label')
+    parser.add_argument('--engines', nargs='+', default=['haar', 'dnn'], choices=['haar', 'dnn'])
+    parser.add_argument('--threshold', type=float, default=None, help='Face confidence threshold')
+    parser.add_argument('--runs', type=int, default=3, help='Timed runs per engine; the best is reported')
+    args = parser.parse_args()
+
+    from config import Config
+    from face_detector import FaceDetector, FaceModelError
+
+    logging.getLogger().setLevel(logging.WARNING)
+    threshold = args.threshold if args.threshold is not None else Config.DEFAULT_PARAMS['face_detection_threshold']
+
+    faces = load_images(args.faces_dir, args.limit)
+    faceless = load_images(args.faceless_dir, args.limit) if args.faceless_dir else synthetic_cards(args.limit)
+    images = faces + faceless
+    labels = [True] * len(faces) + [False] * len(faceless)
+
+    for engine in args.engines:
+        try:
+            detector = FaceDetector(use_cache=False, engine=engine)
+        except FaceModelError as e:
+            print(json.dumps({'engine': engine, 'error': str(e)}))
+            continue
+
+        # Warm-up starts the workers and loads their models outside the timed runs
+        detector.detect_faces_in_images(images[:Config.DNN_BATCH_SIZE])
+
+        best = None
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            results = detector.detect_faces_in_images(images)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+
+        predicted = [detector.counts_as_face(result, threshold) for result in results]
+        true_positives = sum(1 for p, label in zip(predicted, labels) if p and label)
+        false_positives = sum(1 for p, label in zip(predicted, labels) if p and not label)
+        false_negatives = sum(1 for p, label in zip(predicted, labels) if not p and label)
+
+        print(json.dumps({
+            'engine': engine,
+            'images': len(images),
+            'faces': len(faces),
+            'threshold': Config.DNN_MIN_SCORE if engine == 'dnn' else threshold,
+            'seconds': round(best, 3),
+            'images_per_sec': round(len(images) / best, 1) if best else 0.0,
+            'accuracy': round(sum(1 for p, label in zip(predicted, labels) if p == label) / len(images), 3),
+            'precision': round(true_positives / (true_positives + false_positives), 3)
+            if true_positives + false_positives else None,
+            'recall': round(true_positives / (true_positives + false_negatives), 3)
+            if true_positives + false_negatives else None,
+            'stats': detector.get_stats()
+        }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Keyword extraction throughput: one full spaCy pipeline call per document (as NicheAnalyzer
+used to do) against the trimmed, batched nlp.pipe pass it uses now.
+
+    python benchmarks/nlp_benchmark.py --docs 5000 --batch-size 256 --n-process 1
+
+Documents are the titles and descriptions of a synthetic mock API corpus.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-document and batched spaCy keyword extraction')
+    parser.add_argument('--docs', type=int, default=5000, help='Documents to process')
+    parser.add_argument('--batch-size', type=int, default=None, help='nlp.pipe batch size')
+    parser.add_argument('--n-process', type=int, default=None, help='nlp.pipe worker processes')
+    args = parser.parse_args()
+
+    import spacy
+    from config import Config
+    from mock_youtube_api import build_synthetic_corpus
+    from niche_analyzer import NicheAnalyzer, get_spacy_model
+
+    logging.getLogger().setLevel(logging.WARNING)
+    if args.batch_size is not None:
+        Config.SPACY_BATCH_SIZE = args.batch_size
+    if args.n_process is not None:
+        Config.SPACY_N_PROCESS = args.n_process
+
+    corpus = build_synthetic_corpus(args.docs, max(1, args.docs // 10))
+    texts = [f"{item['snippet']['title']} {item['snippet']['description']}" for item in corpus['videos']]
+
+    # Before: full pipeline loaded per analyzer, one call per document
+    started = time.perf_counter()
+    full_nlp = spacy.load(Config.SPACY_MODEL)
+    load_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    before = [NicheAnalyzer._doc_keywords(full_nlp(text.lower())) for text in texts]
+    before_seconds = time.perf_counter() - started
+    print(json.dumps({
+        'mode': 'per_document',
+        'pipeline': full_nlp.pipe_names,
+        'docs': len(texts),
+        'load_seconds': round(load_seconds, 3),
+        'seconds': round(before_seconds, 3),
+        'docs_per_sec': round(len(texts) / before_seconds, 1) if before_seconds else 0.0
+    }))
+
+    # After: trimmed pipeline loaded once per process, one batched pass
+    started = time.perf_counter()
+    nlp = get_spacy_model()
+    load_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    after = NicheAnalyzer().extract_keywords_from_texts(texts)
+    after_seconds = time.perf_counter() - started
+    print(json.dumps({
+        'mode': 'batched',
+        'pipeline': nlp.pipe_names if nlp else [],
+        'docs': len(texts),
+        'batch_size': Config.SPACY_BATCH_SIZE,
+        'n_process': Config.SPACY_N_PROCESS,
+        'load_seconds': round(load_seconds, 3),
+        'seconds': round(after_seconds, 3),
+        'docs_per_sec': round(len(texts) / after_seconds, 1) if after_seconds else 0.0,
+        'speedup': round(before_seconds / after_seconds, 2) if after_seconds else None,
+        # Entities are no longer extracted with NER disabled; everything else should match
+        'same_keywords': round(sum(1 for a, b in zip(before, after) if set(b) <= set(a)) / len(texts), 3)
+    }))
+
+
+if __name__ == '__main__':
+    main()
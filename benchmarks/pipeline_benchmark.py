@@ -0,0 +1,106 @@
+"""
+End-to-end benchmark of run_analysis against the local mock YouTube Data API.
+
+    python benchmarks/pipeline_benchmark.py --sizes 1000 10000 100000 --latency 0.05
+
+Each size gets a fresh synthetic corpus, database and cache directory, so no live quota
+or network access is needed.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark run_analysis against the mock YouTube API')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Corpus sizes (videos)')
+    parser.add_argument('--channels-ratio', type=float, default=0.1, help='Channels per video in the corpus')
+    parser.add_argument('--latency', type=float, default=0.05, help='Mock API delay per request (seconds)')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--max-results', type=int, default=200, help='max_results_per_query')
+    parser.add_argument('--faceless', action='store_true', help='Enable thumbnail face detection')
+    parser.add_argument('--thumbnail-dir', help='Serve real thumbnails from this directory')
+    parser.add_argument('--runs', type=int, default=1, help='Sessions per size; later runs hit the caches')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='pipeline_benchmark_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(work_dir, 'benchmark.db')}"
+    os.environ['CACHE_DIR'] = os.path.join(work_dir, 'cache')
+    os.environ.setdefault('API_DAILY_QUOTA', str(10 ** 9))
+    os.environ.setdefault('API_SESSION_QUOTA', str(10 ** 9))
+    os.environ.setdefault('API_REQUESTS_PER_SECOND', '0')
+
+    from app import app, db
+    from config import Config, api_namespace
+    from models import AnalysisSession
+    from mock_youtube_api import MockYouTubeAPI, build_synthetic_corpus
+    from response_cache import get_response_cache
+    from face_cache import get_face_cache
+    from thumbnail_hash import clear_phash_indexes
+    from niche_model import get_niche_model
+    import routes
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    for size in args.sizes:
+        corpus = build_synthetic_corpus(size, max(1, int(size * args.channels_ratio)))
+        api = MockYouTubeAPI(corpus, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                             thumbnail_dir=args.thumbnail_dir)
+        Config.YOUTUBE_API_BASE_URL = api.start()
+
+        # Every size starts cold: no cached responses, channels, disqualifications, face results or niches
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+        get_response_cache().clear()
+        get_face_cache().clear()
+        clear_phash_indexes()
+        get_niche_model(api_namespace(Config.YOUTUBE_API_BASE_URL)).clear()
+
+        for run in range(1, args.runs + 1):
+            params = dict(Config.DEFAULT_PARAMS)
+            params.update(max_results_per_query=args.max_results, faceless_only=args.faceless,
+                          session_name=f'benchmark_{size}_{run}')
+
+            with app.app_context():
+                session = AnalysisSession(session_name=params['session_name'], status='pending')
+                db.session.add(session)
+                db.session.commit()
+                session_id = session.id
+
+            requests_before = dict(api.request_counts)
+            started = time.perf_counter()
+            routes.run_analysis(session_id, params)
+            elapsed = time.perf_counter() - started
+
+            with app.app_context():
+                session = db.session.get(AnalysisSession, session_id)
+                status = session.status
+                qualified = session.total_videos_analyzed
+
+            print(json.dumps({
+                'corpus_videos': size,
+                'run': run,
+                'status': status,
+                'seconds': round(elapsed, 3),
+                'qualified_videos': qualified,
+                'api_requests': {endpoint: count - requests_before.get(endpoint, 0)
+                                 for endpoint, count in api.request_counts.items()},
+                'stages': routes.analysis_state.get('stages', []),
+                'api_cache': routes.analysis_state.get('api_cache', {}),
+                'channel_store': routes.analysis_state.get('channel_store', {}),
+                'face_detection': routes.analysis_state.get('face_detection', {})
+            }))
+
+        api.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+from config import Config
+
+
+def wilson_interval(successes: int, trials: int, z: float = None) -> Tuple[float, float]:
+    """Wilson score interval for a proportion; (0, 1) before any trial"""
+    if trials == 0:
+        return 0.0, 1.0
+    z = z if z is not None else Config.CHANNEL_FACE_Z
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    spread = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+def sequential_face_scan(detect: Callable[[List[int]], List[Tuple[bool, float]]], order: List[int],
+                         is_face: Callable[[Tuple[bool, float]], bool], max_face_ratio: Optional[float] = None,
+                         first_round: int = None) -> Tuple[Dict[int, Tuple[bool, float]], str]:
+    """
+    Scan thumbnails in rounds, cheapest first, until the face share of the whole sample is settled.
+    detect(indices) scans one round and the Wilson interval of the face share is updated. The
+    channel is 'face-heavy' once the interval lies entirely above max_face_ratio. It is 'faceless'
+    once the sample's share stays at most max_face_ratio even if the thumbnails not yet scanned
+    show faces at the interval's upper bound, so both outcomes can stop early: 12 clean
+    thumbnails at 10% settle 'faceless' after 8 at z = 1.645.
+    Without max_face_ratio every thumbnail is scanned in a single round.
+    Returns: ({index: (has_face, confidence)} for scanned thumbnails,
+              'faceless', 'face-heavy' or 'exhausted')
+    """
+    if max_face_ratio is None:
+        return dict(zip(order, detect(order))) if order else {}, 'exhausted'
+
+    results = {}
+    faces = 0
+    position = 0
+    round_size = max(1, first_round or Config.CHANNEL_SAMPLE_ROUND)
+
+    while position < len(order):
+        batch = order[position:position + round_size]
+        position += len(batch)
+        for i, result in zip(batch, detect(batch)):
+            results[i] = result
+            faces += is_face(result)
+
+        low, high = wilson_interval(faces, len(results))
+        unscanned = len(order) - position
+        if (faces + high * unscanned) / len(order) <= max_face_ratio:
+            return results, 'faceless'
+        if low > max_face_ratio:
+            return results, 'face-heavy'
+        round_size = max(1, Config.CHANNEL_SAMPLE_ROUND)
+
+    return results, 'exhausted'
@@ -0,0 +1,213 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Set, Tuple
+from app import db
+from models import ChannelActivity, ChannelFaceResult, ChannelRecord, DisqualifiedChannel
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelStore:
+    """
+    Cross-session channel metadata store.
+    Channels fetched within the refresh window are served from the database; only
+    unknown or stale channels need a /channels lookup. Must be used inside an app context.
+    Rows from an API other than YouTube's (see api_namespace) are stored under a
+    "namespace:" prefix, so a mock server's channels never mix with real ones.
+    """
+
+    def __init__(self, max_age_hours: float = None, namespace: str = ''):
+        self.max_age = timedelta(hours=max_age_hours if max_age_hours is not None else Config.CHANNEL_REFRESH_HOURS)
+        self.prefix = f"{namespace}:" if namespace else ''
+
+    def _keys(self, channel_ids: List[str]) -> List[str]:
+        return [self.prefix + channel_id for channel_id in channel_ids]
+
+    def _channel_id(self, key: str) -> str:
+        return key[len(self.prefix):]
+
+    def load(self, channel_ids: List[str]) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Return (fresh channel details, channel IDs that must be fetched).
+        """
+        fresh = {}
+        cutoff = datetime.utcnow() - self.max_age
+
+        for i in range(0, len(channel_ids), 500):
+            chunk = self._keys(channel_ids[i:i+500])
+            records = ChannelRecord.query.filter(
+                ChannelRecord.channel_id.in_(chunk),
+                ChannelRecord.fetched_at >= cutoff
+            ).all()
+            for record in records:
+                fresh[self._channel_id(record.channel_id)] = record.to_details()
+
+        to_fetch = [channel_id for channel_id in channel_ids if channel_id not in fresh]
+        logger.info(f"Channel store: {len(fresh)} fresh, {len(to_fetch)} unknown or stale")
+        return fresh, to_fetch
+
+    def save(self, channel_details: Dict[str, Dict]):
+        """Insert or refresh records for freshly fetched channels"""
+        channel_ids = list(channel_details.keys())
+        existing = {}
+
+        for i in range(0, len(channel_ids), 500):
+            chunk = self._keys(channel_ids[i:i+500])
+            for record in ChannelRecord.query.filter(ChannelRecord.channel_id.in_(chunk)).all():
+                existing[self._channel_id(record.channel_id)] = record
+
+        for channel_id, details in channel_details.items():
+            record = existing.get(channel_id)
+            if record is None:
+                record = ChannelRecord(channel_id=self.prefix + channel_id)
+                db.session.add(record)
+            record.update_from_details(details)
+
+        db.session.commit()
+
+    def load_activity(self, channel_ids: List[str]) -> Tuple[Dict[str, Dict], List[str]]:
+        """
+        Return (fresh channel activity, channel IDs whose uploads must be read).
+        Activity expires on the same schedule as channel metadata.
+        """
+        fresh = {}
+        cutoff = datetime.utcnow() - self.max_age
+
+        for i in range(0, len(channel_ids), 500):
+            chunk = self._keys(channel_ids[i:i+500])
+            records = ChannelActivity.query.filter(
+                ChannelActivity.channel_id.in_(chunk),
+                ChannelActivity.checked_at >= cutoff
+            ).all()
+            for record in records:
+                fresh[self._channel_id(record.channel_id)] = record.to_activity()
+
+        to_fetch = [channel_id for channel_id in channel_ids if channel_id not in fresh]
+        return fresh, to_fetch
+
+    def save_activity(self, activity: Dict[str, Dict]):
+        """Insert or refresh activity computed this session"""
+        if not activity:
+            return
+
+        existing = {}
+        channel_ids = list(activity.keys())
+        for i in range(0, len(channel_ids), 500):
+            chunk = self._keys(channel_ids[i:i+500])
+            for record in ChannelActivity.query.filter(ChannelActivity.channel_id.in_(chunk)).all():
+                existing[self._channel_id(record.channel_id)] = record
+
+        for channel_id, values in activity.items():
+            record = existing.get(channel_id)
+            if record is None:
+                record = ChannelActivity(channel_id=self.prefix + channel_id)
+                db.session.add(record)
+            record.weekly_uploads = values['weekly_uploads']
+            record.monthly_views = values['monthly_views']
+            record.views_7days = values['views_7days']
+            record.uploads_counted = values['uploads_counted']
+            record.checked_at = datetime.utcnow()
+
+        db.session.commit()
+
+    def load_face_results(self, channel_ids: List[str], engine: str,
+                          max_face_percentage: float) -> Tuple[Dict[str, Tuple[float, float, int]], List[str]]:
+        """
+        Return ({channel_id: (avg_confidence, face_percentage, thumbnails_scanned)} still valid for
+        this engine and limit, channel IDs that must be scored). The tuples are ordered like
+        FaceDetector.analyze_channel_thumbnails results.
+        """
+        results = {}
+        cutoff = datetime.utcnow() - timedelta(hours=Config.CHANNEL_FACE_MAX_AGE_HOURS)
+
+        for i in range(0, len(channel_ids), 500):
+            chunk = self._keys(channel_ids[i:i+500])
+            records = ChannelFaceResult.query.filter(
+                ChannelFaceResult.channel_id.in_(chunk),
+                ChannelFaceResult.engine == engine,
+                ChannelFaceResult.max_face_percentage == max_face_percentage,
+                ChannelFaceResult.checked_at >= cutoff
+            ).all()
+            for record in records:
+                results[self._channel_id(record.channel_id)] = (record.avg_confidence, record.face_percentage, record.thumbnails_scanned)
+
+        to_score = [channel_id for channel_id in channel_ids if channel_id not in results]
+        return results, to_score
+
+    def save_face_results(self, results: Dict[str, Tuple[float, float, int]], engine: str,
+                          max_face_percentage: float):
+        """Insert or refresh channel face shares scored this session, as (avg_confidence, face_percentage, scanned)"""
+        if not results:
+            return
+
+        existing = {}
+        channel_ids = list(results.keys())
+        for i in range(0, len(channel_ids), 500):
+            chunk = self._keys(channel_ids[i:i+500])
+            for record in ChannelFaceResult.query.filter(ChannelFaceResult.channel_id.in_(chunk)).all():
+                existing[self._channel_id(record.channel_id)] = record
+
+        for channel_id, (avg_confidence, face_percentage, scanned) in results.items():
+            record = existing.get(channel_id)
+            if record is None:
+                record = ChannelFaceResult(channel_id=self.prefix + channel_id)
+                db.session.add(record)
+            record.engine = engine
+            record.max_face_percentage = max_face_percentage
+            record.face_percentage = face_percentage
+            record.avg_confidence = avg_confidence
+            record.thumbnails_scanned = scanned
+            record.checked_at = datetime.utcnow()
+
+        db.session.commit()
+
+    def load_disqualified(self, max_channel_age_days: int) -> Set[str]:
+        """
+        Return channels already known to fail the age filter. A channel rejected for being
+        older than `threshold` whole days was created at least threshold + 1 days before
+        rejected_at (created_before), so it fails any max_channel_age_days whose cutoff is
+        later than that.
+        """
+        cutoff = datetime.utcnow() - timedelta(days=max_channel_age_days + 1)
+        query = DisqualifiedChannel.query.filter(
+            DisqualifiedChannel.reason == 'channel_age',
+            DisqualifiedChannel.created_before <= cutoff
+        )
+        if self.prefix:
+            query = query.filter(DisqualifiedChannel.channel_id.startswith(self.prefix, autoescape=True))
+        else:
+            query = query.filter(~DisqualifiedChannel.channel_id.contains(':'))  # not another API's channel
+
+        return {self._channel_id(channel_id) for channel_id, in query.with_entities(DisqualifiedChannel.channel_id)}
+
+    def record_disqualified(self, channel_ids: Set[str], max_channel_age_days: int):
+        """
+        Remember channels rejected for being older than max_channel_age_days. A channel already
+        recorded keeps whichever rejection proves it older.
+        """
+        if not channel_ids:
+            return
+
+        now = datetime.utcnow()
+        created_before = now - timedelta(days=max_channel_age_days + 1)
+
+        existing = {}
+        channel_ids = list(channel_ids)
+        for i in range(0, len(channel_ids), 500):
+            chunk = self._keys(channel_ids[i:i+500])
+            for record in DisqualifiedChannel.query.filter(DisqualifiedChannel.channel_id.in_(chunk)).all():
+                existing[self._channel_id(record.channel_id)] = record
+
+        for channel_id in channel_ids:
+            record = existing.get(channel_id)
+            if record is None:
+                record = DisqualifiedChannel(channel_id=self.prefix + channel_id, reason='channel_age')
+                db.session.add(record)
+            elif record.created_before <= created_before:
+                continue
+            record.threshold = max_channel_age_days
+            record.rejected_at = now
+            record.created_before = created_before
+
+        db.session.commit()
@@ -0,0 +1,97 @@
+import time
+import heapq
+import logging
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, List, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by concurrent API workers.
+    Allows short bursts up to `burst` calls, then paces calls at `rate` per second.
+    Waiting callers are served lowest `priority` first, then in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.cond = threading.Condition()
+        self.waiters = []
+        self.arrivals = itertools.count()
+
+    def acquire(self, priority: int = 0):
+        """Block until a call is allowed"""
+        if self.rate <= 0:
+            return
+
+        with self.cond:
+            ticket = (priority, next(self.arrivals))
+            heapq.heappush(self.waiters, ticket)
+
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.waiters[0] == ticket:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        heapq.heappop(self.waiters)
+                        self.cond.notify_all()
+                        return
+                    self.cond.wait((1 - self.tokens) / self.rate)
+                else:
+                    self.cond.wait()
+
+
+def map_concurrently(func: Callable, items: Iterable, max_workers: int = None,
+                     on_progress: Optional[Callable[[int, int], None]] = None) -> List:
+    """
+    Apply func to every item on a bounded thread pool.
+    Results are returned in input order; on_progress(done, total) is called
+    from the calling thread as each item completes.
+    """
+    items = list(items)
+    total = len(items)
+    max_workers = max_workers or Config.API_MAX_WORKERS
+    results = [None] * total
+
+    if total == 0:
+        return results
+
+    if max_workers <= 1 or total == 1:
+        for i, item in enumerate(items):
+            results[i] = func(item)
+            if on_progress:
+                on_progress(i + 1, total)
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, total)) as executor:
+        futures = {executor.submit(func, item): i for i, item in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            if on_progress:
+                on_progress(done, total)
+
+    return results
+
+
+_api_rate_limiter = None
+_api_rate_limiter_lock = threading.Lock()
+
+
+def get_api_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter for YouTube Data API calls"""
+    global _api_rate_limiter
+    if _api_rate_limiter is None:
+        with _api_rate_limiter_lock:
+            if _api_rate_limiter is None:
+                _api_rate_limiter = RateLimiter(Config.API_REQUESTS_PER_SECOND)
+    return _api_rate_limiter
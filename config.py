@@ -1,9 +1,13 @@
 import os
+import re
+from urllib.parse import urlparse
 
 class Config:
     # API Configuration
     YOUTUBE_API_KEY = os.environ.get('YOUTUBE_API_KEY', 'your-youtube-api-key')
     GOOGLE_VISION_API_KEY = os.environ.get('GOOGLE_VISION_API_KEY', 'your-vision-api-key')
+    YOUTUBE_API_BASE_URL = os.environ.get('YOUTUBE_API_BASE_URL', 'https://www.googleapis.com/youtube/v3')
+    YOUTUBE_API_HOSTS = ('www.googleapis.com', 'youtube.googleapis.com')  # hosts that spend real quota
     
     # Default Analysis Parameters
     DEFAULT_PARAMS = {
@@ -13,13 +17,14 @@ class Config:
         'max_channel_videos': 20,
         'max_channel_age_days': 30,
         'min_weekly_uploads': 4,
-        'min_video_views_7days': 50000,
+        'min_video_views_7days': 50000,  # total views on the channel's uploads from the last 7 days
         'days_back_to_search': 7,
         'face_detection_threshold': 0.7,
         'max_face_percentage': 10,
         'search_query': '',
         'faceless_only': True,
-        'max_results_per_query': 50
+        'max_results_per_query': 50,
+        'use_cache': True
     }
     
     # Search Queries for Different Niches
@@ -46,14 +51,118 @@ class Config:
         'travel shorts'
     ]
     
+    # HTTP Client Configuration
+    HTTP_TIMEOUT = float(os.environ.get('HTTP_TIMEOUT', 15))  # seconds per request
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 4))
+    HTTP_BACKOFF_BASE = 0.5  # seconds, doubled on every retry
+    HTTP_BACKOFF_MAX = 30  # seconds, also caps Retry-After
+    HTTP_POOL_SIZE = 20  # keep-alive connections per host
+
+    # Concurrency Configuration
+    API_MAX_WORKERS = int(os.environ.get('API_MAX_WORKERS', 8))  # parallel API requests
+    API_REQUESTS_PER_SECOND = float(os.environ.get('API_REQUESTS_PER_SECOND', 10))  # shared across workers
+
+    # Search Pagination (each page holds up to 50 results and costs a search call)
+    SEARCH_MAX_PAGES = int(os.environ.get('SEARCH_MAX_PAGES', 4))
+
+    # API Quota Configuration (units per call, see YouTube Data API quota costs)
+    API_QUOTA_COSTS = {
+        'search': 100,
+        'videos': 1,
+        'channels': 1,
+        'playlistItems': 1
+    }
+    API_DAILY_QUOTA = int(os.environ.get('API_DAILY_QUOTA', 10000))
+    API_SESSION_QUOTA = int(os.environ.get('API_SESSION_QUOTA', 5000))
+    # Most of the session budget searches may spend; the rest is kept for the video, channel and
+    # uploads lookups that the search results create
+    API_SEARCH_QUOTA_SHARE = float(os.environ.get('API_SEARCH_QUOTA_SHARE', 0.6))
+
+    # API Response Cache Configuration (TTL in seconds per endpoint, 0 disables)
+    API_CACHE_TTLS = {
+        'search': 6 * 3600,  # result sets drift slowly
+        'videos': 3600,  # view counts move quickly
+        'channels': 24 * 3600,  # created_at never changes, counts change slowly
+        'playlistItems': 3600  # new uploads appear at the top
+    }
+
+    # Channel Store Configuration (stats older than this are refetched)
+    CHANNEL_REFRESH_HOURS = float(os.environ.get('CHANNEL_REFRESH_HOURS', 24))
+    CHANNEL_FACE_SAMPLE = int(os.environ.get('CHANNEL_FACE_SAMPLE', 12))  # recent uploads checked per channel
+    CHANNEL_FACE_WORKERS = int(os.environ.get('CHANNEL_FACE_WORKERS', 4))  # channels scored concurrently
+    CHANNEL_FACE_MAX_AGE_HOURS = float(os.environ.get('CHANNEL_FACE_MAX_AGE_HOURS', 72))  # rescore after new uploads
+    CHANNEL_ACTIVITY_WINDOW_DAYS = 30  # uploads counted for cadence and monthly views
+    CHANNEL_ACTIVITY_MAX_UPLOADS = int(os.environ.get('CHANNEL_ACTIVITY_MAX_UPLOADS', 100))  # 2 playlistItems pages
+
     # NLP Configuration
     SPACY_MODEL = 'en_core_web_sm'
+    SPACY_DISABLE = ['parser', 'ner']  # keywords only need POS tags, lemmas and stop words
+    SPACY_BATCH_SIZE = int(os.environ.get('SPACY_BATCH_SIZE', 256))  # texts per nlp.pipe batch
+    SPACY_N_PROCESS = int(os.environ.get('SPACY_N_PROCESS', 1))  # worker processes; >1 only pays off for large sessions
     MIN_CLUSTER_SIZE = 3
     MAX_CLUSTERS = 10
+    NICHE_INCREMENTAL = os.environ.get('NICHE_INCREMENTAL', 'true').lower() == 'true'  # persistent niches across sessions
+    NICHE_MODEL_FILE = 'niche_model.pkl'  # under CACHE_DIR
+    NICHE_HASH_FEATURES = 2 ** 14  # hashed unigram + bigram dimensions; changing it starts a new model
+    NICHE_MODEL_BATCH_SIZE = 1024
+    NICHE_MODEL_MAX_VIDEOS = 100000  # video -> niche assignments remembered
+    NICHE_TERMS_PER_CLUSTER = 500  # term counts kept per niche for naming
     
     # Face Detection Configuration
     OPENCV_CASCADE_PATH = 'haarcascade_frontalface_default.xml'
+    FACE_DETECTION_ENGINE = os.environ.get('FACE_DETECTION_ENGINE', 'haar')  # 'haar' or 'dnn' (SSD face model)
+    FACE_MODEL_DIR = os.environ.get('FACE_MODEL_DIR', 'face_models')  # bundled model files, relative to the app
+    DNN_FACE_PROTOTXT = 'deploy.prototxt'
+    DNN_FACE_MODEL = 'res10_300x300_ssd_iter_140000.caffemodel'
+    # Per-face detection score to count as a face. It replaces face_detection_threshold, which is
+    # calibrated on Haar confidences, when the DNN engine is used
+    DNN_MIN_SCORE = float(os.environ.get('DNN_MIN_SCORE', 0.5))
+    DNN_BATCH_SIZE = int(os.environ.get('DNN_BATCH_SIZE', 32))  # thumbnails per forward pass
+    THUMBNAIL_TIMEOUT = float(os.environ.get('THUMBNAIL_TIMEOUT', 5))  # seconds per thumbnail download
+    THUMBNAIL_MAX_RETRIES = 1
+    THUMBNAIL_DOWNLOAD_WORKERS = int(os.environ.get('THUMBNAIL_DOWNLOAD_WORKERS', 16))
+    FACE_DETECTION_WORKERS = int(os.environ.get('FACE_DETECTION_WORKERS', os.cpu_count() or 2))
+    FACE_DETECTION_PROCESSES = os.environ.get('FACE_DETECTION_PROCESSES', 'true').lower() == 'true'  # threads if false
+    FACE_DETECTION_MAX_RESTARTS = int(os.environ.get('FACE_DETECTION_MAX_RESTARTS', 2))  # broken process pools replaced before using threads
+    FACE_DETECTION_MULTIRES = os.environ.get('FACE_DETECTION_MULTIRES', 'true').lower() == 'true'  # coarse-to-fine
+    FACE_ESCALATION_MARGIN = float(os.environ.get('FACE_ESCALATION_MARGIN', 0.2))  # re-check near the threshold
+    FACE_PREFILTER = os.environ.get('FACE_PREFILTER', 'skin')  # 'none' runs the cascade on every thumbnail
+    FACE_PREFILTER_MIN_SKIN_RATIO = 0.02  # a face worth counting is mostly skin-tone pixels
+    FACE_PREFILTER_MIN_ENTROPY = 1.0  # bits; flat text cards and simple graphics fall below
+    FACE_PREFILTER_MAX_EDGE_DENSITY = 0.35  # walls of text and UI screenshots exceed this
+    FACE_PREFILTER_AUDIT_RATE = float(os.environ.get('FACE_PREFILTER_AUDIT_RATE', 0.05))  # skips re-checked
+    FACE_PREFILTER_FN_BUDGET = float(os.environ.get('FACE_PREFILTER_FN_BUDGET', 0.02))  # tolerated missed faces
+    FACE_PREFILTER_MIN_AUDITS = 20  # audits needed before the budget is enforced
+    FACE_PHASH_DEDUPE = os.environ.get('FACE_PHASH_DEDUPE', 'true').lower() == 'true'  # reuse near-duplicate results
+    FACE_PHASH_MAX_DISTANCE = int(os.environ.get('FACE_PHASH_MAX_DISTANCE', 4))  # differing dHash bits (of 64)
+    FACE_TEXT_TRIAGE = os.environ.get('FACE_TEXT_TRIAGE', 'true').lower() == 'true'  # decide clear cases from text
+    FACE_TEXT_MIN_SIGNALS = int(os.environ.get('FACE_TEXT_MIN_SIGNALS', 2))  # keyword hits needed to decide
+    FACE_TEXT_FACELESS_MAX = float(os.environ.get('FACE_TEXT_FACELESS_MAX', 0.1))  # face probability at most
+    FACE_TEXT_FACE_MIN = float(os.environ.get('FACE_TEXT_FACE_MIN', 0.9))  # face probability at least
+    CHANNEL_SAMPLE_ROUND = int(os.environ.get('CHANNEL_SAMPLE_ROUND', 4))  # thumbnails per sequential-test round
+    # Interval width; 1.645 ~ 95% one-sided. Faceless channels stop once the sample's face share stays
+    # within the limit even with the unscanned thumbnails at the interval's upper bound: 8 of 12 at 10%
+    CHANNEL_FACE_Z = float(os.environ.get('CHANNEL_FACE_Z', 1.645))
+    FACE_CACHE_MAX_AGE_DAYS = float(os.environ.get('FACE_CACHE_MAX_AGE_DAYS', 30))  # rescan in case a thumbnail changed
+    
+    # Lightweight (no OpenCV) face heuristics
+    SIMPLE_FACE_PROBE = os.environ.get('SIMPLE_FACE_PROBE', 'head')  # 'none' scores thumbnails from the URL alone
+    THUMBNAIL_PROBE_TIMEOUT = float(os.environ.get('THUMBNAIL_PROBE_TIMEOUT', 3))  # seconds per HEAD request
+    THUMBNAIL_PROBE_TTL = float(os.environ.get('THUMBNAIL_PROBE_TTL', 24 * 3600))  # thumbnails rarely change
+    THUMBNAIL_PROBE_CACHE_SIZE = 50000  # metadata entries kept in memory
     
     # File Paths
     RESULTS_DIR = 'results'
     TEMP_DIR = 'temp'
+    CACHE_DIR = os.environ.get('CACHE_DIR', 'cache')
+
+
+def api_namespace(base_url: str = None) -> str:
+    """
+    '' for the YouTube Data API, otherwise a filesystem-safe name for the base URL (e.g. a mock
+    server), used to keep that API's cached responses, channels and niches apart from real ones
+    """
+    parsed = urlparse(base_url or Config.YOUTUBE_API_BASE_URL)
+    if parsed.hostname in Config.YOUTUBE_API_HOSTS:
+        return ''
+    return re.sub(r'[^A-Za-z0-9]+', '-', f"{parsed.netloc}{parsed.path}").strip('-')
@@ -0,0 +1,138 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class FaceResultCache:
+    """
+    Persistent store of thumbnail face detection results.
+    Entries are keyed by video ID and detector engine signature, and also indexed by the
+    thumbnail's content hash, so re-uploaded or shared thumbnails are never scanned twice.
+    """
+
+    def __init__(self, path: str = None, max_age_days: float = None):
+        self.path = path or os.path.join(Config.CACHE_DIR, 'face_results.db')
+        self.max_age = (max_age_days if max_age_days is not None else Config.FACE_CACHE_MAX_AGE_DAYS) * 86400
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS face_results ('
+            'video_id TEXT, engine TEXT, content_hash TEXT, has_face INTEGER, confidence REAL, checked_at REAL, '
+            'PRIMARY KEY (video_id, engine))'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS ix_face_results_hash ON face_results (content_hash, engine)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS face_phashes ('
+            'phash INTEGER, engine TEXT, has_face INTEGER, confidence REAL, checked_at REAL, '
+            'PRIMARY KEY (phash, engine))'
+        )
+        self.conn.commit()
+
+    def get_by_video(self, video_ids: List[str], engine: str) -> Dict[str, Tuple[bool, float]]:
+        """Return {video_id: (has_face, confidence)} for videos checked within the max age"""
+        results = {}
+        cutoff = time.time() - self.max_age
+
+        with self.lock:
+            for i in range(0, len(video_ids), 500):
+                chunk = video_ids[i:i+500]
+                rows = self.conn.execute(
+                    f"SELECT video_id, has_face, confidence FROM face_results WHERE engine = ? AND checked_at >= ? "
+                    f"AND video_id IN ({','.join('?' * len(chunk))})",
+                    [engine, cutoff] + chunk
+                ).fetchall()
+                for video_id, has_face, confidence in rows:
+                    results[video_id] = (bool(has_face), confidence)
+
+        return results
+
+    def get_by_hash(self, content_hash: str, engine: str) -> Optional[Tuple[bool, float]]:
+        """Return the result for identical thumbnail bytes, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT has_face, confidence FROM face_results WHERE content_hash = ? AND engine = ? LIMIT 1',
+                (content_hash, engine)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return bool(row[0]), row[1]
+
+    def set_many(self, entries: List[Tuple[str, str, bool, float]], engine: str):
+        """Store (video_id, content_hash, has_face, confidence) results for an engine"""
+        if not entries:
+            return
+
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO face_results '
+                '(video_id, engine, content_hash, has_face, confidence, checked_at) VALUES (?, ?, ?, ?, ?, ?)',
+                [(video_id, engine, content_hash, int(has_face), confidence, now)
+                 for video_id, content_hash, has_face, confidence in entries]
+            )
+            self.conn.commit()
+
+    def get_phashes(self, engine: str) -> Dict[int, Tuple[bool, float]]:
+        """Return {perceptual_hash: (has_face, confidence)} for thumbnails checked within the max age"""
+        cutoff = time.time() - self.max_age
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT phash, has_face, confidence FROM face_phashes WHERE engine = ? AND checked_at >= ?',
+                (engine, cutoff)
+            ).fetchall()
+
+        # SQLite integers are signed 64-bit
+        return {phash & 0xFFFFFFFFFFFFFFFF: (bool(has_face), confidence) for phash, has_face, confidence in rows}
+
+    def set_phashes(self, entries: List[Tuple[int, bool, float]], engine: str):
+        """Store (perceptual_hash, has_face, confidence) results for an engine"""
+        if not entries:
+            return
+
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO face_phashes (phash, engine, has_face, confidence, checked_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(phash - (1 << 64) if phash >= 1 << 63 else phash, engine, int(has_face), confidence, now)
+                 for phash, has_face, confidence in entries]
+            )
+            self.conn.commit()
+
+    def clear(self):
+        """Delete every entry"""
+        with self.lock:
+            self.conn.execute('DELETE FROM face_results')
+            self.conn.execute('DELETE FROM face_phashes')
+            self.conn.commit()
+
+
+_face_cache = None
+_face_cache_lock = threading.Lock()
+
+
+def get_face_cache() -> Optional[FaceResultCache]:
+    """Return the process-wide face result cache, or None if it cannot be opened"""
+    global _face_cache
+    if _face_cache is None:
+        with _face_cache_lock:
+            if _face_cache is None:
+                try:
+                    _face_cache = FaceResultCache()
+                except Exception as e:
+                    logger.error(f"Error opening face result cache: {str(e)}")
+                    return None
+    return _face_cache
@@ -1,64 +1,519 @@
 import cv2
+import hashlib
 import numpy as np
 import requests
 import logging
-from typing import Tuple, Optional
+import threading
+import time
+import random
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Dict, List, Tuple, Optional
 import os
 from config import Config
+from http_client import HTTPClient, get_http_client
+from face_cache import FaceResultCache, get_face_cache
+from face_prefilter import get_prefilter
+from thumbnail_hash import PerceptualHashIndex, dhash_bytes, get_phash_index
+from channel_sampling import sequential_face_scan
 
 logger = logging.getLogger(__name__)
 
-class FaceDetector:
-    def __init__(self):
-        self.cascade_path = self._get_cascade_path()
-        self.face_cascade = None
-        self._load_cascade()
-    
-    def _get_cascade_path(self) -> str:
-        """Get the path to the Haar cascade file"""
-        # Try to find the cascade file in common locations
-        possible_paths = [
-            'haarcascade_frontalface_default.xml',
-            '/usr/share/opencv4/haarcascades/haarcascade_frontalface_default.xml',
-            '/usr/local/share/opencv4/haarcascades/haarcascade_frontalface_default.xml',
-            os.path.join(cv2.data.haarcascades, 'haarcascade_frontalface_default.xml')
-        ]
-        
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-        
-        # If not found, download it
-        return self._download_cascade()
-    
-    def _download_cascade(self) -> str:
-        """Download the Haar cascade file if not found"""
+# detectMultiScale parameters; part of the engine signature that tags cached results
+HAAR_PARAMS = {'scaleFactor': 1.1, 'minNeighbors': 5, 'minSize': (30, 30)}
+
+# Coarse-to-fine mode: a fast pass on the small thumbnail, a finer one on 'high' when in doubt
+COARSE_HAAR_PARAMS = {'scaleFactor': 1.2, 'minNeighbors': 4, 'minSize': (20, 20)}
+FINE_HAAR_PARAMS = {'scaleFactor': 1.05, 'minNeighbors': 5, 'minSize': (30, 30)}
+
+# Confidence is calibrated against the 480x360 'high' thumbnail frame
+REFERENCE_FRAME = (480, 360)
+
+# OpenCV res10 SSD face model input: 300x300 BGR with the training set's channel means
+DNN_INPUT_SIZE = (300, 300)
+DNN_MEAN = (104.0, 177.0, 123.0)
+# Sources for `python face_detector.py --download-models`; never fetched at runtime
+MODEL_URLS = {
+    Config.OPENCV_CASCADE_PATH: ('https://raw.githubusercontent.com/opencv/opencv/master/data/haarcascades/'
+                                 'haarcascade_frontalface_default.xml'),
+    Config.DNN_FACE_PROTOTXT: 'https://raw.githubusercontent.com/opencv/opencv/master/samples/dnn/face_detector/deploy.prototxt',
+    Config.DNN_FACE_MODEL: ('https://raw.githubusercontent.com/opencv/opencv_3rdparty/'
+                            'dnn_samples_face_detector_20170830/res10_300x300_ssd_iter_140000.caffemodel')
+}
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cascade per worker thread (or per worker process, which has a single task thread)
+_worker_state = threading.local()
+
+
+def _worker_cascade(cascade_path: str) -> cv2.CascadeClassifier:
+    """Load the cascade once per worker; classifiers are not safe to share across threads"""
+    cascade = getattr(_worker_state, 'cascade', None)
+    if cascade is None:
+        cascade = cv2.CascadeClassifier(cascade_path)
+        _worker_state.cascade = cascade
+    return cascade
+
+
+def _worker_net(dnn_model: Tuple[str, str]):
+    """Load the DNN face model (prototxt, weights) once per worker"""
+    net = getattr(_worker_state, 'net', None)
+    if net is None:
+        net = cv2.dnn.readNetFromCaffe(*dnn_model)
+        _worker_state.net = net
+    return net
+
+
+def _init_detection_worker(cascade_path: str, dnn_model: Tuple[str, str] = None):
+    """Process pool initializer: load the models up front and keep OpenCV to one thread per worker"""
+    cv2.setNumThreads(1)
+    _worker_cascade(cascade_path)
+    if dnn_model:
+        _worker_net(dnn_model)
+
+
+def _detect_with_cascade(face_cascade: cv2.CascadeClassifier, image: np.ndarray,
+                         params: Dict = None, reference_frame: Tuple[int, int] = None) -> Tuple[bool, float]:
+    """
+    Run the Haar cascade on a BGR image
+    With a reference frame, face areas are rescaled by width to that frame so thumbnails of
+    different sizes and aspect ratios give comparable confidences.
+    Returns: (has_face, confidence_score)
+    """
+    # Convert to grayscale
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    
+    # Detect faces
+    faces = face_cascade.detectMultiScale(gray, **(params or HAAR_PARAMS))
+    
+    has_face = len(faces) > 0
+    
+    if has_face:
+        # Calculate confidence based on face size relative to image
+        total_face_area = sum(w * h for (x, y, w, h) in faces)
+        if reference_frame:
+            image_area = reference_frame[0] * reference_frame[1]
+            total_face_area *= (reference_frame[0] / gray.shape[1]) ** 2
+        else:
+            image_area = gray.shape[0] * gray.shape[1]
+        face_ratio = total_face_area / image_area
+        
+        # Confidence score based on face prominence
+        confidence = min(1.0, face_ratio * 10)  # Scale to 0-1
+    else:
+        confidence = 0.0
+    
+    return has_face, confidence
+
+
+def _detect_image_task(cascade_path: str, image: np.ndarray, params: Dict = None,
+                       reference_frame: Tuple[int, int] = None) -> Tuple[bool, float]:
+    """Detection pool task for a decoded image"""
+    try:
+        return _detect_with_cascade(_worker_cascade(cascade_path), image, params, reference_frame)
+    except Exception as e:
+        logger.error(f"Error detecting faces in image: {str(e)}")
+        return False, 0.0
+
+
+def _decode_image(content: bytes) -> Optional[np.ndarray]:
+    image = cv2.imdecode(np.frombuffer(content, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        logger.warning("Could not decode downloaded thumbnail")
+    return image
+
+
+def _detect_bytes_task(cascade_path: str, content: bytes, params: Dict = None,
+                       reference_frame: Tuple[int, int] = None) -> Tuple[bool, float]:
+    """Detection pool task for downloaded image bytes; decoding happens in the worker too"""
+    image = _decode_image(content)
+    
+    if image is None:
+        return False, 0.0
+    
+    return _detect_image_task(cascade_path, image, params, reference_frame)
+
+
+def _timed_detect_task(cascade_path: str, payload, params: Dict = None, reference_frame: Tuple[int, int] = None,
+                       prefilter=None, audit: bool = False) -> Tuple[Optional[Tuple[bool, float]], float, Optional[bool]]:
+    """
+    Detect in image bytes or an array, also returning the seconds spent inside the worker.
+    With a pre-filter, images it flags as faceless skip the cascade unless audit is set;
+    the third element is the pre-filter verdict (None when not checked).
+    The result is None when the bytes cannot be decoded, so it is not taken for a faceless image.
+    """
+    started = time.perf_counter()
+    image = _decode_image(payload) if isinstance(payload, bytes) else payload
+    if image is None:
+        return None, time.perf_counter() - started, None
+    
+    prefiltered = None
+    if prefilter is not None:
+        prefiltered = prefilter.is_faceless(image)
+        if prefiltered and not audit:
+            return (False, 0.0), time.perf_counter() - started, True
+    
+    result = _detect_image_task(cascade_path, image, params, reference_frame)
+    return result, time.perf_counter() - started, prefiltered
+
+
+def _detect_with_dnn(net, images: List[np.ndarray]) -> List[List[Tuple[Tuple[int, int, int, int], float]]]:
+    """
+    Run the SSD face model on a batch of BGR images in a single forward pass
+    Returns: per image, a list of (x, y, w, h) face boxes with their detection scores
+    """
+    blob = cv2.dnn.blobFromImages(images, 1.0, DNN_INPUT_SIZE, DNN_MEAN, swapRB=False, crop=False)
+    net.setInput(blob)
+    
+    # Rows are [image_index, label, score, x1, y1, x2, y2] with normalized coordinates
+    faces = [[] for _ in images]
+    for image_index, _, score, x1, y1, x2, y2 in net.forward().reshape(-1, 7):
+        if image_index < 0 or score < Config.DNN_MIN_SCORE:
+            continue
+        height, width = images[int(image_index)].shape[:2]
+        box = (int(x1 * width), int(y1 * height), int((x2 - x1) * width), int((y2 - y1) * height))
+        faces[int(image_index)].append((box, float(score)))
+    return faces
+
+
+def _timed_dnn_batch_task(dnn_model: Tuple[str, str], payloads: List, prefilter=None, screens: List[bool] = None,
+                          audits: List[bool] = None) -> Tuple[List[Tuple[Optional[Tuple[bool, float]], Optional[bool]]], float]:
+    """
+    Detect in a batch of image bytes or arrays with one DNN forward pass.
+    Payloads with screens set are checked by the pre-filter first, and those it flags as
+    faceless stay out of the forward pass unless audited.
+    Returns: ([((has_face, best_face_score), pre-filter verdict)] per payload, seconds spent);
+    the result is None for payloads that could not be decoded or whose forward pass failed.
+    """
+    started = time.perf_counter()
+    outcomes = [(None, None)] * len(payloads)
+    batch = []
+    
+    for position, payload in enumerate(payloads):
+        image = _decode_image(payload) if isinstance(payload, bytes) else payload
+        if image is None:
+            continue
+        prefiltered = None
+        if prefilter is not None and screens and screens[position]:
+            prefiltered = prefilter.is_faceless(image)
+            if prefiltered and not (audits and audits[position]):
+                outcomes[position] = ((False, 0.0), prefiltered)
+                continue
+        batch.append((position, image, prefiltered))
+    
+    if batch:
         try:
-            url = "https://raw.githubusercontent.com/opencv/opencv/master/data/haarcascades/haarcascade_frontalface_default.xml"
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            cascade_path = "haarcascade_frontalface_default.xml"
-            with open(cascade_path, 'w') as f:
-                f.write(response.text)
-            
-            logger.info(f"Downloaded Haar cascade to {cascade_path}")
-            return cascade_path
-            
+            faces = _detect_with_dnn(_worker_net(dnn_model), [image for _, image, _ in batch])
+            for (position, _, prefiltered), image_faces in zip(batch, faces):
+                best_score = max((score for _, score in image_faces), default=0.0)
+                outcomes[position] = ((bool(image_faces), best_score), prefiltered)
         except Exception as e:
-            logger.error(f"Error downloading Haar cascade: {str(e)}")
-            return ""
+            logger.error(f"Error detecting faces in DNN batch: {str(e)}")
+    
+    return outcomes, time.perf_counter() - started
+
+
+class FaceModelError(Exception):
+    """Raised when a face detection model file is missing or cannot be loaded"""
+
+
+class FaceModelRegistry:
+    """
+    Resolves face detection model files once per process, from local files only.
+    Looks in FACE_MODEL_DIR first, then in the locations OpenCV installs its cascades to.
+    Nothing is downloaded here; bundle the files with `python face_detector.py --download-models`.
+    """
+    
+    ENGINES = ('haar', 'dnn')
+    
+    def __init__(self, model_dir: str = None):
+        self.model_dir = os.path.join(APP_DIR, model_dir or Config.FACE_MODEL_DIR)
+        self.lock = threading.Lock()
+        self._cascade_path = None
+        self._dnn_model = None
+    
+    def _cascade_candidates(self) -> List[str]:
+        name = Config.OPENCV_CASCADE_PATH
+        candidates = [os.path.join(self.model_dir, name), os.path.join(APP_DIR, name)]
+        opencv_data = getattr(getattr(cv2, 'data', None), 'haarcascades', None)
+        if opencv_data:
+            candidates.append(os.path.join(opencv_data, name))
+        candidates += [f'/usr/share/opencv4/haarcascades/{name}', f'/usr/local/share/opencv4/haarcascades/{name}']
+        return candidates
+    
+    @property
+    def cascade_path(self) -> str:
+        """Path of a Haar cascade that loads"""
+        if self._cascade_path is None:
+            with self.lock:
+                if self._cascade_path is None:
+                    candidates = self._cascade_candidates()
+                    path = next((path for path in candidates if os.path.exists(path)), None)
+                    if path is None:
+                        raise FaceModelError(f"Haar cascade not found, looked in: {', '.join(candidates)}. "
+                                             f"Run `python face_detector.py --download-models` to bundle it.")
+                    if cv2.CascadeClassifier(path).empty():
+                        raise FaceModelError(f"Haar cascade {path} could not be loaded")
+                    logger.info(f"Face cascade: {path}")
+                    self._cascade_path = path
+        return self._cascade_path
+    
+    @property
+    def dnn_model(self) -> Tuple[str, str]:
+        """(prototxt, weights) paths of a DNN face model that loads"""
+        if self._dnn_model is None:
+            with self.lock:
+                if self._dnn_model is None:
+                    paths = tuple(os.path.join(self.model_dir, name)
+                                  for name in (Config.DNN_FACE_PROTOTXT, Config.DNN_FACE_MODEL))
+                    missing = [path for path in paths if not os.path.exists(path)]
+                    if missing:
+                        raise FaceModelError(f"DNN face model not found: {', '.join(missing)}. "
+                                             f"Run `python face_detector.py --download-models` to bundle it.")
+                    try:
+                        cv2.dnn.readNetFromCaffe(*paths)
+                    except Exception as e:
+                        raise FaceModelError(f"DNN face model {paths[1]} could not be loaded: {str(e)}")
+                    logger.info(f"DNN face model: {paths[1]}")
+                    self._dnn_model = paths
+        return self._dnn_model
+    
+    def require(self, engine: str = None):
+        """Resolve every file the engine needs, raising FaceModelError if any is unusable"""
+        engine = engine or Config.FACE_DETECTION_ENGINE
+        if engine not in self.ENGINES:
+            raise FaceModelError(f"Unknown face detection engine '{engine}', expected one of {', '.join(self.ENGINES)}")
+        self.cascade_path
+        if engine == 'dnn':
+            self.dnn_model
+
+
+_face_models = None
+_face_models_lock = threading.Lock()
+
+
+def get_face_models() -> FaceModelRegistry:
+    """Return the process-wide face model registry"""
+    global _face_models
+    if _face_models is None:
+        with _face_models_lock:
+            if _face_models is None:
+                _face_models = FaceModelRegistry()
+    return _face_models
+
+
+def download_face_models(model_dir: str = None) -> List[str]:
+    """Fetch missing model files into the model directory; a build step, not used at runtime"""
+    model_dir = os.path.join(APP_DIR, model_dir or Config.FACE_MODEL_DIR)
+    os.makedirs(model_dir, exist_ok=True)
+    
+    downloaded = []
+    for name, url in MODEL_URLS.items():
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            continue
+        response = requests.get(url, timeout=120)
+        response.raise_for_status()
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        downloaded.append(path)
+    return downloaded
+
+
+_detection_pool = None
+_detection_pool_engine = None
+_detection_pool_lock = threading.Lock()
+_detection_pool_restarts = 0
+
+
+def get_detection_pool(cascade_path: str, dnn_model: Tuple[str, str] = None) -> Tuple[Executor, str]:
+    """
+    Return the process-wide face detection pool and its engine ('process' or 'thread').
+    Worker processes give true multi-core detection; threads are the fallback where
+    processes are disabled or cannot be started (e.g. serverless runtimes), and once
+    FACE_DETECTION_MAX_RESTARTS process pools have broken.
+    """
+    global _detection_pool, _detection_pool_engine
+    if _detection_pool is None:
+        with _detection_pool_lock:
+            if _detection_pool is None:
+                workers = Config.FACE_DETECTION_WORKERS
+                if (Config.FACE_DETECTION_PROCESSES and workers > 1
+                        and _detection_pool_restarts <= Config.FACE_DETECTION_MAX_RESTARTS):
+                    try:
+                        # spawn, not fork: the parent runs request and analysis threads
+                        _detection_pool = ProcessPoolExecutor(
+                            max_workers=workers,
+                            mp_context=multiprocessing.get_context('spawn'),
+                            initializer=_init_detection_worker,
+                            initargs=(cascade_path, dnn_model)
+                        )
+                        _detection_pool_engine = 'process'
+                    except Exception as e:
+                        logger.error(f"Error starting face detection processes, using threads: {str(e)}")
+                if _detection_pool is None:
+                    _detection_pool = ThreadPoolExecutor(max_workers=workers)
+                    _detection_pool_engine = 'thread'
+                logger.info(f"Face detection pool: {workers} {_detection_pool_engine} workers")
+    return _detection_pool, _detection_pool_engine
+
+
+def reset_detection_pool(broken: Executor):
+    """
+    Drop a detection pool whose worker process died (BrokenProcessPool), so the next
+    get_detection_pool call starts a new one. A pool already replaced is left alone.
+    """
+    global _detection_pool, _detection_pool_engine, _detection_pool_restarts
+    with _detection_pool_lock:
+        if _detection_pool is not broken:
+            return
+        _detection_pool = None
+        _detection_pool_engine = None
+        _detection_pool_restarts += 1
+    logger.warning(f"Face detection worker died, restarting the pool ({_detection_pool_restarts} restarts)")
+    broken.shutdown(wait=False)
+
+
+class FaceDetector:
+    def __init__(self, http_client: HTTPClient = None, cache: FaceResultCache = None, use_cache: bool = True,
+                 prefilter=None, engine: str = None):
+        models = get_face_models()
+        self.engine = engine or Config.FACE_DETECTION_ENGINE
+        models.require(self.engine)
+        self.cascade_path = models.cascade_path
+        self.dnn_model = models.dnn_model if self.engine == 'dnn' else None
+        self.http = http_client or get_http_client()
+        self.cache = cache if cache is not None else get_face_cache()
+        self.use_cache = use_cache
+        self.prefilter = prefilter if prefilter is not None else get_prefilter()
+        self.prefilter_disabled = False
+        self.stats = {
+            'images': 0, 'seconds': 0.0, 'cascade_runs': 0, 'cascade_seconds': 0.0,
+            'bytes_downloaded': 0, 'downloads': 0, 'escalated': 0,
+            'video_hits': 0, 'hash_hits': 0, 'misses': 0, 'phash_checked': 0, 'phash_hits': 0,
+            'channels': 0, 'channel_thumbnails': 0, 'channel_thumbnails_scanned': 0, 'channels_stopped_early': 0,
+            'prefilter_checked': 0, 'prefilter_skipped': 0, 'prefilter_audited': 0, 'prefilter_agreed': 0
+        }
+        self._stats_lock = threading.Lock()
+    
+    def get_engine_key(self, multires: bool = False, threshold: float = None) -> str:
+        """Signature of the detector and its parameters; cached results from other engines are ignored"""
+        def describe(params):
+            return ','.join(f"{name}={value}" for name, value in sorted(params.items()))
+        
+        cascade = os.path.basename(self.cascade_path)
+        if self.engine == 'dnn':
+            key = f"dnn-ssd:{os.path.basename(self.dnn_model[1])}:size={DNN_INPUT_SIZE[0]},min_score={Config.DNN_MIN_SCORE}"
+        elif not multires:
+            key = f"haar:{cascade}:{describe(HAAR_PARAMS)}"
+        else:
+            # Whether a coarse result was final depends on the threshold and margin
+            key = (f"haar-c2f:{cascade}:{describe(COARSE_HAAR_PARAMS)}|{describe(FINE_HAAR_PARAMS)}"
+                   f"|threshold={threshold},margin={Config.FACE_ESCALATION_MARGIN}")
+        if self.prefilter is not None:
+            key += f"|prefilter={self.prefilter.signature}"
+        return key
     
-    def _load_cascade(self):
-        """Load the Haar cascade classifier"""
+    def uses_multires(self, coarse_available: bool) -> bool:
+        """Whether a scan with coarse thumbnails available takes the coarse-to-fine path"""
+        return bool(Config.FACE_DETECTION_MULTIRES and coarse_available and self.engine == 'haar')
+    
+    def counts_as_face(self, result: Tuple[bool, float], threshold: float) -> bool:
+        """
+        Whether a detection result counts as a face. The threshold is calibrated on Haar
+        confidences; a DNN detection already passed its own cut-off, DNN_MIN_SCORE.
+        """
+        has_face, confidence = result
+        if self.engine == 'dnn':
+            return has_face
+        return has_face and confidence > threshold
+    
+    def _get_cascade(self) -> cv2.CascadeClassifier:
+        """Per-thread classifier, so detection workers never share one cascade instance"""
+        return _worker_cascade(self.cascade_path)
+    
+    def _record_stats(self, **counts):
+        with self._stats_lock:
+            for name, value in counts.items():
+                self.stats[name] += value
+    
+    def get_stats(self) -> Dict:
+        """
+        Detection engine, worker count, throughput in images/sec and result cache hit rate.
+        The pool is reported as None until a detection has started it.
+        """
+        pool_engine = _detection_pool_engine
+        with self._stats_lock:
+            stats = dict(self.stats)
+        hits = stats['video_hits'] + stats['hash_hits']
+        lookups = hits + stats['misses']
+        return {
+            'engine': self.engine,
+            'pool': pool_engine,
+            'workers': Config.FACE_DETECTION_WORKERS,
+            'multires': Config.FACE_DETECTION_MULTIRES and self.engine == 'haar',
+            'images': stats['images'],
+            'seconds': round(stats['seconds'], 3),
+            'images_per_sec': round(stats['images'] / stats['seconds'], 1) if stats['seconds'] > 0 else 0.0,
+            'cascade_ms_per_image': (round(stats['cascade_seconds'] * 1000 / stats['images'], 2)
+                                     if stats['images'] else 0.0),
+            'kb_per_image': round(stats['bytes_downloaded'] / 1024 / stats['images'], 1) if stats['images'] else 0.0,
+            'escalated': stats['escalated'],
+            'prefilter': {
+                'name': self.prefilter.name if self.prefilter is not None else None,
+                'checked': stats['prefilter_checked'],
+                'skipped': stats['prefilter_skipped'],
+                'skip_rate': stats['prefilter_skipped'] / stats['prefilter_checked'] if stats['prefilter_checked'] else 0.0,
+                'audited': stats['prefilter_audited'],
+                'agreement': (stats['prefilter_agreed'] / stats['prefilter_audited']
+                              if stats['prefilter_audited'] else None),
+                'disabled': self.prefilter_disabled
+            },
+            'cache': {
+                'hits': hits,
+                'video_hits': stats['video_hits'],
+                'hash_hits': stats['hash_hits'],
+                'misses': stats['misses'],
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'enabled': bool(self.cache and self.use_cache)
+            },
+            'channels': {
+                'checked': stats['channels'],
+                'thumbnails': stats['channel_thumbnails'],
+                'scanned': stats['channel_thumbnails_scanned'],
+                'stopped_early': stats['channels_stopped_early']
+            },
+            'dedupe': {
+                'enabled': Config.FACE_PHASH_DEDUPE,
+                'checked': stats['phash_checked'],
+                'hits': stats['phash_hits'],
+                'ratio': stats['phash_hits'] / stats['phash_checked'] if stats['phash_checked'] else 0.0
+            }
+        }
+    
+    def _download_image(self, image_url: str) -> Optional[bytes]:
+        """Download a thumbnail through the pooled client; None on failure or timeout"""
         try:
-            if self.cascade_path and os.path.exists(self.cascade_path):
-                self.face_cascade = cv2.CascadeClassifier(self.cascade_path)
-                logger.info("Face cascade loaded successfully")
-            else:
-                logger.warning("Face cascade file not found")
+            response = self.http.get(image_url, timeout=Config.THUMBNAIL_TIMEOUT,
+                                     max_retries=Config.THUMBNAIL_MAX_RETRIES)
+            return response.content
         except Exception as e:
-            logger.error(f"Error loading face cascade: {str(e)}")
+            logger.error(f"Error downloading thumbnail {image_url}: {str(e)}")
+            return None
+    
+    def _download_thumbnail(self, image_url: str, with_phash: bool = False) -> Tuple[Optional[bytes], Optional[int]]:
+        """Download a thumbnail and, on request, its perceptual hash (computed on the I/O thread)"""
+        content = self._download_image(image_url)
+        phash = None
+        if content is not None and with_phash:
+            try:
+                phash = dhash_bytes(content)
+            except Exception as e:
+                logger.error(f"Error hashing thumbnail {image_url}: {str(e)}")
+        return content, phash
     
     def detect_faces_in_url(self, image_url: str) -> Tuple[bool, float]:
         """
@@ -66,97 +521,438 @@ class FaceDetector:
         Returns: (has_face, confidence_score)
         """
         try:
-            if not self.face_cascade:
-                logger.warning("Face cascade not loaded, returning False")
-                return False, 0.0
-            
-            # Download image
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-            
-            # Convert to numpy array
-            image_array = np.asarray(bytearray(response.content), dtype=np.uint8)
-            image = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
-            
-            if image is None:
-                logger.warning(f"Could not decode image from URL: {image_url}")
+            content = self._download_image(image_url)
+            if content is None:
                 return False, 0.0
             
-            return self.detect_faces_in_image(image)
+            if self.engine == 'dnn':
+                outcomes, _ = _timed_dnn_batch_task(self.dnn_model, [content])
+                return outcomes[0][0] or (False, 0.0)
+            return _detect_bytes_task(self.cascade_path, content)
             
         except Exception as e:
             logger.error(f"Error detecting faces in URL {image_url}: {str(e)}")
             return False, 0.0
     
-    def detect_faces_in_image(self, image: np.ndarray) -> Tuple[bool, float]:
+    def detect_faces_in_urls(self, image_urls: List[str],
+                             on_progress: Optional[Callable[[int, int], None]] = None,
+                             video_ids: Optional[List[str]] = None,
+                             coarse_urls: Optional[List[str]] = None,
+                             threshold: float = None) -> List[Tuple[bool, float]]:
         """
-        Detect faces in an image array
-        Returns: (has_face, confidence_score)
+        Detect faces in many thumbnails concurrently.
+        Downloads run on a bounded I/O pool and decoding/detection on the shared detection
+        pool. Results are returned in input order; a failed or timed-out download yields
+        (False, 0.0) without holding up the rest.
+        
+        With video_ids, the result cache is consulted before downloading, and downloaded
+        thumbnails whose bytes were already scanned reuse that result.
+        
+        With coarse_urls (smaller thumbnails) and FACE_DETECTION_MULTIRES, each video gets a
+        fast pass on the small image first; only confidences within FACE_ESCALATION_MARGIN
+        of the threshold are re-checked on the full image with finer scale steps.
+        
+        The pre-filter screens each thumbnail's first pass. A sample of its skips is audited
+        against the cascade, and it is switched off for the session once audited false
+        negatives exceed FACE_PREFILTER_FN_BUDGET.
+        
+        The DNN engine scans the full thumbnail and groups decoded images into batches of
+        DNN_BATCH_SIZE, one forward pass each.
+        
+        With FACE_PHASH_DEDUPE, a first-pass thumbnail within FACE_PHASH_MAX_DISTANCE bits
+        (dHash) of one already scanned by this engine reuses its result. The hash index
+        persists in the result cache when caching is on, otherwise it lasts for the call.
+        
+        If a detection worker process dies, the pool is replaced and each task it lost is
+        retried once.
         """
-        try:
-            if self.face_cascade is None:
-                return False, 0.0
+        total = len(image_urls)
+        results = [(False, 0.0)] * total
+        
+        if total == 0:
+            return results
+        
+        threshold = threshold if threshold is not None else Config.DEFAULT_PARAMS['face_detection_threshold']
+        multires = self.uses_multires(bool(coarse_urls))
+        cache = self.cache if self.use_cache and video_ids else None
+        engine_key = self.get_engine_key(multires, threshold)
+        cached = cache.get_by_video(list(set(video_ids)), engine_key) if cache else {}
+        content_hashes = {}
+        new_entries = []
+        dedupe = Config.FACE_PHASH_DEDUPE
+        phash_index = (get_phash_index(engine_key, cache) if cache else PerceptualHashIndex()) if dedupe else None
+        phashes = {}  # index -> perceptual hash of a first-pass thumbnail that was not deduplicated
+        new_phashes = []
+        phase = {}  # 'coarse', 'fine' or 'single' per index
+        pass_params = {
+            'coarse': (COARSE_HAAR_PARAMS, REFERENCE_FRAME),
+            'fine': (FINE_HAAR_PARAMS, REFERENCE_FRAME),
+            'single': (HAAR_PARAMS, None)
+        }
+        counts = {'done': 0, 'images': 0, 'cascade_runs': 0, 'cascade_seconds': 0.0,
+                  'bytes_downloaded': 0, 'downloads': 0, 'escalated': 0, 'hash_hits': 0,
+                  'phash_checked': 0, 'phash_hits': 0,
+                  'prefilter_checked': 0, 'prefilter_skipped': 0, 'prefilter_audited': 0, 'prefilter_agreed': 0}
+        screened = {}  # index -> thumbnail bytes of a first pass submitted with the pre-filter
+        audits = set()
+        started = time.perf_counter()
+        pool = {'detections': None}  # started by the first detection task, so cache hits never start it
+        
+        with ThreadPoolExecutor(max_workers=Config.THUMBNAIL_DOWNLOAD_WORKERS) as downloads:
+            stage = {}
+            pending = set()
+            tasks = {}  # detection future -> (pool, task, args), to retry it if its worker dies
+            retried = set()
+            dnn_batch = []  # (index, content, screened, audited) awaiting a forward pass
+            in_flight = {'downloads': 0}
             
-            # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            def submit(kind, i, future):
+                stage[future] = (kind, i)
+                pending.add(future)
+                if kind == 'download':
+                    in_flight['downloads'] += 1
             
-            # Detect faces
-            faces = self.face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
-            )
+            def submit_task(kind, i, task, *args):
+                executor = pool['detections'] or get_detection_pool(self.cascade_path, self.dnn_model)[0]
+                pool['detections'] = executor
+                try:
+                    future = executor.submit(task, *args)
+                except BrokenProcessPool:
+                    reset_detection_pool(executor)
+                    executor = pool['detections'] = get_detection_pool(self.cascade_path, self.dnn_model)[0]
+                    future = executor.submit(task, *args)
+                tasks[future] = (executor, task, args)
+                submit(kind, i, future)
+            
+            def retry_task(future, kind, i):
+                """Resubmit a task lost with its worker process; False if it was already retried"""
+                executor, task, args = tasks.pop(future)
+                key = tuple(i) if kind == 'batch' else (i, phase[i])
+                if key in retried:
+                    return False
+                retried.add(key)
+                reset_detection_pool(executor)
+                pool['detections'] = get_detection_pool(self.cascade_path, self.dnn_model)[0]
+                submit_task(kind, i, task, *args)
+                return True
+            
+            def submit_detection(i, content, prefilter=None, audit=False):
+                if self.engine == 'dnn':
+                    dnn_batch.append((i, content, prefilter is not None, audit))
+                    return
+                params, reference_frame = pass_params[phase[i]]
+                submit_task('detect', i, _timed_detect_task, self.cascade_path, content,
+                            params, reference_frame, prefilter, audit)
             
-            has_face = len(faces) > 0
+            def flush_dnn_batch():
+                batch = dnn_batch[:Config.DNN_BATCH_SIZE]
+                del dnn_batch[:Config.DNN_BATCH_SIZE]
+                screens = [screen for _, _, screen, _ in batch]
+                submit_task('batch', [i for i, _, _, _ in batch], _timed_dnn_batch_task, self.dnn_model,
+                            [content for _, content, _, _ in batch], self.prefilter if any(screens) else None,
+                            screens, [audit for _, _, _, audit in batch])
             
-            if has_face:
-                # Calculate confidence based on face size relative to image
-                image_area = gray.shape[0] * gray.shape[1]
-                total_face_area = sum(w * h for (x, y, w, h) in faces)
-                face_ratio = total_face_area / image_area
+            def handle_detection(i, result, seconds, prefiltered):
+                counts['cascade_seconds'] += seconds
+                if result is None:
+                    # Undecodable thumbnail or failed forward pass: nothing to count or cache
+                    finish(i)
+                    return
+                if prefiltered is not None:
+                    counts['prefilter_checked'] += 1
+                    counts['prefilter_skipped'] += prefiltered
+                if prefiltered and i not in audits:
+                    if self.prefilter_disabled:
+                        # Skipped before the pre-filter was switched off: run the detector after all
+                        submit_detection(i, screened[i])
+                        return
+                    counts['images'] += 1
+                    finish(i, result)
+                    return
+                counts['cascade_runs'] += 1
                 
-                # Confidence score based on face prominence
-                confidence = min(1.0, face_ratio * 10)  # Scale to 0-1
-            else:
-                confidence = 0.0
+                if prefiltered:
+                    # Audited skip: did the detector agree there is no face that counts?
+                    counts['prefilter_audited'] += 1
+                    counts['prefilter_agreed'] += not self.counts_as_face(result, threshold)
+                    self._check_prefilter_budget(counts)
+                
+                if phase[i] == 'coarse' and image_urls[i] and abs(result[1] - threshold) <= Config.FACE_ESCALATION_MARGIN:
+                    # Too close to call on the small image
+                    phase[i] = 'fine'
+                    counts['escalated'] += 1
+                    submit('download', i, downloads.submit(self._download_thumbnail, image_urls[i]))
+                    return
+                
+                counts['images'] += 1
+                finish(i, result)
             
-            return has_face, confidence
+            def finish(i, result=None):
+                if i in screened:
+                    screened[i] = None
+                if result is not None:
+                    results[i] = result
+                    if cache:
+                        new_entries.append((video_ids[i], content_hashes[i]) + tuple(result))
+                    if i in phashes:
+                        phash_index.add(phashes[i], result)
+                        new_phashes.append((phashes[i],) + tuple(result))
+                counts['done'] += 1
+                if on_progress:
+                    on_progress(counts['done'], total)
+            
+            for i, url in enumerate(image_urls):
+                if cache and video_ids[i] in cached:
+                    results[i] = cached[video_ids[i]]
+                    counts['done'] += 1
+                elif multires and coarse_urls[i]:
+                    phase[i] = 'coarse'
+                    submit('download', i, downloads.submit(self._download_thumbnail, coarse_urls[i], dedupe))
+                elif url:
+                    phase[i] = 'fine' if multires else 'single'
+                    submit('download', i, downloads.submit(self._download_thumbnail, url, dedupe))
+                else:
+                    counts['done'] += 1
+            
+            while pending or dnn_batch:
+                # Fill batches while downloads can still top them up
+                while dnn_batch and (len(dnn_batch) >= Config.DNN_BATCH_SIZE or not in_flight['downloads']):
+                    flush_dnn_batch()
+                
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                
+                for future in finished:
+                    pending.discard(future)
+                    kind, i = stage.pop(future)
+                    
+                    if kind == 'batch':
+                        try:
+                            outcomes, seconds = future.result()
+                        except Exception as e:
+                            if isinstance(e, BrokenProcessPool) and retry_task(future, kind, i):
+                                continue
+                            tasks.pop(future, None)
+                            logger.error(f"Error detecting faces in DNN batch: {str(e)}")
+                            for index in i:
+                                finish(index)
+                            continue
+                        tasks.pop(future, None)
+                        for index, (result, prefiltered) in zip(i, outcomes):
+                            handle_detection(index, result, seconds / len(i), prefiltered)
+                        continue
+                    
+                    if kind == 'download':
+                        in_flight['downloads'] -= 1
+                        content, phash = future.result()
+                        if content is None:
+                            if phase[i] == 'coarse' and image_urls[i]:
+                                # Small thumbnail unavailable: go straight to the full one
+                                phase[i] = 'fine'
+                                submit('download', i, downloads.submit(self._download_thumbnail, image_urls[i], dedupe))
+                            else:
+                                finish(i)
+                            continue
+                        
+                        counts['downloads'] += 1
+                        counts['bytes_downloaded'] += len(content)
+                        
+                        if cache and i not in content_hashes:
+                            content_hashes[i] = hashlib.sha1(content).hexdigest()
+                            known = cache.get_by_hash(content_hashes[i], engine_key)
+                            if known is not None:
+                                counts['hash_hits'] += 1
+                                finish(i, known)
+                                continue
+                        
+                        if phash is not None and i not in phashes:
+                            counts['phash_checked'] += 1
+                            match = phash_index.find(phash)
+                            if match is not None:
+                                # Near-identical to a thumbnail already scanned (reupload, channel template)
+                                counts['phash_hits'] += 1
+                                finish(i, match[0])
+                                continue
+                            phashes[i] = phash
+                        
+                        prefilter = None
+                        if i not in screened and self.prefilter is not None and not self.prefilter_disabled:
+                            prefilter = self.prefilter
+                            screened[i] = content
+                            if random.random() < Config.FACE_PREFILTER_AUDIT_RATE:
+                                audits.add(i)
+                        submit_detection(i, content, prefilter, i in audits)
+                        continue
+                    
+                    try:
+                        result, seconds, prefiltered = future.result()
+                    except Exception as e:
+                        if isinstance(e, BrokenProcessPool) and retry_task(future, kind, i):
+                            continue
+                        tasks.pop(future, None)
+                        logger.error(f"Error detecting faces in {image_urls[i]}: {str(e)}")
+                        finish(i)
+                        continue
+                    
+                    tasks.pop(future, None)
+                    handle_detection(i, result, seconds, prefiltered)
+        
+        if cache:
+            cache.set_many(new_entries, engine_key)
+            cache.set_phashes(new_phashes, engine_key)
+        
+        video_hits = sum(1 for video_id in video_ids if video_id in cached) if cache else 0
+        self._record_stats(images=counts['images'], seconds=time.perf_counter() - started,
+                           cascade_runs=counts['cascade_runs'], cascade_seconds=counts['cascade_seconds'],
+                           bytes_downloaded=counts['bytes_downloaded'], downloads=counts['downloads'],
+                           escalated=counts['escalated'], video_hits=video_hits,
+                           hash_hits=counts['hash_hits'], misses=counts['images'],
+                           phash_checked=counts['phash_checked'], phash_hits=counts['phash_hits'],
+                           prefilter_checked=counts['prefilter_checked'],
+                           prefilter_skipped=counts['prefilter_skipped'],
+                           prefilter_audited=counts['prefilter_audited'],
+                           prefilter_agreed=counts['prefilter_agreed'])
+        return results
+    
+    def _check_prefilter_budget(self, counts: Dict):
+        """Switch the pre-filter off once audited false negatives exceed the budget"""
+        with self._stats_lock:
+            audited = self.stats['prefilter_audited'] + counts['prefilter_audited']
+            missed = audited - self.stats['prefilter_agreed'] - counts['prefilter_agreed']
+        
+        if audited >= Config.FACE_PREFILTER_MIN_AUDITS and missed / audited > Config.FACE_PREFILTER_FN_BUDGET:
+            if not self.prefilter_disabled:
+                logger.warning(f"Face pre-filter missed {missed}/{audited} audited faces, disabling it")
+            self.prefilter_disabled = True
+    
+    def detect_faces_in_images(self, images: List[np.ndarray]) -> List[Tuple[bool, float]]:
+        """
+        Detect faces in a batch of image arrays across all detection workers
+        Returns: [(has_face, confidence_score)] in input order
+        """
+        if not images:
+            return []
+        
+        try:
+            pool, engine = get_detection_pool(self.cascade_path, self.dnn_model)
+            try:
+                return self._detect_images(pool, engine, images)
+            except BrokenProcessPool:
+                # A worker process died: replace the pool and retry the batch once
+                reset_detection_pool(pool)
+                pool, engine = get_detection_pool(self.cascade_path, self.dnn_model)
+                return self._detect_images(pool, engine, images)
+            
+        except Exception as e:
+            logger.error(f"Error detecting faces in image batch: {str(e)}")
+            return [(False, 0.0)] * len(images)
+    
+    def _detect_images(self, pool: Executor, engine: str, images: List[np.ndarray]) -> List[Tuple[bool, float]]:
+        if self.engine == 'dnn':
+            return self._detect_dnn_batches(pool, images)
+        
+        # Batch images per task so process workers are not dominated by IPC overhead
+        chunksize = max(1, len(images) // (Config.FACE_DETECTION_WORKERS * 4)) if engine == 'process' else 1
+        
+        started = time.perf_counter()
+        timed = list(pool.map(partial(_timed_detect_task, self.cascade_path), images, chunksize=chunksize))
+        self._record_stats(images=len(images), seconds=time.perf_counter() - started,
+                           cascade_runs=len(images), cascade_seconds=sum(seconds for _, seconds, _ in timed))
+        return [result or (False, 0.0) for result, _, _ in timed]
+    
+    def _detect_dnn_batches(self, pool: Executor, images: List[np.ndarray]) -> List[Tuple[bool, float]]:
+        """Split images into DNN_BATCH_SIZE forward passes spread over the detection workers"""
+        batches = [images[start:start + Config.DNN_BATCH_SIZE] for start in range(0, len(images), Config.DNN_BATCH_SIZE)]
+        
+        started = time.perf_counter()
+        timed = list(pool.map(partial(_timed_dnn_batch_task, self.dnn_model), batches))
+        self._record_stats(images=len(images), seconds=time.perf_counter() - started,
+                           cascade_runs=len(images), cascade_seconds=sum(seconds for _, seconds in timed))
+        return [result or (False, 0.0) for outcomes, _ in timed for result, _ in outcomes]
+    
+    def detect_faces_in_image(self, image: np.ndarray) -> Tuple[bool, float]:
+        """
+        Detect faces in an image array
+        Returns: (has_face, confidence_score)
+        """
+        try:
+            if self.engine == 'dnn':
+                faces = _detect_with_dnn(_worker_net(self.dnn_model), [image])[0]
+                return bool(faces), max((score for _, score in faces), default=0.0)
+            
+            return _detect_with_cascade(self._get_cascade(), image)
             
         except Exception as e:
             logger.error(f"Error detecting faces in image: {str(e)}")
             return False, 0.0
     
-    def analyze_channel_thumbnails(self, video_thumbnails: list) -> Tuple[float, int]:
+    def analyze_channel_thumbnails(self, video_thumbnails: list, video_ids: Optional[List[str]] = None,
+                                   max_face_percentage: float = None,
+                                   threshold: float = None,
+                                   coarse_urls: Optional[List[str]] = None) -> Tuple[float, float, int]:
         """
         Analyze multiple thumbnails to determine if channel is faceless
-        Returns: (average_face_confidence, face_percentage)
+        With max_face_percentage, thumbnails are scanned in rounds (cached results first) and
+        scanning stops as soon as the channel is clearly above or below that percentage.
+        coarse_urls are passed on to detect_faces_in_urls, so results share the per-video cache.
+        Returns: (average_face_confidence, face_percentage, thumbnails_scanned), over the scanned sample
         """
         try:
-            if not video_thumbnails:
-                return 0.0, 0
+            pairs = [(url, video_ids[i] if video_ids else None, coarse_urls[i] if coarse_urls else '')
+                     for i, url in enumerate(video_thumbnails) if url]
+            if not pairs:
+                return 0.0, 0, 0
             
-            total_confidence = 0.0
-            face_count = 0
-            analyzed_count = 0
+            threshold = threshold if threshold is not None else Config.DEFAULT_PARAMS['face_detection_threshold']
             
-            for thumbnail_url in video_thumbnails:
-                if thumbnail_url:
-                    has_face, confidence = self.detect_faces_in_url(thumbnail_url)
-                    total_confidence += confidence
-                    if has_face and confidence > Config.DEFAULT_PARAMS['face_detection_threshold']:
-                        face_count += 1
-                    analyzed_count += 1
+            # Cheap first: thumbnails with a cached result cost nothing to check
+            cached = set()
+            if self.cache and self.use_cache and video_ids:
+                engine_key = self.get_engine_key(self.uses_multires(bool(coarse_urls)), threshold)
+                cached = set(self.cache.get_by_video([video_id for _, video_id, _ in pairs], engine_key))
+            order = sorted(range(len(pairs)), key=lambda i: pairs[i][1] not in cached)
             
-            if analyzed_count == 0:
-                return 0.0, 0
+            def detect(indices):
+                return self.detect_faces_in_urls([pairs[i][0] for i in indices],
+                                                 video_ids=[pairs[i][1] for i in indices] if video_ids else None,
+                                                 coarse_urls=[pairs[i][2] for i in indices] if coarse_urls else None,
+                                                 threshold=threshold)
+            
+            results, decision = sequential_face_scan(
+                detect, order, lambda result: self.counts_as_face(result, threshold),
+                max_face_ratio=max_face_percentage / 100 if max_face_percentage is not None else None,
+                first_round=max(len(cached), Config.CHANNEL_SAMPLE_ROUND)
+            )
+            
+            analyzed_count = len(results)
+            self._record_stats(channels=1, channel_thumbnails=len(pairs), channel_thumbnails_scanned=analyzed_count,
+                               channels_stopped_early=int(analyzed_count < len(pairs)))
+            
+            total_confidence = sum(confidence for _, confidence in results.values())
+            face_count = sum(1 for result in results.values() if self.counts_as_face(result, threshold))
             
             avg_confidence = total_confidence / analyzed_count
             face_percentage = (face_count / analyzed_count) * 100
             
-            logger.info(f"Analyzed {analyzed_count} thumbnails: {face_percentage:.1f}% contain faces")
-            return avg_confidence, face_percentage
+            logger.info(f"Analyzed {analyzed_count}/{len(pairs)} thumbnails ({decision}): "
+                        f"{face_percentage:.1f}% contain faces")
+            return avg_confidence, face_percentage, analyzed_count
             
         except Exception as e:
             logger.error(f"Error analyzing channel thumbnails: {str(e)}")
-            return 0.0, 0
+            return 0.0, 0, 0
+
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Bundle and check the face detection model files')
+    parser.add_argument('--download-models', action='store_true', help='Fetch missing files into FACE_MODEL_DIR')
+    parser.add_argument('--engine', default=None, help="Engine to check ('haar' or 'dnn')")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    if args.download_models:
+        for path in download_face_models():
+            print(f"Downloaded {path}")
+    get_face_models().require(args.engine)
+    print("Face models OK")
@@ -0,0 +1,69 @@
+import numpy as np
+from typing import Dict
+from config import Config
+
+
+class ThumbnailPrefilter:
+    """
+    Cheap NumPy screen run on decoded thumbnails before the face cascade.
+    Flags images that cannot contain a face large enough to matter: almost no skin-tone
+    pixels, flat graphics (low colour entropy) or walls of text/UI (very high edge density).
+    """
+
+    name = 'skin-entropy-edges'
+
+    def __init__(self, min_skin_ratio: float = None, min_entropy: float = None, max_edge_density: float = None):
+        self.min_skin_ratio = min_skin_ratio if min_skin_ratio is not None else Config.FACE_PREFILTER_MIN_SKIN_RATIO
+        self.min_entropy = min_entropy if min_entropy is not None else Config.FACE_PREFILTER_MIN_ENTROPY
+        self.max_edge_density = (max_edge_density if max_edge_density is not None
+                                 else Config.FACE_PREFILTER_MAX_EDGE_DENSITY)
+
+    @property
+    def signature(self) -> str:
+        return (f"{self.name}:skin={self.min_skin_ratio},entropy={self.min_entropy},"
+                f"edges={self.max_edge_density}")
+
+    def features(self, image: np.ndarray) -> Dict[str, float]:
+        """Skin-tone pixel ratio, colour histogram entropy (bits) and edge density of a BGR image"""
+        # Every other pixel is plenty for global statistics
+        sample = image[::2, ::2]
+        pixels = sample.astype(np.float32)
+        blue, green, red = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+
+        # Skin tones in YCrCb (Chai & Ngan ranges), ignoring very dark pixels
+        luma = 0.299 * red + 0.587 * green + 0.114 * blue
+        cr = (red - luma) * 0.713 + 128
+        cb = (blue - luma) * 0.564 + 128
+        skin = (cr >= 133) & (cr <= 173) & (cb >= 77) & (cb <= 127) & (luma > 40)
+
+        # Entropy of a 512-bin colour histogram (3 bits per channel)
+        quantized = (sample >> 5).astype(np.int32)
+        bins = (quantized[..., 0] << 6) | (quantized[..., 1] << 3) | quantized[..., 2]
+        probabilities = np.bincount(bins.ravel(), minlength=512) / bins.size
+        probabilities = probabilities[probabilities > 0]
+        entropy = float(-(probabilities * np.log2(probabilities)).sum())
+
+        # Share of pixels on a strong luminance edge
+        gradient = np.abs(np.diff(luma, axis=1))[:-1, :] + np.abs(np.diff(luma, axis=0))[:, :-1]
+        edge_density = float((gradient > 48).mean()) if gradient.size else 0.0
+
+        return {'skin_ratio': float(skin.mean()), 'entropy': entropy, 'edge_density': edge_density}
+
+    def is_faceless(self, image: np.ndarray) -> bool:
+        """True when the thumbnail can safely skip the cascade"""
+        features = self.features(image)
+        return (features['skin_ratio'] < self.min_skin_ratio or
+                features['entropy'] < self.min_entropy or
+                features['edge_density'] > self.max_edge_density)
+
+
+PREFILTERS = {
+    'skin': ThumbnailPrefilter
+}
+
+
+def get_prefilter(name: str = None):
+    """Build the configured pre-filter, or None when disabled ('none' or unknown)"""
+    name = name if name is not None else Config.FACE_PREFILTER
+    prefilter_class = PREFILTERS.get(name)
+    return prefilter_class() if prefilter_class else None
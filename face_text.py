@@ -0,0 +1,94 @@
+import re
+import logging
+import threading
+from typing import Dict, List, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+FACE_KEYWORDS = [
+    'face', 'eyes', 'smile', 'person', 'man', 'woman', 'guy', 'girl',
+    'selfie', 'portrait', 'headshot', 'closeup', 'talking', 'speaking'
+]
+
+FACELESS_KEYWORDS = [
+    'screen', 'text', 'animation', 'cartoon', 'logo', 'graphic',
+    'chart', 'diagram', 'map', 'game', 'code', 'tutorial', 'how to',
+    'facts', 'tips', 'ai generated', 'voiceover', 'narration'
+]
+
+
+class FaceTextScorer:
+    """
+    Face likelihood of a video from its title and description.
+    All keywords are compiled into one alternation, so a text is scanned once no matter
+    how many keywords there are; matches are whole words (plurals included).
+    """
+
+    def __init__(self, face_keywords: List[str] = None, faceless_keywords: List[str] = None):
+        self.kinds = {}
+        for keyword in faceless_keywords if faceless_keywords is not None else FACELESS_KEYWORDS:
+            self.kinds[keyword] = 'faceless'
+        for keyword in face_keywords if face_keywords is not None else FACE_KEYWORDS:
+            self.kinds[keyword] = 'face'
+        # Longest first so multi-word keywords win over their prefixes
+        alternation = '|'.join(re.escape(keyword) for keyword in sorted(self.kinds, key=len, reverse=True))
+        self.pattern = re.compile(rf"\b({alternation})(?:s|es)?\b")
+
+    def count(self, text: str) -> Tuple[int, int]:
+        """(face, faceless) keyword occurrences in a text"""
+        counts = {'face': 0, 'faceless': 0}
+        for match in self.pattern.finditer(text.lower()):
+            counts[self.kinds[match.group(1)]] += 1
+        return counts['face'], counts['faceless']
+
+    def score(self, title: str, description: str = "") -> Tuple[float, int, int]:
+        """
+        Face probability from keyword balance (0.3 when neither kind appears)
+        Returns: (probability, face_hits, faceless_hits)
+        """
+        face_hits, faceless_hits = self.count(f"{title} {description}")
+        total = face_hits + faceless_hits
+        if total == 0:
+            return 0.3, 0, 0
+        return face_hits / total, face_hits, faceless_hits
+
+    def triage(self, texts: List[Tuple[str, str]],
+               threshold: float = None) -> Tuple[Dict[int, Tuple[bool, float]], List[int]]:
+        """
+        Decide clear-cut videos from (title, description) alone.
+        A video is faceless with at least FACE_TEXT_MIN_SIGNALS faceless keywords and a face
+        probability at most FACE_TEXT_FACELESS_MAX; it has a face with as many face keywords
+        and a probability at least FACE_TEXT_FACE_MIN that also clears the threshold.
+        Returns: ({index: (has_face, confidence)} decided from text, undecided indices ranked
+                 from most to least likely faceless) - only the latter need a thumbnail
+        """
+        threshold = threshold if threshold is not None else Config.DEFAULT_PARAMS['face_detection_threshold']
+        decided = {}
+        uncertain = []
+
+        for i, (title, description) in enumerate(texts):
+            probability, face_hits, faceless_hits = self.score(title or '', description or '')
+            if faceless_hits >= Config.FACE_TEXT_MIN_SIGNALS and probability <= Config.FACE_TEXT_FACELESS_MAX:
+                decided[i] = (False, 0.0)
+            elif (face_hits >= Config.FACE_TEXT_MIN_SIGNALS and probability >= Config.FACE_TEXT_FACE_MIN and
+                  probability > threshold):
+                decided[i] = (True, probability)
+            else:
+                uncertain.append((probability, i))
+
+        return decided, [i for _, i in sorted(uncertain)]
+
+
+_face_text_scorer = None
+_face_text_scorer_lock = threading.Lock()
+
+
+def get_face_text_scorer() -> FaceTextScorer:
+    """Return the process-wide scorer, compiled on first use"""
+    global _face_text_scorer
+    if _face_text_scorer is None:
+        with _face_text_scorer_lock:
+            if _face_text_scorer is None:
+                _face_text_scorer = FaceTextScorer()
+    return _face_text_scorer
@@ -0,0 +1,113 @@
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: throttling and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HTTPClient:
+    """
+    Pooled, keep-alive HTTP client shared by the analyzers.
+    Retries transient failures with jittered exponential backoff and honours Retry-After.
+    """
+
+    def __init__(self, timeout: float = None, max_retries: int = None,
+                 backoff_base: float = None, backoff_max: float = None, pool_size: int = None):
+        self.timeout = timeout if timeout is not None else Config.HTTP_TIMEOUT
+        self.max_retries = max_retries if max_retries is not None else Config.HTTP_MAX_RETRIES
+        self.backoff_base = backoff_base if backoff_base is not None else Config.HTTP_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else Config.HTTP_BACKOFF_MAX
+        pool_size = pool_size or Config.HTTP_POOL_SIZE
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url: str, params: Dict = None, timeout: float = None, max_retries: int = None) -> requests.Response:
+        """
+        GET a URL through the pooled session, retrying transient failures.
+        Raises the last error once retries are exhausted.
+        """
+        return self.request('GET', url, params=params, timeout=timeout, max_retries=max_retries)
+
+    def head(self, url: str, timeout: float = None, max_retries: int = None) -> requests.Response:
+        """HEAD a URL (headers only) through the pooled session, following redirects"""
+        return self.request('HEAD', url, timeout=timeout, max_retries=max_retries, allow_redirects=True)
+
+    def request(self, method: str, url: str, params: Dict = None, timeout: float = None,
+                max_retries: int = None, **kwargs) -> requests.Response:
+        """Send a request through the pooled session with retries and backoff"""
+        timeout = timeout if timeout is not None else self.timeout
+        max_retries = max_retries if max_retries is not None else self.max_retries
+        attempt = 0
+
+        while True:
+            try:
+                response = self.session.request(method, url, params=params, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"Request to {url} failed ({str(e)}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= max_retries:
+                    response.raise_for_status()
+                    return response
+                delay = self._retry_after_delay(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt)
+                logger.warning(f"Request to {url} returned {response.status_code}, retrying in {delay:.2f}s")
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    def get_json(self, url: str, params: Dict = None, timeout: float = None) -> Dict:
+        """GET a URL and decode the JSON body"""
+        return self.get(url, params=params, timeout=timeout).json()
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff: uniform in [0, base * 2^attempt], capped"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after_delay(self, response: requests.Response) -> Optional[float]:
+        """Parse a Retry-After header given either as seconds or as an HTTP date"""
+        retry_after = response.headers.get('Retry-After')
+        if not retry_after:
+            return None
+
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+
+        return min(self.backoff_max, max(0.0, delay))
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """Return the process-wide shared HTTP client, creating it on first use"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = HTTPClient()
+    return _shared_client
@@ -0,0 +1,346 @@
+"""
+Local stand-in for the YouTube Data API v3, for offline benchmarking and regression runs.
+
+Serves /search, /videos and /channels from a synthetic or recorded corpus, plus thumbnails
+(synthetic text cards, or real images from a directory), with tunable latency, error rate
+and result sizes. Point the analyzer at it with:
+
+    python mock_youtube_api.py --videos 10000 --channels 1000 --port 8765
+    YOUTUBE_API_BASE_URL=http://127.0.0.1:8765 python main.py
+"""
+import os
+import re
+import json
+import zlib
+import time
+import random
+import logging
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import urlparse, parse_qs
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = {'default': (120, 90), 'medium': (320, 180), 'high': (480, 360)}
+
+TOPIC_WORDS = sorted({word for query in Config.SEARCH_QUERIES for word in query.split()} |
+                     {'secret', 'trick', 'mind', 'ocean', 'robot', 'brain', 'planet', 'cooking', 'crypto'})
+
+
+def build_synthetic_corpus(n_videos: int = 1000, n_channels: int = 100, seed: int = 42) -> Dict:
+    """
+    Generate a corpus of API-shaped channel and video items.
+    Channel ages, upload counts and view counts are spread so every filter has work to do.
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    channels = []
+    videos = []
+
+    for i in range(n_channels):
+        # Young channels have few uploads, as in real scans; roughly 40% pass the channel filters
+        young = rng.random() < 0.4
+        created_at = now - timedelta(days=rng.randint(1, 30) if young else rng.randint(30, 3000))
+        channels.append({
+            'id': f'UC{i:08d}',
+            'snippet': {
+                'title': f'Channel {i}',
+                'publishedAt': created_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'thumbnails': {'default': {'url': f'/thumbnails/UC{i:08d}/default.jpg'}}
+            },
+            'statistics': {
+                'subscriberCount': str(int(rng.lognormvariate(8, 2))),
+                'videoCount': str(rng.randint(1, 20) if young else rng.randint(20, 2000)),
+                'viewCount': str(int(rng.lognormvariate(14, 2)))
+            }
+        })
+
+    for i in range(n_videos):
+        channel = channels[rng.randrange(n_channels)]
+        published_at = now - timedelta(seconds=rng.randint(3600, 30 * 86400))
+        views = int(rng.lognormvariate(11, 2))
+        title = ' '.join(rng.sample(TOPIC_WORDS, 4))
+        video_id = f'v{i:010d}'
+        videos.append({
+            'id': video_id,
+            'snippet': {
+                'title': title,
+                'description': f'{title} #shorts',
+                'channelId': channel['id'],
+                'channelTitle': channel['snippet']['title'],
+                'publishedAt': published_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'thumbnails': {
+                    size: {'url': f'/thumbnails/{video_id}/{size}.jpg'} for size in ('default', 'medium', 'high')
+                }
+            },
+            'contentDetails': {'duration': f'PT{rng.choice([rng.randint(5, 59), rng.randint(60, 240)])}S'},
+            'statistics': {
+                'viewCount': str(views),
+                'likeCount': str(int(views * rng.uniform(0, 0.12))),
+                'commentCount': str(int(views * rng.uniform(0, 0.01)))
+            }
+        })
+
+    return {'videos': videos, 'channels': channels}
+
+
+def load_corpus(path: str) -> Dict:
+    """Load a recorded corpus: {"videos": [videos.list items], "channels": [channels.list items]}"""
+    with open(path) as f:
+        return json.load(f)
+
+
+class MockYouTubeAPI:
+    """
+    Threaded HTTP server answering the subset of the Data API the analyzers use.
+    """
+
+    def __init__(self, corpus: Dict, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 max_search_results: int = 500, host: str = '127.0.0.1', port: int = 0, seed: int = 42,
+                 thumbnail_dir: str = None):
+        self.videos = {item['id']: item for item in corpus['videos']}
+        self.channels = {item['id']: item for item in corpus['channels']}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.max_search_results = max_search_results
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.request_counts = {}
+        self.thumbnail_files = sorted(
+            os.path.join(thumbnail_dir, name) for name in os.listdir(thumbnail_dir)
+            if name.lower().endswith(('.jpg', '.jpeg', '.png'))
+        ) if thumbnail_dir else []
+
+        # Inverted index from title word to video IDs, most viewed first
+        self.word_index = {}
+        for item in sorted(corpus['videos'], key=lambda v: -int(v['statistics'].get('viewCount', 0))):
+            for word in set(item['snippet']['title'].lower().split()):
+                self.word_index.setdefault(word, []).append(item['id'])
+
+        self.search_results = {}
+
+        # Uploads playlist (UU + channel ID suffix) to video IDs, newest first
+        self.uploads = {}
+        for item in sorted(corpus['videos'], key=lambda v: v['snippet']['publishedAt'], reverse=True):
+            self.uploads.setdefault('UU' + item['snippet']['channelId'][2:], []).append(item['id'])
+
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+        # Synthetic thumbnail URLs are relative to this server
+        for item in list(self.videos.values()) + list(self.channels.values()):
+            for thumbnail in item['snippet'].get('thumbnails', {}).values():
+                if thumbnail.get('url', '').startswith('/'):
+                    thumbnail['url'] = self.base_url + thumbnail['url']
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> str:
+        """Serve in a background thread and return the base URL"""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f"Mock YouTube API serving {len(self.videos)} videos at {self.base_url}")
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def search(self, params: Dict) -> Dict:
+        max_results = min(50, int(params.get('maxResults', 5)))
+        offset = int(params.get('pageToken') or 0)
+        matches = self._search_matches(params.get('q', ''), params.get('publishedAfter'),
+                                       params.get('videoDuration') == 'short')
+
+        page = matches[offset:offset + max_results]
+        body = {
+            'items': [{'id': {'kind': 'youtube#video', 'videoId': v['id']}, 'snippet': v['snippet']} for v in page],
+            'pageInfo': {'totalResults': len(matches), 'resultsPerPage': max_results}
+        }
+        if offset + max_results < len(matches):
+            body['nextPageToken'] = str(offset + max_results)
+        return body
+
+    def _search_matches(self, query: str, published_after: str, shorts_only: bool) -> List[Dict]:
+        """All results for a search, most viewed first; memoized so paging is cheap"""
+        key = (query, published_after, shorts_only)
+        if key in self.search_results:
+            return self.search_results[key]
+
+        seen = set()
+        matches = []
+        for word in query.lower().split():
+            for video_id in self.word_index.get(word, []):
+                if video_id not in seen:
+                    seen.add(video_id)
+                    matches.append(self.videos[video_id])
+
+        if published_after:
+            matches = [v for v in matches if v['snippet']['publishedAt'] >= published_after[:19]]
+        if shorts_only:
+            matches = [v for v in matches if self._duration(v) < 240]
+        matches.sort(key=lambda v: -int(v['statistics'].get('viewCount', 0)))
+
+        self.search_results[key] = matches[:self.max_search_results]
+        return self.search_results[key]
+
+    def list_by_id(self, store: Dict, params: Dict) -> Dict:
+        ids = [i for i in params.get('id', '').split(',') if i][:50]
+        return {'items': [store[i] for i in ids if i in store]}
+
+    def playlist_items(self, params: Dict) -> Dict:
+        playlist_id = params.get('playlistId', '')
+        if playlist_id not in self.uploads and 'UC' + playlist_id[2:] not in self.channels:
+            return None
+        max_results = min(50, int(params.get('maxResults', 5)))
+        offset = int(params.get('pageToken') or 0)
+        video_ids = self.uploads.get(playlist_id, [])
+
+        items = []
+        for video_id in video_ids[offset:offset + max_results]:
+            snippet = self.videos[video_id]['snippet']
+            items.append({
+                'snippet': {**snippet, 'playlistId': playlist_id, 'resourceId': {'kind': 'youtube#video', 'videoId': video_id}},
+                'contentDetails': {'videoId': video_id, 'videoPublishedAt': snippet['publishedAt']}
+            })
+        body = {'items': items, 'pageInfo': {'totalResults': len(video_ids), 'resultsPerPage': max_results}}
+        if offset + max_results < len(video_ids):
+            body['nextPageToken'] = str(offset + max_results)
+        return body
+
+    def thumbnail(self, item_id: str, size: str) -> bytes:
+        """
+        Thumbnail bytes for an item: a real image picked deterministically from thumbnail_dir,
+        or a synthetic text card.
+        """
+        import cv2
+        import numpy as np
+
+        key = zlib.crc32(item_id.encode())
+        width, height = THUMBNAIL_SIZES.get(size, THUMBNAIL_SIZES['high'])
+
+        if self.thumbnail_files:
+            image = cv2.imread(self.thumbnail_files[key % len(self.thumbnail_files)], cv2.IMREAD_COLOR)
+            # Centre-crop to the target aspect ratio (as 'medium' is a 16:9 crop of the 4:3 frame)
+            rows, cols = image.shape[:2]
+            crop_rows = min(rows, cols * height // width)
+            crop_cols = min(cols, rows * width // height)
+            top, left = (rows - crop_rows) // 2, (cols - crop_cols) // 2
+            image = cv2.resize(image[top:top + crop_rows, left:left + crop_cols], (width, height))
+        else:
+            rng = np.random.default_rng(key)
+            image = np.empty((height, width, 3), dtype=np.uint8)
+            image[:] = rng.integers(0, 256, 3)
+            for _ in range(3):
+                x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+                color = tuple(int(c) for c in rng.integers(0, 256, 3))
+                cv2.rectangle(image, (x, y), (x + width // 4, y + height // 6), color, -1)
+            cv2.putText(image, item_id[-6:].upper(), (width // 10, height // 2), cv2.FONT_HERSHEY_SIMPLEX,
+                        width / 300, (255, 255, 255), max(1, width // 160))
+
+        return cv2.imencode('.jpg', image)[1].tobytes()
+
+    @staticmethod
+    def _duration(video: Dict) -> int:
+        match = re.fullmatch(r'PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?', video['contentDetails']['duration'])
+        if not match:
+            return 0
+        hours, minutes, seconds = (int(part or 0) for part in match.groups())
+        return hours * 3600 + minutes * 60 + seconds
+
+    def _make_handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {name: values[0] for name, values in parse_qs(url.query).items()}
+                if url.path.startswith('/thumbnails/'):
+                    endpoint = 'thumbnails'
+                else:
+                    endpoint = url.path.rstrip('/').rsplit('/', 1)[-1]
+                with api.rng_lock:
+                    api.request_counts[endpoint] = api.request_counts.get(endpoint, 0) + 1
+                    delay = api.latency + api.rng.uniform(0, api.jitter)
+                    fail = api.rng.random() < api.error_rate
+                if delay:
+                    time.sleep(delay)
+
+                if fail:
+                    with api.rng_lock:
+                        status = api.rng.choice([429, 500, 503])
+                    return self._send(status, {'error': {'code': status, 'message': 'Injected failure'}},
+                                      {'Retry-After': '0'} if status == 429 else None)
+
+                if endpoint == 'thumbnails':
+                    parts = url.path.strip('/').split('/')
+                    if len(parts) != 3:
+                        return self._send(404, {'error': {'code': 404, 'message': f'Unknown thumbnail {url.path}'}})
+                    return self._send_bytes(200, api.thumbnail(parts[1], parts[2].rsplit('.', 1)[0]), 'image/jpeg')
+                if endpoint == 'search':
+                    return self._send(200, api.search(params))
+                if endpoint == 'videos':
+                    return self._send(200, api.list_by_id(api.videos, params))
+                if endpoint == 'channels':
+                    return self._send(200, api.list_by_id(api.channels, params))
+                if endpoint == 'playlistItems':
+                    body = api.playlist_items(params)
+                    if body is None:
+                        return self._send(404, {'error': {'code': 404, 'message': 'playlistNotFound'}})
+                    return self._send(200, body)
+                return self._send(404, {'error': {'code': 404, 'message': f'Unknown endpoint {url.path}'}})
+
+            def _send(self, status: int, body: Dict, headers: Dict = None):
+                self._send_bytes(status, json.dumps(body).encode(), 'application/json', headers)
+
+            def _send_bytes(self, status: int, payload: bytes, content_type: str, headers: Dict = None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a local stand-in for the YouTube Data API')
+    parser.add_argument('--corpus', help='Recorded corpus JSON; a synthetic corpus is generated if omitted')
+    parser.add_argument('--videos', type=int, default=1000)
+    parser.add_argument('--channels', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.0, help='Fixed delay per request (seconds)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random delay per request (seconds)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered 429/5xx')
+    parser.add_argument('--max-search-results', type=int, default=500)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--thumbnail-dir', help='Serve real images from this directory instead of synthetic cards')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else build_synthetic_corpus(args.videos, args.channels, args.seed)
+    api = MockYouTubeAPI(corpus, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                         max_search_results=args.max_search_results, port=args.port, seed=args.seed,
+                         thumbnail_dir=args.thumbnail_dir)
+    print(f"Serving mock YouTube Data API at {api.base_url} (Ctrl+C to stop)")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        api.stop()
+
+
+if __name__ == '__main__':
+    main()
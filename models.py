@@ -78,3 +78,72 @@ class VideoData(db.Model):
     engagement_ratio = db.Column(db.Float, default=0.0)
     
     session = db.relationship('AnalysisSession', backref=db.backref('videos', lazy=True))
+
+class ChannelRecord(db.Model):
+    """Channel metadata persisted across sessions so unchanged channels are not refetched"""
+    id = db.Column(db.Integer, primary_key=True)
+    channel_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    title = db.Column(db.String(200))
+    subscriber_count = db.Column(db.BigInteger, default=0)
+    video_count = db.Column(db.Integer, default=0)
+    view_count = db.Column(db.BigInteger, default=0)
+    created_at = db.Column(db.String(50))  # ISO 8601 publishedAt as returned by the API
+    thumbnail_url = db.Column(db.Text)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def update_from_details(self, details):
+        self.title = details.get('title')
+        self.subscriber_count = details.get('subscriber_count', 0)
+        self.video_count = details.get('video_count', 0)
+        self.view_count = details.get('view_count', 0)
+        self.created_at = details.get('created_at')
+        self.thumbnail_url = details.get('thumbnail_url', '')
+        self.fetched_at = datetime.utcnow()
+    
+    def to_details(self):
+        return {
+            'title': self.title,
+            'subscriber_count': self.subscriber_count,
+            'video_count': self.video_count,
+            'view_count': self.view_count,
+            'created_at': self.created_at,
+            'thumbnail_url': self.thumbnail_url
+        }
+
+class ChannelActivity(db.Model):
+    """Upload cadence and trailing view totals of a channel, refreshed with its metadata"""
+    id = db.Column(db.Integer, primary_key=True)
+    channel_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    weekly_uploads = db.Column(db.Float, default=0.0)
+    monthly_views = db.Column(db.BigInteger, default=0)
+    views_7days = db.Column(db.BigInteger, default=0)
+    uploads_counted = db.Column(db.Integer, default=0)
+    checked_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_activity(self):
+        return {
+            'weekly_uploads': self.weekly_uploads,
+            'monthly_views': self.monthly_views,
+            'views_7days': self.views_7days,
+            'uploads_counted': self.uploads_counted
+        }
+
+class ChannelFaceResult(db.Model):
+    """Share of a channel's recent upload thumbnails showing a face, for one detector engine and limit"""
+    id = db.Column(db.Integer, primary_key=True)
+    channel_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    engine = db.Column(db.Text, nullable=False)  # detector signature and face threshold
+    max_face_percentage = db.Column(db.Float, nullable=False)  # limit the sequential scan stopped against
+    face_percentage = db.Column(db.Float, default=0.0)
+    avg_confidence = db.Column(db.Float, default=0.0)
+    thumbnails_scanned = db.Column(db.Integer, default=0)
+    checked_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class DisqualifiedChannel(db.Model):
+    """Channel rejected by a monotonic criterion (e.g. age), with the strongest rejection seen"""
+    id = db.Column(db.Integer, primary_key=True)
+    channel_id = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    reason = db.Column(db.String(50), nullable=False)  # currently only 'channel_age'
+    threshold = db.Column(db.Integer, nullable=False)
+    rejected_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_before = db.Column(db.DateTime, nullable=False, index=True)  # rejected_at - (threshold + 1) days
@@ -1,5 +1,6 @@
 import spacy
 import logging
+import threading
 from typing import List, Dict, Any
 from collections import Counter, defaultdict
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -8,52 +9,95 @@ from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 import re
 from config import Config
+from niche_model import NicheModel, get_niche_model
 
 logger = logging.getLogger(__name__)
 
+_nlp = None
+_nlp_loaded = False
+_nlp_lock = threading.Lock()
+
+
+def _load_spacy_model():
+    """Load spaCy model for NLP processing, without the components keyword extraction does not use"""
+    try:
+        nlp = spacy.load(Config.SPACY_MODEL, disable=Config.SPACY_DISABLE)
+        logger.info(f"spaCy model loaded successfully (pipeline: {', '.join(nlp.pipe_names)})")
+        return nlp
+    except Exception as e:
+        logger.error(f"Error loading spaCy model: {str(e)}")
+        logger.info("You may need to download the model: python -m spacy download en_core_web_sm")
+        return None
+
+
+def get_spacy_model():
+    """Return the process-wide spaCy pipeline, loaded on first use (None if it cannot be loaded)"""
+    global _nlp, _nlp_loaded
+    if not _nlp_loaded:
+        with _nlp_lock:
+            if not _nlp_loaded:
+                _nlp = _load_spacy_model()
+                _nlp_loaded = True
+    return _nlp
+
+
 class NicheAnalyzer:
-    def __init__(self):
-        self.nlp = None
-        self._load_spacy_model()
-        
-    def _load_spacy_model(self):
-        """Load spaCy model for NLP processing"""
-        try:
-            self.nlp = spacy.load(Config.SPACY_MODEL)
-            logger.info("spaCy model loaded successfully")
-        except Exception as e:
-            logger.error(f"Error loading spaCy model: {str(e)}")
-            logger.info("You may need to download the model: python -m spacy download en_core_web_sm")
+    def __init__(self, namespace: str = ''):
+        self.namespace = namespace  # API namespace whose persistent niches are used
+        # Keywords per title + description text, so cluster naming and niche analysis share one pass
+        self.video_keywords = {}
+    
+    @property
+    def nlp(self):
+        return get_spacy_model()
     
     def extract_keywords_from_text(self, text: str) -> List[str]:
         """Extract meaningful keywords from text using NLP"""
+        return self.extract_keywords_from_texts([text])[0]
+    
+    def extract_keywords_from_texts(self, texts: List[str]) -> List[List[str]]:
+        """Extract keywords from many texts in one batched nlp.pipe pass"""
         try:
             if not self.nlp:
                 # Fallback to simple keyword extraction
-                return self._simple_keyword_extraction(text)
-            
-            doc = self.nlp(text.lower())
-            keywords = []
+                return [self._simple_keyword_extraction(text) for text in texts]
             
-            # Extract entities, nouns, and adjectives
-            for token in doc:
-                if (token.pos_ in ['NOUN', 'ADJ', 'PROPN'] and 
-                    len(token.text) > 2 and 
-                    not token.is_stop and 
-                    not token.is_punct and
-                    token.is_alpha):
-                    keywords.append(token.lemma_)
+            docs = self.nlp.pipe((text.lower() for text in texts), batch_size=Config.SPACY_BATCH_SIZE,
+                                 n_process=Config.SPACY_N_PROCESS)
+            return [self._doc_keywords(doc) for doc in docs]
             
-            # Extract named entities
+        except Exception as e:
+            logger.error(f"Error extracting keywords: {str(e)}")
+            return [self._simple_keyword_extraction(text) for text in texts]
+    
+    @staticmethod
+    def _doc_keywords(doc) -> List[str]:
+        keywords = []
+        
+        # Extract entities, nouns, and adjectives
+        for token in doc:
+            if (token.pos_ in ['NOUN', 'ADJ', 'PROPN'] and 
+                len(token.text) > 2 and 
+                not token.is_stop and 
+                not token.is_punct and
+                token.is_alpha):
+                keywords.append(token.lemma_)
+        
+        # Extract named entities (only when the NER component is enabled)
+        if doc.has_annotation('ENT_IOB'):
             for ent in doc.ents:
                 if ent.label_ in ['PERSON', 'ORG', 'GPE', 'PRODUCT', 'EVENT']:
                     keywords.append(ent.text.lower())
-            
-            return list(set(keywords))
-            
-        except Exception as e:
-            logger.error(f"Error extracting keywords: {str(e)}")
-            return self._simple_keyword_extraction(text)
+        
+        return list(set(keywords))
+    
+    def keywords_for_videos(self, videos: List[Dict]) -> List[List[str]]:
+        """Keywords of each video's title and description; texts not seen before are processed in one batch"""
+        texts = [f"{video.get('title', '')} {video.get('description', '')}" for video in videos]
+        missing = list(dict.fromkeys(text for text in texts if text not in self.video_keywords))
+        if missing:
+            self.video_keywords.update(zip(missing, self.extract_keywords_from_texts(missing)))
+        return [self.video_keywords[text] for text in texts]
     
     def _simple_keyword_extraction(self, text: str) -> List[str]:
         """Simple fallback keyword extraction"""
@@ -85,6 +129,18 @@ class NicheAnalyzer:
                 text = f"{video.get('title', '')} {video.get('description', '')}"
                 texts.append(text)
             
+            # One batched NLP pass over every video; cluster naming and niche analysis reuse it
+            self.keywords_for_videos(videos_data)
+            
+            # Assign to the persistent niches; only a cold model falls back to a one-off clustering
+            if Config.NICHE_INCREMENTAL:
+                model = get_niche_model(self.namespace)
+                labels = model.assign([video.get('video_id') or text for video, text in zip(videos_data, texts)],
+                                      texts) if model else None
+                if labels is not None:
+                    return self._group_by_niche(videos_data, labels, model)
+                logger.info("Niche model has too few videos to start; clustering this session on its own")
+            
             # Use TF-IDF vectorization
             vectorizer = TfidfVectorizer(
                 max_features=1000,
@@ -142,12 +198,32 @@ class NicheAnalyzer:
             logger.error(f"Error clustering videos: {str(e)}")
             return {"general": videos_data}
     
+    def _group_by_niche(self, videos_data: List[Dict], labels: List[int], model: NicheModel) -> Dict[str, List[Dict]]:
+        """Group videos by persistent niche ID; niches with too few videos this session go to 'general'"""
+        clusters = defaultdict(list)
+        for video, label in zip(videos_data, labels):
+            clusters[label].append(video)
+        
+        named_clusters = {}
+        for niche_id, cluster_videos in clusters.items():
+            if len(cluster_videos) >= Config.MIN_CLUSTER_SIZE:
+                # Named once, from the videos that first made the niche large enough
+                name = model.get_name(niche_id)
+                if name is None:
+                    name = model.set_name(niche_id, self._generate_cluster_name(cluster_videos, model.top_terms(niche_id)))
+                named_clusters[name] = cluster_videos
+            else:
+                named_clusters.setdefault("general", []).extend(cluster_videos)
+        model.save()
+        
+        logger.info(f"Assigned videos to {len(named_clusters)} persistent niches")
+        return named_clusters
+    
     def _generate_cluster_name(self, videos: List[Dict], top_features: List[str]) -> str:
         """Generate a meaningful name for a cluster"""
         try:
-            # Extract common words from video titles
-            all_titles = " ".join([video.get('title', '') for video in videos])
-            title_keywords = self.extract_keywords_from_text(all_titles)
+            # Extract common words from video titles and descriptions
+            title_keywords = list({keyword for keywords in self.keywords_for_videos(videos) for keyword in keywords})
             
             # Combine with top TF-IDF features
             all_keywords = title_keywords + top_features
@@ -224,10 +300,8 @@ class NicheAnalyzer:
             sorted_videos = sorted(niche_videos, key=lambda x: x.get('viral_score', 0), reverse=True)
             top_videos = sorted_videos[:3]
             
-            # Extract common keywords
-            all_titles = " ".join([video.get('title', '') for video in niche_videos])
-            keywords = self.extract_keywords_from_text(all_titles)
-            keyword_counts = Counter(keywords)
+            # Extract common keywords, counted by how many videos use them
+            keyword_counts = Counter(keyword for keywords in self.keywords_for_videos(niche_videos) for keyword in keywords)
             top_keywords = [keyword for keyword, count in keyword_counts.most_common(10)]
             
             return {
@@ -0,0 +1,221 @@
+import os
+import pickle
+import logging
+import threading
+import numpy as np
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.metrics import silhouette_score
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 3
+
+
+class NicheModel:
+    """
+    Niche clustering model persisted across sessions.
+    Texts are embedded with a stateless hashing vectorizer, so there is no vocabulary to refit,
+    and MiniBatchKMeans centroids are updated with partial_fit on each session's new videos only.
+    Niche IDs are centroid indices: a niche keeps its ID (and name) as it grows.
+    The number of niches is chosen once, on the seed videos (best silhouette for up to
+    max_clusters niches of at least MIN_CLUSTER_SIZE videos); clear() reseeds the model.
+    Changes are written by save(), once per session; features are float32 so the dense
+    centroids stay small on disk.
+    """
+
+    def __init__(self, path: str = None, max_clusters: int = None):
+        self.path = path or os.path.join(Config.CACHE_DIR, Config.NICHE_MODEL_FILE)
+        self.max_clusters = max_clusters or Config.MAX_CLUSTERS
+        # Enough seed videos for every possible niche to reach MIN_CLUSTER_SIZE
+        self.min_seed = self.max_clusters * Config.MIN_CLUSTER_SIZE
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # serializes file writes, which happen outside self.lock
+        self.vectorizer = HashingVectorizer(
+            n_features=Config.NICHE_HASH_FEATURES,
+            stop_words='english',
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm='l2',
+            dtype=np.float32
+        )
+        self.analyzer = self.vectorizer.build_analyzer()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.kmeans = None  # MiniBatchKMeans, created when the model is seeded
+        self.fitted = False
+        self.n_clusters = 0
+        self.assignments = OrderedDict()  # video key -> niche ID, least recently seen first
+        self.term_counts = []  # Counter per niche, for naming niches
+        self.names = {}  # niche ID -> name, fixed once given
+        self.dirty = False  # changed since the last save
+
+    def signature(self) -> Dict:
+        """Parameters a stored model must share with this one to be reused"""
+        return {'version': MODEL_VERSION, 'max_clusters': self.max_clusters, 'n_features': Config.NICHE_HASH_FEATURES}
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                state = pickle.load(f)
+            if state.get('signature') != self.signature():
+                logger.info("Stored niche model has different parameters; starting a new one")
+                return
+            self.kmeans = state['kmeans']
+            self.fitted = state['fitted']
+            self.n_clusters = state['n_clusters']
+            self.assignments = state['assignments']
+            self.term_counts = state['term_counts']
+            self.names = state['names']
+            logger.info(f"Loaded niche model with {len(self.assignments)} assigned videos")
+        except Exception as e:
+            logger.error(f"Error loading niche model: {str(e)}")
+            self._reset()
+
+    def save(self):
+        """Write the model if it changed; the state is snapshotted under the lock, written outside it"""
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                data = pickle.dumps({
+                    'signature': self.signature(),
+                    'kmeans': self.kmeans,
+                    'fitted': self.fitted,
+                    'n_clusters': self.n_clusters,
+                    'assignments': self.assignments,
+                    'term_counts': self.term_counts,
+                    'names': self.names
+                }, protocol=pickle.HIGHEST_PROTOCOL)
+                self.dirty = False
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                # Write then rename, so a crash never leaves a truncated model behind
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, self.path)
+            except Exception as e:
+                logger.error(f"Error saving niche model: {str(e)}")
+
+    def assign(self, video_keys: List[str], texts: List[str]) -> Optional[List[int]]:
+        """
+        Niche ID per video. Videos assigned in earlier sessions keep their niche; new ones go
+        to the nearest centroid and are then folded into the centroids.
+        Returns None until a session brings min_seed new videos to seed the centroids.
+        Call save() once the session's niches are named.
+        """
+        with self.lock:
+            new = {}
+            for key, text in zip(video_keys, texts):
+                if key not in self.assignments and key not in new:
+                    new[key] = text
+
+            if not self.fitted and len(new) < self.min_seed:
+                return None
+
+            if new:
+                new_texts = list(new.values())
+                features = self.vectorizer.transform(new_texts)
+                if self.fitted:
+                    labels = self.kmeans.predict(features)
+                    self.kmeans.partial_fit(features)
+                else:
+                    self._seed(features)
+                    labels = self.kmeans.predict(features)
+
+                for key, text, label in zip(new, new_texts, labels):
+                    self.assignments[key] = int(label)
+                    self.term_counts[label].update(term for term in self.analyzer(text)
+                                                   if len(term) > 2 and term.replace(' ', '').isalpha())
+                for label in set(int(label) for label in labels):
+                    self.term_counts[label] = Counter(dict(self.term_counts[label].most_common(Config.NICHE_TERMS_PER_CLUSTER)))
+
+            for key in video_keys:
+                self.assignments.move_to_end(key)
+            while len(self.assignments) > Config.NICHE_MODEL_MAX_VIDEOS:
+                self.assignments.popitem(last=False)
+
+            self.dirty = self.dirty or bool(new)
+            return [self.assignments[key] for key in video_keys]
+
+    def _seed(self, features):
+        """Pick the niche count with the best silhouette on the seed videos and start from its centroids"""
+        best = None
+        for n_clusters in range(2, min(self.max_clusters, features.shape[0] // Config.MIN_CLUSTER_SIZE) + 1):
+            kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=3).fit(features)
+            if len(set(kmeans.labels_)) < 2:
+                continue
+            score = silhouette_score(features, kmeans.labels_, metric='cosine')
+            if best is None or score > best[0]:
+                best = (score, kmeans)
+
+        centers = best[1].cluster_centers_ if best else np.asarray(features.mean(axis=0))
+        self.n_clusters = len(centers)
+        # reassignment_ratio=0: sparse niches are never moved onto random videos, so IDs keep their meaning
+        self.kmeans = MiniBatchKMeans(n_clusters=self.n_clusters, init=centers, n_init=1, random_state=42,
+                                      batch_size=Config.NICHE_MODEL_BATCH_SIZE, reassignment_ratio=0)
+        self.kmeans.partial_fit(features)
+        self.term_counts = [Counter() for _ in range(self.n_clusters)]
+        self.fitted = True
+        logger.info(f"Seeded niche model with {self.n_clusters} niches from {features.shape[0]} videos")
+
+    def top_terms(self, niche_id: int, count: int = 10) -> List[str]:
+        with self.lock:
+            return [term for term, _ in self.term_counts[niche_id].most_common(count)]
+
+    def get_name(self, niche_id: int) -> Optional[str]:
+        with self.lock:
+            return self.names.get(niche_id)
+
+    def set_name(self, niche_id: int, name: str) -> str:
+        """Fix a niche's name (made unique among niches) and return the stored name"""
+        with self.lock:
+            if niche_id in self.names:
+                return self.names[niche_id]
+            if name in self.names.values() or name == 'general':
+                name = f"{name} {niche_id + 1}"
+            self.names[niche_id] = name
+            self.dirty = True
+            return name
+
+    def clear(self):
+        """Forget every niche and delete the stored model"""
+        with self.lock:
+            self._reset()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+_niche_models: Dict[str, NicheModel] = {}
+_niche_models_lock = threading.Lock()
+
+
+def get_niche_model(namespace: str = '') -> Optional[NicheModel]:
+    """
+    Return the process-wide niche model of an API namespace (see api_namespace), or None if it
+    cannot be created. Each namespace is stored in its own file.
+    """
+    model = _niche_models.get(namespace)
+    if model is None:
+        with _niche_models_lock:
+            model = _niche_models.get(namespace)
+            if model is None:
+                name, extension = os.path.splitext(Config.NICHE_MODEL_FILE)
+                path = os.path.join(Config.CACHE_DIR, f"{name}-{namespace}{extension}" if namespace else Config.NICHE_MODEL_FILE)
+                try:
+                    model = NicheModel(path=path)
+                except Exception as e:
+                    logger.error(f"Error creating niche model: {str(e)}")
+                    return None
+                _niche_models[namespace] = model
+    return model
@@ -0,0 +1,155 @@
+import os
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')  # YouTube quota resets at midnight Pacific
+except Exception:
+    QUOTA_TIMEZONE = timezone.utc
+
+
+class QuotaExceededError(Exception):
+    """Raised when an API call would exceed the session or daily quota budget"""
+
+
+def quota_cost(endpoint: str) -> int:
+    """Quota units charged by the YouTube Data API for one call to an endpoint"""
+    return Config.API_QUOTA_COSTS.get(endpoint, 1)
+
+
+class QuotaLedger:
+    """
+    Persistent per-day record of quota units spent, shared by every session in the process.
+    """
+
+    def __init__(self, path: str = None, daily_limit: int = None):
+        self.path = path or os.path.join(Config.CACHE_DIR, 'api_quota.db')
+        self.daily_limit = daily_limit if daily_limit is not None else Config.API_DAILY_QUOTA
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS quota_usage ('
+            'day TEXT, endpoint TEXT, units INTEGER, calls INTEGER, PRIMARY KEY (day, endpoint))'
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def today() -> str:
+        return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+    def used_today(self) -> int:
+        """Units spent so far in the current quota day"""
+        with self.lock:
+            return self._used(self.today())
+
+    def _used(self, day: str) -> int:
+        row = self.conn.execute('SELECT COALESCE(SUM(units), 0) FROM quota_usage WHERE day = ?', (day,)).fetchone()
+        return row[0]
+
+    def charge(self, endpoint: str, units: int, headroom: int = 0):
+        """
+        Record a call, refusing it if it (plus any headroom that must stay available) would
+        exceed the daily limit.
+        """
+        day = self.today()
+        with self.lock:
+            used = self._used(day)
+            if used + units + headroom > self.daily_limit:
+                raise QuotaExceededError(
+                    f"Daily quota exhausted: {used}/{self.daily_limit} units used, {endpoint} costs {units}"
+                )
+            self.conn.execute(
+                'INSERT INTO quota_usage (day, endpoint, units, calls) VALUES (?, ?, ?, 1) '
+                'ON CONFLICT(day, endpoint) DO UPDATE SET units = units + excluded.units, calls = calls + 1',
+                (day, endpoint, units)
+            )
+            self.conn.commit()
+
+
+class QuotaBudget:
+    """
+    Per-session quota budget on top of the shared daily ledger.
+    """
+
+    def __init__(self, session_limit: int = None, ledger: QuotaLedger = None):
+        self.session_limit = session_limit if session_limit is not None else Config.API_SESSION_QUOTA
+        self.ledger = ledger
+        self.lock = threading.Lock()
+        self.used = 0
+        self.calls = {}
+        self.refused = {}  # endpoint -> calls refused by the session or daily budget
+
+    def charge(self, endpoint: str, headroom: int = 0):
+        """
+        Charge one call to `endpoint`. `headroom` is extra budget that must remain
+        afterwards, so expensive searches cannot starve the detail lookups they create.
+        """
+        units = quota_cost(endpoint)
+        with self.lock:
+            try:
+                if self.used + units + headroom > self.session_limit:
+                    raise QuotaExceededError(
+                        f"Session quota exhausted: {self.used}/{self.session_limit} units used, {endpoint} costs {units}"
+                    )
+                if self.ledger:
+                    self.ledger.charge(endpoint, units, headroom)
+            except QuotaExceededError:
+                self.refused[endpoint] = self.refused.get(endpoint, 0) + 1
+                raise
+            self.used += units
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+    def refusals(self, *endpoints: str) -> int:
+        """Calls refused so far to any of the endpoints"""
+        with self.lock:
+            return sum(self.refused.get(endpoint, 0) for endpoint in endpoints)
+
+    def remaining(self) -> Dict:
+        """Budget summary for the status API"""
+        with self.lock:
+            summary = {
+                'session_used': self.used,
+                'session_limit': self.session_limit,
+                'session_remaining': max(0, self.session_limit - self.used),
+                'calls': dict(self.calls),
+                'refused': dict(self.refused)
+            }
+
+        if self.ledger:
+            daily_used = self.ledger.used_today()
+            summary.update({
+                'daily_used': daily_used,
+                'daily_limit': self.ledger.daily_limit,
+                'daily_remaining': max(0, self.ledger.daily_limit - daily_used)
+            })
+        return summary
+
+
+_quota_ledger = None
+_quota_ledger_lock = threading.Lock()
+
+
+def get_quota_ledger() -> Optional[QuotaLedger]:
+    """Return the process-wide daily quota ledger, or None if it cannot be opened"""
+    global _quota_ledger
+    if _quota_ledger is None:
+        with _quota_ledger_lock:
+            if _quota_ledger is None:
+                try:
+                    _quota_ledger = QuotaLedger()
+                except Exception as e:
+                    logger.error(f"Error opening quota ledger: {str(e)}")
+                    return None
+    return _quota_ledger
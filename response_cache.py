@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Disk-backed TTL cache for YouTube Data API responses.
+    Entries are keyed by endpoint plus normalized request parameters (and the API namespace for
+    anything but the YouTube Data API) and expire per endpoint TTL.
+    """
+
+    def __init__(self, path: str = None, ttls: Dict[str, int] = None):
+        self.path = path or os.path.join(Config.CACHE_DIR, 'api_responses.db')
+        self.ttls = ttls or Config.API_CACHE_TTLS
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'cache_key TEXT PRIMARY KEY, endpoint TEXT, body TEXT, expires_at REAL)'
+        )
+        self.conn.commit()
+        self.purge_expired()
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict, namespace: str = '') -> str:
+        """Normalize request parameters into a stable cache key (API key excluded)"""
+        normalized = {}
+        for name, value in params.items():
+            if name == 'key':
+                continue
+            if name == 'id':
+                # ID lists are order-insensitive
+                value = ','.join(sorted(str(value).split(',')))
+            normalized[name] = str(value)
+        key = f"{endpoint}?{json.dumps(normalized, sort_keys=True)}"
+        return f"{namespace}|{key}" if namespace else key
+
+    def get(self, endpoint: str, params: Dict, namespace: str = '') -> Optional[Dict]:
+        """Return a cached response body, or None if missing or expired"""
+        key = self.make_key(endpoint, params, namespace)
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT body, expires_at FROM responses WHERE cache_key = ?', (key,)
+            ).fetchone()
+
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, endpoint: str, params: Dict, body: Dict, namespace: str = ''):
+        """Store a response body under the endpoint's TTL"""
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl <= 0:
+            return
+
+        key = self.make_key(endpoint, params, namespace)
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (cache_key, endpoint, body, expires_at) VALUES (?, ?, ?, ?)',
+                (key, endpoint, json.dumps(body), time.time() + ttl)
+            )
+            self.conn.commit()
+
+    def get_many(self, endpoint: str, params_list: List[Dict], namespace: str = '') -> List[Optional[Dict]]:
+        """Cached response bodies for several requests, in order; None where missing or expired"""
+        keys = [self.make_key(endpoint, params, namespace) for params in params_list]
+        rows = {}
+        with self.lock:
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows.update((key, (body, expires_at)) for key, body, expires_at in self.conn.execute(
+                    f"SELECT cache_key, body, expires_at FROM responses WHERE cache_key IN ({','.join('?' * len(batch))})",
+                    batch
+                ))
+
+        now = time.time()
+        return [json.loads(rows[key][0]) if key in rows and rows[key][1] >= now else None for key in keys]
+
+    def set_many(self, endpoint: str, entries: List[Tuple[Dict, Dict]], namespace: str = ''):
+        """Store several (params, body) responses under the endpoint's TTL in one transaction"""
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl <= 0 or not entries:
+            return
+
+        expires_at = time.time() + ttl
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO responses (cache_key, endpoint, body, expires_at) VALUES (?, ?, ?, ?)',
+                [(self.make_key(endpoint, params, namespace), endpoint, json.dumps(body), expires_at)
+                 for params, body in entries]
+            )
+            self.conn.commit()
+
+    def clear(self):
+        """Delete every entry"""
+        with self.lock:
+            self.conn.execute('DELETE FROM responses')
+            self.conn.commit()
+
+    def purge_expired(self):
+        """Delete expired entries"""
+        with self.lock:
+            self.conn.execute('DELETE FROM responses WHERE expires_at < ?', (time.time(),))
+            self.conn.commit()
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None if it cannot be opened"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                try:
+                    _response_cache = ResponseCache()
+                except Exception as e:
+                    logger.error(f"Error opening API response cache: {str(e)}")
+                    return None
+    return _response_cache
@@ -6,15 +6,21 @@ from datetime import datetime
 from flask import render_template, request, jsonify, send_file, flash, redirect, url_for
 from app import app, db
 from models import AnalysisSession, NicheResult, VideoData
-from youtube_analyzer import YouTubeAnalyzer
-from face_detector import FaceDetector
+from youtube_analyzer import YouTubeAnalyzer, known_channel_age_days
+from face_detector import FaceDetector, get_face_models
+from face_text import get_face_text_scorer
 from niche_analyzer import NicheAnalyzer
+from channel_store import ChannelStore
 from config import Config
+from concurrency import map_concurrently
 import threading
 import tempfile
 
 logger = logging.getLogger(__name__)
 
+# Fail at startup, not per video, when a face model file is missing
+get_face_models().require(Config.FACE_DETECTION_ENGINE)
+
 # Global analysis state
 analysis_state = {
     'running': False,
@@ -54,6 +60,7 @@ def analyze():
         params['search_query'] = request.form.get('search_query', '')
         params['faceless_only'] = request.form.get('faceless_only') == 'on'
         params['max_results_per_query'] = int(request.form.get('max_results_per_query', 50))
+        params['use_cache'] = request.form.get('use_cache') == 'on'
         
         # Create new analysis session
         session = AnalysisSession(
@@ -102,7 +109,15 @@ def analysis_status(session_id):
         'total_videos_analyzed': session.total_videos_analyzed,
         'total_channels_found': session.total_channels_found,
         'total_niches_identified': session.total_niches_identified,
-        'current_status': analysis_state.get('status', 'idle')
+        'current_status': analysis_state.get('status', 'idle'),
+        'api_cache': analysis_state.get('api_cache', {}),
+        'quota': analysis_state.get('quota', {}),
+        'channel_store': analysis_state.get('channel_store', {}),
+        'negative_cache': analysis_state.get('negative_cache', {}),
+        'face_detection': analysis_state.get('face_detection', {}),
+        'channel_faces': analysis_state.get('channel_faces', {}),
+        'stages': analysis_state.get('stages', []),
+        'degraded': analysis_state.get('degraded', [])
     })
 
 @app.route('/export_csv/<int:session_id>')
@@ -165,6 +180,74 @@ def export_csv(session_id):
         flash(f'Error exporting CSV: {str(e)}', 'error')
         return redirect(url_for('results', session_id=session_id))
 
+def filter_face_heavy_channels(videos: list, params: dict, youtube_analyzer: YouTubeAnalyzer,
+                               face_detector: FaceDetector, channel_store: ChannelStore,
+                               channel_uploads: dict = None, on_progress=None):
+    """
+    Drop videos whose channel shows a face in more than max_face_percentage of a sample of its
+    recent uploads. Scores are stored per channel, so later sessions only sample new or expired
+    channels. Must be called inside an app context.
+    Returns: (surviving videos, stage stats)
+    """
+    channel_uploads = channel_uploads or {}
+    threshold = params['face_detection_threshold']
+    # 'scores=2' retires rows written with confidence and percentage swapped
+    # Channel scans pass the uploads' medium thumbnails, so they use the per-video detection key
+    channel_face_engine = (f"{face_detector.get_engine_key(face_detector.uses_multires(True), threshold)}"
+                           f"|threshold={threshold}|scores=2")
+    face_channel_ids = list(set(v['channel_id'] for v in videos))
+    if params.get('use_cache', True):
+        channel_faces, unscored_channel_ids = channel_store.load_face_results(
+            face_channel_ids, channel_face_engine, params['max_face_percentage'])
+    else:
+        channel_faces, unscored_channel_ids = {}, face_channel_ids
+    
+    # Uploads already read for the activity stage are reused when they fill the sample; that list
+    # only covers the activity window, so channels with fewer recent uploads are read in full
+    face_uploads = {channel_id: channel_uploads[channel_id][:Config.CHANNEL_FACE_SAMPLE]
+                    for channel_id in unscored_channel_ids
+                    if len(channel_uploads.get(channel_id, [])) >= Config.CHANNEL_FACE_SAMPLE}
+    refused = youtube_analyzer.quota.refusals('playlistItems')
+    face_uploads.update(youtube_analyzer.get_channel_uploads(
+        [channel_id for channel_id in unscored_channel_ids if channel_id not in face_uploads]))
+    quota_exhausted = youtube_analyzer.quota.refusals('playlistItems') > refused
+    
+    def score_channel(channel_id):
+        uploads = face_uploads.get(channel_id, [])
+        return face_detector.analyze_channel_thumbnails(
+            [video['thumbnail_url'] for video in uploads],
+            video_ids=[video['video_id'] for video in uploads],
+            max_face_percentage=params['max_face_percentage'],
+            threshold=threshold,
+            coarse_urls=[video.get('thumbnail_medium_url', '') for video in uploads]
+        )
+    
+    scored_channels = map_concurrently(score_channel, unscored_channel_ids,
+                                       max_workers=Config.CHANNEL_FACE_WORKERS, on_progress=on_progress)
+    new_channel_faces = {}
+    for channel_id, (avg_confidence, face_percentage, scanned) in zip(unscored_channel_ids, scored_channels):
+        if scanned > 0:
+            new_channel_faces[channel_id] = (avg_confidence, face_percentage, scanned)
+    channel_store.save_face_results(new_channel_faces, channel_face_engine, params['max_face_percentage'])
+    channel_faces.update(new_channel_faces)
+    
+    face_heavy_channels = {channel_id for channel_id, (_, face_percentage, _) in channel_faces.items()
+                           if face_percentage > params['max_face_percentage']}
+    # A channel with no readable uploads or thumbnails has no evidence either way: it is never
+    # stored, and it is kept after a transient error but dropped when the quota ran out
+    unavailable_channels = set(unscored_channel_ids) - set(new_channel_faces)
+    dropped_unchecked = unavailable_channels if quota_exhausted else set()
+    survivors = [v for v in videos if v['channel_id'] not in face_heavy_channels | dropped_unchecked]
+    
+    return survivors, {
+        'reused': len(face_channel_ids) - len(unscored_channel_ids),
+        'scored': len(new_channel_faces),
+        'unavailable': len(unavailable_channels),
+        'dropped_unchecked': len(dropped_unchecked),
+        'face_heavy': len(face_heavy_channels),
+        'thumbnails_scanned': sum(scanned for _, _, scanned in new_channel_faces.values())
+    }
+
 def run_analysis(session_id: int, params: dict):
     """Run the complete analysis in background"""
     global analysis_state
@@ -174,6 +257,14 @@ def run_analysis(session_id: int, params: dict):
         analysis_state['current_session_id'] = session_id
         analysis_state['progress'] = 0
         analysis_state['status'] = 'Initializing...'
+        analysis_state['api_cache'] = {}
+        analysis_state['quota'] = {}
+        analysis_state['channel_store'] = {}
+        analysis_state['negative_cache'] = {}
+        analysis_state['face_detection'] = {}
+        analysis_state['channel_faces'] = {}
+        analysis_state['stages'] = []
+        analysis_state['degraded'] = []
         
         # Update session status
         with app.app_context():
@@ -182,95 +273,262 @@ def run_analysis(session_id: int, params: dict):
             db.session.commit()
             
             # Initialize analyzers
-            youtube_analyzer = YouTubeAnalyzer()
-            face_detector = FaceDetector()
-            niche_analyzer = NicheAnalyzer()
+            youtube_analyzer = YouTubeAnalyzer(use_cache=params.get('use_cache', True))
+            face_detector = FaceDetector(use_cache=params.get('use_cache', True))
+            niche_analyzer = NicheAnalyzer(namespace=youtube_analyzer.namespace)
             
             analysis_state['status'] = 'Searching for videos...'
             analysis_state['progress'] = 10
             
             # Collect all videos
-            all_videos = []
             search_queries = Config.SEARCH_QUERIES if not params.get('search_query') else [params['search_query']]
             
-            for i, query in enumerate(search_queries):
-                analysis_state['status'] = f'Searching: {query}'
-                videos = youtube_analyzer.search_shorts(
-                    query, 
-                    params['days_back_to_search'], 
-                    params['max_results_per_query']
-                )
-                all_videos.extend(videos)
-                analysis_state['progress'] = 10 + (i + 1) * 20 // len(search_queries)
+            def on_search_progress(done, total):
+                analysis_state['status'] = f'Searching: {done}/{total} queries complete'
+                analysis_state['progress'] = 10 + done * 30 // total
+            
+            # Channels already known to be too old are dropped before any detail lookup
+            channel_store = ChannelStore(namespace=youtube_analyzer.namespace)
+            disqualified_channels = channel_store.load_disqualified(params['max_channel_age_days'])
+            negative_cache_stats = {'known_disqualified': len(disqualified_channels), 'videos_skipped': 0}
+            
+            def keep_video(video):
+                if video['channel_id'] in disqualified_channels:
+                    negative_cache_stats['videos_skipped'] += 1
+                    return False
+                return True
+            
+            # Video details are fetched page by page while later search pages are still in flight
+            all_videos, video_details = youtube_analyzer.search_with_details(
+                search_queries,
+                params['days_back_to_search'],
+                params['max_results_per_query'],
+                on_progress=on_search_progress,
+                video_filter=keep_video
+            )
+            analysis_state['negative_cache'] = negative_cache_stats
             
             logger.info(f"Found {len(all_videos)} videos total")
+            analysis_state['quota'] = youtube_analyzer.quota.remaining()
+            
+            # Filter pipeline: each filter runs as soon as its inputs are available, so
+            # channels are only fetched for videos that already passed the video-level filters
+            stage_counts = [{
+                'stage': 'negative_cache',
+                'input': len(all_videos) + negative_cache_stats['videos_skipped'],
+                'eliminated': negative_cache_stats['videos_skipped']
+            }]
+            analysis_state['stages'] = stage_counts
+            
+            def record_stage(stage, before, after, **details):
+                stage_counts.append({'stage': stage, 'input': len(before), 'eliminated': len(before) - len(after),
+                                     **details})
+                return after
+            
+            analysis_state['status'] = 'Filtering videos...'
+            analysis_state['progress'] = 40
+            
+            # Stage: dedupe videos returned by several queries
+            candidates = record_stage('dedupe', all_videos, list({v['video_id']: v for v in all_videos}.values()))
+            
+            # Stage: video statistics (videos.list drops anything that is not a short)
+            candidates = record_stage('video_stats', candidates,
+                                      [v for v in candidates if v['video_id'] in video_details])
             
-            # Get video details
-            analysis_state['status'] = 'Analyzing video performance...'
-            analysis_state['progress'] = 30
+            # Stage: video-level thresholds, scored for the whole candidate set at once
+            candidate_stats = [video_details[v['video_id']] for v in candidates]
+            video_metrics = youtube_analyzer.calculate_viral_metrics_batch(candidate_stats)
             
-            video_ids = [v['video_id'] for v in all_videos]
-            video_details = youtube_analyzer.get_video_details(video_ids)
+            survivors = []
+            for video, video_stats, views_per_day in zip(candidates, candidate_stats, video_metrics['views_per_day']):
+                if (video_stats['view_count'] > 0 and
+                    video_stats['duration_seconds'] <= params['max_duration_seconds'] and
+                    views_per_day >= params['min_views_per_day']):
+                    survivors.append(video)
+            candidates = record_stage('video_thresholds', candidates, survivors)
             
-            # Get channel details
+            # Stage: channel fetch, only for survivors. Unknown or stale channels are
+            # fetched; the rest come from the channel store
             analysis_state['status'] = 'Analyzing channels...'
-            analysis_state['progress'] = 40
             
-            channel_ids = list(set(v['channel_id'] for v in all_videos))
-            channel_details = youtube_analyzer.get_channel_details(channel_ids)
+            channel_ids = list(set(v['channel_id'] for v in candidates))
+            channel_details, stale_channel_ids = channel_store.load(channel_ids)
+            
+            fetched_channels = youtube_analyzer.get_channel_details(
+                stale_channel_ids,
+                on_progress=lambda done, total: analysis_state.update(progress=40 + done * 10 // total)
+            )
+            channel_store.save(fetched_channels)
+            channel_details.update(fetched_channels)
+            
+            analysis_state['channel_store'] = {
+                'reused': len(channel_ids) - len(stale_channel_ids),
+                'fetched': len(fetched_channels)
+            }
+            analysis_state['api_cache'] = youtube_analyzer.get_cache_stats()
+            analysis_state['quota'] = youtube_analyzer.quota.remaining()
             
-            # Filter and analyze videos
+            candidates = record_stage('channel_stats', candidates,
+                                      [v for v in candidates if v['channel_id'] in channel_details])
+            
+            # Stage: channel-level thresholds
             analysis_state['status'] = 'Filtering viral content...'
             analysis_state['progress'] = 50
             
+            too_old_channels = set()
+            scored_videos = []
+            
+            # Calculate metrics for all candidates in one vectorized pass
+            candidate_stats = [video_details[v['video_id']] for v in candidates]
+            candidate_channels = [channel_details[v['channel_id']] for v in candidates]
+            candidate_metrics = youtube_analyzer.calculate_viral_metrics_batch(candidate_stats, candidate_channels)
+            
+            for video, video_stats, channel_stats, metrics in zip(candidates, candidate_stats, candidate_channels,
+                                                                   candidate_metrics.to_dict('records')):
+                # Channel age only grows, so this rejection holds for future sessions too. Only an age
+                # read from the creation date is recorded, never the metrics' fallback for unknown ages
+                channel_age_days = known_channel_age_days(channel_stats)
+                if channel_age_days is not None and channel_age_days > params['max_channel_age_days']:
+                    too_old_channels.add(video['channel_id'])
+                
+                if (channel_stats['video_count'] <= params['max_channel_videos'] and
+                    metrics['channel_age_days'] <= params['max_channel_age_days']):
+                    scored_videos.append((video, video_stats, channel_stats, metrics))
+            
+            record_stage('channel_thresholds', candidates, scored_videos)
+            
+            channel_store.record_disqualified(too_old_channels, params['max_channel_age_days'])
+            negative_cache_stats['newly_disqualified'] = len(too_old_channels)
+            
+            # Stage: face detection, reusing cached results and scanning new thumbnails concurrently
             qualified_videos = []
+            face_results = [(False, 0.0)] * len(scored_videos)
+            
+            text_triage = {}
+            
+            if params['faceless_only']:
+                # Clear-cut titles/descriptions are decided without downloading the thumbnail
+                to_scan = list(range(len(scored_videos)))
+                if Config.FACE_TEXT_TRIAGE:
+                    decided, to_scan = get_face_text_scorer().triage(
+                        [(video['title'], video.get('description', '')) for video, _, _, _ in scored_videos],
+                        threshold=params['face_detection_threshold']
+                    )
+                    face_results = [decided.get(i, (False, 0.0)) for i in range(len(scored_videos))]
+                    text_triage = {
+                        'decided_face': sum(1 for has_face, _ in decided.values() if has_face),
+                        'decided_faceless': sum(1 for has_face, _ in decided.values() if not has_face),
+                        'scanned': len(to_scan)
+                    }
+                
+                to_scan_videos = [scored_videos[i][0] for i in to_scan]
+                analysis_state['status'] = f'Checking faces in {len(to_scan_videos)} thumbnails...'
+                scanned_results = face_detector.detect_faces_in_urls(
+                    [video['thumbnail_url'] for video in to_scan_videos],
+                    on_progress=lambda done, total: analysis_state.update(
+                        status=f'Checking faces: {done}/{total} thumbnails',
+                        progress=50 + done * 10 // total
+                    ),
+                    video_ids=[video['video_id'] for video in to_scan_videos],
+                    coarse_urls=[video.get('thumbnail_medium_url', '') for video in to_scan_videos],
+                    threshold=params['face_detection_threshold']
+                )
+                for i, result in zip(to_scan, scanned_results):
+                    face_results[i] = result
             
-            for video in all_videos:
-                video_id = video['video_id']
-                channel_id = video['channel_id']
+            for (video, video_stats, channel_stats, metrics), (has_face, face_confidence) in zip(scored_videos, face_results):
+                if params['faceless_only'] and face_detector.counts_as_face((has_face, face_confidence),
+                                                                            params['face_detection_threshold']):
+                    continue  # Skip videos with faces
                 
-                if video_id not in video_details or channel_id not in channel_details:
-                    continue
+                # Combine all data
+                combined_video = {
+                    **video,
+                    **video_stats,
+                    **metrics,
+                    'has_face': has_face,
+                    'face_confidence': face_confidence,
+                    'channel_stats': channel_stats
+                }
+                qualified_videos.append(combined_video)
+            
+            record_stage('face_detection', scored_videos, qualified_videos)
+            if params['faceless_only']:
+                analysis_state['face_detection'] = dict(face_detector.get_stats(), text_triage=text_triage)
+            
+            # Stage: channel activity (upload cadence, trailing views) from the uploads playlists of
+            # channels that passed every cheaper filter; stored with the channel metadata
+            channel_uploads = {}
+            if qualified_videos:
+                analysis_state['status'] = 'Checking channel activity...'
                 
-                video_stats = video_details[video_id]
-                channel_stats = channel_details[channel_id]
+                activity_channel_ids = list(set(v['channel_id'] for v in qualified_videos))
+                channel_activity, stale_activity_ids = channel_store.load_activity(activity_channel_ids)
+                refused = youtube_analyzer.quota.refusals('playlistItems', 'videos')
+                fetched_activity, channel_uploads = youtube_analyzer.get_channel_activity(
+                    stale_activity_ids, channel_details, known_videos=video_details,
+                    on_progress=lambda done, total: analysis_state.update(progress=60 + done * 5 // total)
+                )
+                channel_store.save_activity(fetched_activity)
+                channel_activity.update(fetched_activity)
                 
-                # Calculate metrics
-                metrics = youtube_analyzer.calculate_viral_metrics(video_stats, channel_stats)
+                inactive_channels = {
+                    channel_id for channel_id, activity in channel_activity.items()
+                    if (activity['weekly_uploads'] < params['min_weekly_uploads'] or
+                        activity['monthly_views'] < params['min_monthly_views'] or
+                        activity['views_7days'] < params['min_video_views_7days'])
+                }
+                # A channel whose uploads could not be read has no evidence either way: it is kept
+                # after a transient error, but not when the quota ran out and it was never checked
+                unavailable_channels = set(stale_activity_ids) - set(fetched_activity)
+                activity_checked = (params['min_weekly_uploads'] > 0 or params['min_monthly_views'] > 0 or
+                                    params['min_video_views_7days'] > 0)
+                if (unavailable_channels and activity_checked and
+                        youtube_analyzer.quota.refusals('playlistItems', 'videos') > refused):
+                    inactive_channels |= unavailable_channels
+                    analysis_state['degraded'].append(
+                        f'channel_activity: quota exhausted, {len(unavailable_channels)} channels dropped unchecked')
+                qualified_videos = record_stage('channel_activity', qualified_videos,
+                                                [v for v in qualified_videos if v['channel_id'] not in inactive_channels],
+                                                unavailable=len(unavailable_channels))
+                for video in qualified_videos:
+                    video['channel_activity'] = channel_activity.get(video['channel_id'], {})
                 
-                # Apply filters
-                if (video_stats['view_count'] > 0 and 
-                    metrics['views_per_day'] >= params['min_views_per_day'] and
-                    channel_stats['video_count'] <= params['max_channel_videos'] and
-                    metrics['channel_age_days'] <= params['max_channel_age_days']):
-                    
-                    # Face detection if required
-                    has_face = False
-                    face_confidence = 0.0
-                    
-                    if params['faceless_only']:
-                        analysis_state['status'] = f'Checking faces in video: {video["title"][:50]}...'
-                        has_face, face_confidence = face_detector.detect_faces_in_url(video['thumbnail_url'])
-                        
-                        if has_face and face_confidence > params['face_detection_threshold']:
-                            continue  # Skip videos with faces
-                    
-                    # Combine all data
-                    combined_video = {
-                        **video,
-                        **video_stats,
-                        **metrics,
-                        'has_face': has_face,
-                        'face_confidence': face_confidence,
-                        'channel_stats': channel_stats
-                    }
-                    qualified_videos.append(combined_video)
+                analysis_state['channel_store'] = dict(
+                    analysis_state['channel_store'],
+                    activity_reused=len(activity_channel_ids) - len(stale_activity_ids),
+                    activity_fetched=len(fetched_activity)
+                )
+                analysis_state['api_cache'] = youtube_analyzer.get_cache_stats()
+                analysis_state['quota'] = youtube_analyzer.quota.remaining()
+            
+            # Stage: channel face share, from a sample of each surviving channel's recent uploads
+            if params['faceless_only'] and qualified_videos:
+                analysis_state['status'] = 'Checking channel thumbnails...'
+                survivors, analysis_state['channel_faces'] = filter_face_heavy_channels(
+                    qualified_videos, params, youtube_analyzer, face_detector, channel_store,
+                    channel_uploads=channel_uploads,
+                    on_progress=lambda done, total: analysis_state.update(
+                        status=f'Checking channel thumbnails: {done}/{total} channels',
+                        progress=65 + done * 5 // total
+                    )
+                )
+                qualified_videos = record_stage('channel_faces', qualified_videos, survivors,
+                                                unavailable=analysis_state['channel_faces']['unavailable'])
+                # The channel scan runs on the same detector, so its counters have moved on
+                analysis_state['face_detection'] = dict(face_detector.get_stats(), text_triage=text_triage)
+                if analysis_state['channel_faces']['dropped_unchecked']:
+                    analysis_state['degraded'].append(
+                        f"channel_faces: quota exhausted, "
+                        f"{analysis_state['channel_faces']['dropped_unchecked']} channels dropped unchecked")
+                analysis_state['api_cache'] = youtube_analyzer.get_cache_stats()
+                analysis_state['quota'] = youtube_analyzer.quota.remaining()
             
             logger.info(f"Qualified {len(qualified_videos)} videos for analysis")
             
             # Save video data
             analysis_state['status'] = 'Saving video data...'
-            analysis_state['progress'] = 60
+            analysis_state['progress'] = 70
             
             for video in qualified_videos:
                 video_record = VideoData(
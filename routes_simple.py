@@ -1,11 +1,11 @@
 import threading
-import time
 from datetime import datetime, timedelta
 from flask import render_template, request, jsonify, redirect, url_for, make_response
 from app_simple import app, db
 from models import AnalysisSession, VideoData, NicheResult
 from youtube_analyzer import YouTubeAnalyzer
 from simple_face_detector import SimpleFaceDetector
+from face_text import get_face_text_scorer
 from simple_niche_analyzer import SimpleNicheAnalyzer
 from config import Config
 import json
@@ -130,7 +130,7 @@ def run_analysis(session_id: int, params: dict):
     """Run the complete analysis in background"""
     try:
         # Initialize components
-        youtube_analyzer = YouTubeAnalyzer()
+        youtube_analyzer = YouTubeAnalyzer(use_cache=params.get('use_cache', True))
         face_detector = SimpleFaceDetector()
         niche_analyzer = SimpleNicheAnalyzer()
         
@@ -155,21 +155,17 @@ def run_analysis(session_id: int, params: dict):
         })
         
         search_queries = Config.SEARCH_QUERIES[:5]  # Limit for Vercel
-        all_videos = []
         
-        for i, query in enumerate(search_queries):
-            analysis_states[session_id].update({
-                'status': f'Searching: {query}',
-                'progress': 10 + (i / len(search_queries)) * 20
+        # Searches run concurrently; the analyzer's shared rate limiter paces them
+        all_videos = youtube_analyzer.search_many(
+            search_queries,
+            days_back=params.get('days_back_to_search', 7),
+            max_results=min(params.get('max_results_per_query', 20), 20),  # Limit for Vercel
+            on_progress=lambda done, total: analysis_states[session_id].update({
+                'status': f'Searching: {done}/{total} queries complete',
+                'progress': 10 + (done / total) * 20
             })
-            
-            videos = youtube_analyzer.search_shorts(
-                query=query,
-                days_back=params.get('days_back_to_search', 7),
-                max_results=min(params.get('max_results_per_query', 20), 20)  # Limit for Vercel
-            )
-            all_videos.extend(videos)
-            time.sleep(0.1)  # Rate limiting
+        )
         
         # Remove duplicates
         unique_videos = {v['video_id']: v for v in all_videos}.values()
@@ -192,6 +188,8 @@ def run_analysis(session_id: int, params: dict):
         
         channel_ids = list(set(v['channel_id'] for v in all_videos if v.get('channel_id')))
         channel_details = youtube_analyzer.get_channel_details(channel_ids)
+        analysis_states[session_id]['api_cache'] = youtube_analyzer.get_cache_stats()
+        analysis_states[session_id]['quota'] = youtube_analyzer.quota.remaining()
         
         # Step 4: Face detection and viral scoring
         analysis_states[session_id].update({
@@ -199,11 +197,23 @@ def run_analysis(session_id: int, params: dict):
             'progress': 60
         })
         
+        # Clear-cut titles/descriptions are decided without probing the thumbnail
+        face_results = {}
+        to_probe = list(range(len(all_videos)))
+        if Config.FACE_TEXT_TRIAGE:
+            face_results, to_probe = get_face_text_scorer().triage(
+                [(v.get('title', ''), v.get('description', '')) for v in all_videos],
+                threshold=params.get('face_detection_threshold')
+            )
+        
+        # Remaining thumbnails are probed in one concurrent batch
+        probed = face_detector.detect_faces_in_urls([all_videos[i].get('thumbnail_url', '') for i in to_probe])
+        face_results.update(zip(to_probe, probed))
+        
         processed_videos = []
         for i, video in enumerate(all_videos):
             # Face detection
-            thumbnail_url = video.get('thumbnail_url', '')
-            has_face, face_confidence = face_detector.detect_faces_in_url(thumbnail_url)
+            has_face, face_confidence = face_results[i]
             
             # Get detailed video data
             video_details = detailed_videos.get(video['video_id'], {})
@@ -1,29 +1,46 @@
-import requests
-import base64
-from typing import Tuple, List
-import logging
-from urllib.parse import urlparse
 import re
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import Config
+from concurrency import map_concurrently
+from http_client import HTTPClient, get_http_client
+from face_text import FACE_KEYWORDS, FACELESS_KEYWORDS, FaceTextScorer
+from channel_sampling import sequential_face_scan
 
 logger = logging.getLogger(__name__)
 
+# URL markers matched alongside the face/faceless keywords
+YOUTUBE_HOSTS = ['ytimg.com', 'youtube.com']
+HIGH_QUALITY_NAMES = ['maxresdefault', 'hqdefault']
+
+# Thumbnail metadata (content type, content length) by URL, shared by every detector in the process
+_probe_cache = OrderedDict()
+_probe_cache_lock = threading.Lock()
+
+
 class SimpleFaceDetector:
     """
     Lightweight face detection without OpenCV/ML dependencies.
     Uses rule-based heuristics and optional external APIs.
     """
     
-    def __init__(self):
-        self.face_keywords = [
-            'face', 'eyes', 'smile', 'person', 'man', 'woman', 'guy', 'girl',
-            'selfie', 'portrait', 'headshot', 'closeup', 'talking', 'speaking'
-        ]
+    def __init__(self, http_client: HTTPClient = None, probe: str = None):
+        self.face_keywords = list(FACE_KEYWORDS)
+        self.faceless_indicators = list(FACELESS_KEYWORDS)
+        self.text_scorer = FaceTextScorer(self.face_keywords, self.faceless_indicators)
+        self.http = http_client or get_http_client()
+        self.probe = probe or Config.SIMPLE_FACE_PROBE
         
-        self.faceless_indicators = [
-            'screen', 'text', 'animation', 'cartoon', 'logo', 'graphic',
-            'chart', 'diagram', 'map', 'game', 'code', 'tutorial', 'how to',
-            'facts', 'tips', 'ai generated', 'voiceover', 'narration'
-        ]
+        # Every URL signal in one alternation, so a URL is scanned once
+        self.url_signals = {}
+        for names, kind in ((self.faceless_indicators, 'faceless'), (self.face_keywords, 'face'),
+                            (YOUTUBE_HOSTS, 'youtube'), (HIGH_QUALITY_NAMES, 'high_quality')):
+            for name in names:
+                self.url_signals[name] = kind
+        self.url_pattern = re.compile('|'.join(re.escape(name) for name in sorted(self.url_signals, key=len, reverse=True)))
     
     def detect_faces_in_url(self, image_url: str) -> Tuple[bool, float]:
         """
@@ -32,47 +49,91 @@ class SimpleFaceDetector:
         2. Filename analysis
         3. Image metadata if available
         """
+        return self.detect_faces_in_urls([image_url])[0]
+    
+    def detect_faces_in_urls(self, image_urls: List[str]) -> List[Tuple[bool, float]]:
+        """
+        Detect faces in many thumbnails, probing their metadata in one concurrent batch
+        Returns: [(has_face, confidence_score)] in input order
+        """
+        metadata = self.probe_thumbnails(image_urls) if self.probe == 'head' else {}
+        results = []
+        
+        for image_url in image_urls:
+            try:
+                # Method 1: URL and filename analysis
+                has_face_url, confidence_url = self._analyze_url_patterns(image_url)
+                
+                # Method 2: Simple image analysis (no ML)
+                has_face_simple, confidence_simple = self._simple_image_analysis(image_url, metadata.get(image_url))
+                
+                # Combine results with weighted average
+                final_confidence = (confidence_url * 0.4 + confidence_simple * 0.6)
+                has_face = final_confidence > 0.5
+                
+                results.append((has_face, final_confidence))
+            
+            except Exception as e:
+                logger.error(f"Error in face detection: {str(e)}")
+                results.append((False, 0.0))
+        
+        return results
+    
+    def probe_thumbnails(self, image_urls: List[str]) -> Dict[str, Tuple[str, int]]:
+        """
+        (content_type, content_length) per URL from HEAD requests on the pooled client.
+        Cached URLs are not requested again within THUMBNAIL_PROBE_TTL; failed probes are left out.
+        """
+        now = time.time()
+        metadata = {}
+        with _probe_cache_lock:
+            for url in image_urls:
+                entry = _probe_cache.get(url)
+                if entry is not None and entry[0] > now:
+                    metadata[url] = entry[1]
+        
+        missing = list({url for url in image_urls if url and url not in metadata})
+        for url, probed in zip(missing, map_concurrently(self._probe_thumbnail, missing,
+                                                         max_workers=Config.THUMBNAIL_DOWNLOAD_WORKERS)):
+            if probed is not None:
+                metadata[url] = probed
+        
+        with _probe_cache_lock:
+            expires_at = now + Config.THUMBNAIL_PROBE_TTL
+            for url in missing:
+                if url in metadata:
+                    _probe_cache[url] = (expires_at, metadata[url])
+                    _probe_cache.move_to_end(url)
+            while len(_probe_cache) > Config.THUMBNAIL_PROBE_CACHE_SIZE:
+                _probe_cache.popitem(last=False)
+        
+        return metadata
+    
+    def _probe_thumbnail(self, image_url: str) -> Optional[Tuple[str, int]]:
         try:
-            # Method 1: URL and filename analysis
-            has_face_url, confidence_url = self._analyze_url_patterns(image_url)
-            
-            # Method 2: Simple image analysis (no ML)
-            has_face_simple, confidence_simple = self._simple_image_analysis(image_url)
-            
-            # Combine results with weighted average
-            final_confidence = (confidence_url * 0.4 + confidence_simple * 0.6)
-            has_face = final_confidence > 0.5
-            
-            return has_face, final_confidence
-            
+            response = self.http.head(image_url, timeout=Config.THUMBNAIL_PROBE_TIMEOUT, max_retries=0)
+            return (response.headers.get('content-type', '').lower(),
+                    int(response.headers.get('content-length', 0)))
         except Exception as e:
-            logger.error(f"Error in face detection: {str(e)}")
-            return False, 0.0
+            logger.error(f"Error probing thumbnail {image_url}: {str(e)}")
+            return None
     
     def _analyze_url_patterns(self, image_url: str) -> Tuple[bool, float]:
         """
         Analyze URL and filename for face-related patterns
         """
         try:
-            url_lower = image_url.lower()
+            # Each signal counts once, however often it appears
+            matched = set(self.url_pattern.findall(image_url.lower()))
+            kinds = [self.url_signals[name] for name in matched]
             
-            # Check for faceless indicators in URL
-            faceless_score = 0
-            for indicator in self.faceless_indicators:
-                if indicator in url_lower:
-                    faceless_score += 1
-            
-            # Check for face indicators in URL
-            face_score = 0
-            for keyword in self.face_keywords:
-                if keyword in url_lower:
-                    face_score += 1
+            faceless_score = kinds.count('faceless')
+            face_score = kinds.count('face')
             
             # YouTube thumbnail analysis
-            if 'ytimg.com' in url_lower or 'youtube.com' in url_lower:
+            if 'youtube' in kinds and 'high_quality' in kinds:
                 # Check thumbnail quality (higher quality often means faces)
-                if 'maxresdefault' in url_lower or 'hqdefault' in url_lower:
-                    face_score += 0.5  # Slight bias toward face content
+                face_score += 0.5  # Slight bias toward face content
             
             # Calculate confidence
             total_signals = face_score + faceless_score
@@ -81,22 +142,24 @@ class SimpleFaceDetector:
             
             face_confidence = face_score / total_signals
             return face_confidence > 0.5, face_confidence
-            
+        
         except Exception as e:
             logger.error(f"Error analyzing URL patterns: {str(e)}")
             return False, 0.3
     
-    def _simple_image_analysis(self, image_url: str) -> Tuple[bool, float]:
+    def _simple_image_analysis(self, image_url: str, metadata: Optional[Tuple[str, int]] = None) -> Tuple[bool, float]:
         """
-        Simple image analysis without heavy ML libraries
+        Simple image analysis without heavy ML libraries, from probed metadata when available,
+        otherwise from the URL alone
         """
         try:
-            # Download and analyze image headers/metadata
-            response = requests.head(image_url, timeout=5)
-            
-            # Check content type and size
-            content_type = response.headers.get('content-type', '').lower()
-            content_length = int(response.headers.get('content-length', 0))
+            if metadata is not None:
+                content_type, content_length = metadata
+            else:
+                # No network: YouTube serves every named thumbnail size as JPEG
+                path = image_url.lower().split('?', 1)[0]
+                content_type = 'image/jpeg' if path.endswith(('.jpg', '.jpeg')) else ''
+                content_length = 0
             
             confidence = 0.3  # Base confidence
             
@@ -111,64 +174,49 @@ class SimpleFaceDetector:
                 confidence += 0.1
             
             return confidence > 0.5, confidence
-            
+        
         except Exception as e:
             logger.error(f"Error in simple image analysis: {str(e)}")
             return False, 0.3
     
-    def analyze_channel_thumbnails(self, video_thumbnails: List[str]) -> Tuple[float, int]:
+    def analyze_channel_thumbnails(self, video_thumbnails: List[str],
+                                   max_face_percentage: float = None) -> Tuple[float, int, int]:
         """
         Analyze multiple thumbnails to determine channel faceless percentage
+        With max_face_percentage, probing stops once the channel is clearly above or below it.
+        Returns: (average_face_confidence, face_percentage, thumbnails_scanned)
         """
         try:
             if not video_thumbnails:
-                return 0.0, 0
+                return 0.0, 0, 0
             
-            total_confidence = 0
-            face_count = 0
+            sample = video_thumbnails[:10]  # Analyze max 10 thumbnails
+            results, _ = sequential_face_scan(
+                lambda indices: self.detect_faces_in_urls([sample[i] for i in indices]),
+                list(range(len(sample))), lambda result: result[0],
+                max_face_ratio=max_face_percentage / 100 if max_face_percentage is not None else None
+            )
             
-            for thumbnail_url in video_thumbnails[:10]:  # Analyze max 10 thumbnails
-                has_face, confidence = self.detect_faces_in_url(thumbnail_url)
-                total_confidence += confidence
-                if has_face:
-                    face_count += 1
+            total_confidence = sum(confidence for _, confidence in results.values())
+            face_count = sum(1 for has_face, _ in results.values() if has_face)
             
-            avg_confidence = total_confidence / len(video_thumbnails[:10])
-            face_percentage = (face_count / len(video_thumbnails[:10])) * 100
+            avg_confidence = total_confidence / len(results)
+            face_percentage = (face_count / len(results)) * 100
             
-            return avg_confidence, int(face_percentage)
+            return avg_confidence, int(face_percentage), len(results)
             
         except Exception as e:
             logger.error(f"Error analyzing channel thumbnails: {str(e)}")
-            return 0.0, 0
+            return 0.0, 0, 0
     
     def analyze_video_title_for_face_content(self, title: str, description: str = "") -> float:
         """
         Analyze video title and description for face-related content
         """
         try:
-            text = f"{title} {description}".lower()
-            
-            # Look for face-related keywords
-            face_indicators = 0
-            for keyword in self.face_keywords:
-                if keyword in text:
-                    face_indicators += text.count(keyword)
-            
-            # Look for faceless content indicators
-            faceless_indicators = 0
-            for indicator in self.faceless_indicators:
-                if indicator in text:
-                    faceless_indicators += text.count(indicator)
-            
-            # Calculate face probability based on text analysis
-            total_indicators = face_indicators + faceless_indicators
-            if total_indicators == 0:
-                return 0.3  # Neutral
-            
-            face_probability = face_indicators / total_indicators
-            return min(face_probability, 1.0)
-            
+            probability, _, _ = self.text_scorer.score(title, description)
+            return probability
+        
         except Exception as e:
             logger.error(f"Error analyzing video title: {str(e)}")
-            return 0.3
\ No newline at end of file
+            return 0.3
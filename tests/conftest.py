@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config reads these at import time: keep test databases and caches out of the working tree
+_work_dir = tempfile.mkdtemp(prefix='nichehunter_tests_')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_work_dir, 'test.db')}")
+os.environ.setdefault('CACHE_DIR', os.path.join(_work_dir, 'cache'))
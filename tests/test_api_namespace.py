@@ -0,0 +1,57 @@
+import pytest
+
+from config import Config, api_namespace
+from response_cache import ResponseCache
+
+
+def test_youtube_api_has_the_default_namespace():
+    assert api_namespace('https://www.googleapis.com/youtube/v3') == ''
+    assert api_namespace('https://youtube.googleapis.com/youtube/v3/') == ''
+
+
+def test_other_hosts_get_their_own_namespace():
+    assert api_namespace('http://127.0.0.1:8765') == '127-0-0-1-8765'
+    assert api_namespace('http://127.0.0.1:8765') != api_namespace('http://127.0.0.1:8766')
+
+
+def test_cache_entries_are_kept_apart_per_namespace(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / 'responses.db'))
+    params = {'part': 'statistics', 'id': 'abc'}
+    cache.set('videos', params, {'items': ['mock']}, namespace='127-0-0-1-8765')
+
+    assert cache.get('videos', params) is None
+    assert cache.get('videos', params, namespace='127-0-0-1-8765') == {'items': ['mock']}
+
+
+def test_mock_api_is_not_charged_to_the_daily_ledger():
+    pytest.importorskip('requests')
+    from youtube_analyzer import YouTubeAnalyzer
+
+    assert YouTubeAnalyzer(base_url='http://127.0.0.1:8765').quota.ledger is None
+    assert YouTubeAnalyzer(base_url=Config.YOUTUBE_API_BASE_URL).quota.ledger is not None
+
+
+def test_channel_store_keeps_namespaces_apart():
+    pytest.importorskip('flask_sqlalchemy')
+    from app import app, db
+    from channel_store import ChannelStore
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        mock_store = ChannelStore(namespace='127-0-0-1-8765')
+        mock_store.save({'UC00000001': {'title': 'Mock channel'}})
+        mock_store.record_disqualified({'UC00000002'}, 30)
+
+        real_store = ChannelStore()
+        assert real_store.load(['UC00000001']) == ({}, ['UC00000001'])
+        assert real_store.load_disqualified(30) == set()
+        assert mock_store.load(['UC00000001'])[0]['UC00000001']['title'] == 'Mock channel'
+        assert mock_store.load_disqualified(30) == {'UC00000002'}
+
+
+def test_niche_models_are_stored_per_namespace():
+    pytest.importorskip('sklearn')
+    from niche_model import get_niche_model
+
+    assert get_niche_model('127-0-0-1-8765').path != get_niche_model().path
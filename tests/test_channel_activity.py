@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip('requests')
+
+from mock_youtube_api import MockYouTubeAPI
+from quota import QuotaBudget, quota_cost
+from youtube_analyzer import YouTubeAnalyzer
+
+
+def channel(channel_id, age_days):
+    created_at = datetime.now(timezone.utc) - timedelta(days=age_days)
+    return {'id': channel_id, 'snippet': {'title': channel_id, 'publishedAt': created_at.strftime('%Y-%m-%dT%H:%M:%SZ')},
+            'statistics': {'subscriberCount': '1', 'videoCount': '1', 'viewCount': '1'}}
+
+
+def video(video_id, channel_id, days_ago, views):
+    published_at = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    return {'id': video_id,
+            'snippet': {'title': video_id, 'description': '', 'channelId': channel_id, 'channelTitle': channel_id,
+                        'publishedAt': published_at.strftime('%Y-%m-%dT%H:%M:%SZ'), 'thumbnails': {}},
+            'contentDetails': {'duration': 'PT30S'},
+            'statistics': {'viewCount': str(views), 'likeCount': '0', 'commentCount': '0'}}
+
+
+@pytest.fixture
+def analyzer():
+    corpus = {
+        'channels': [channel('UCactive001', 60), channel('UCdormant01', 400)],
+        'videos': [video('active-1', 'UCactive001', 1, 1000), video('active-2', 'UCactive001', 10, 500),
+                   video('active-3', 'UCactive001', 40, 9999), video('dormant-1', 'UCdormant01', 45, 100000)]
+    }
+    api = MockYouTubeAPI(corpus)
+    api.start()
+    yield YouTubeAnalyzer(base_url=api.base_url, use_cache=False)
+    api.stop()
+
+
+@pytest.fixture
+def exhausted_analyzer(analyzer):
+    analyzer.quota = QuotaBudget(session_limit=0)
+    return analyzer
+
+
+def test_activity_counts_uploads_and_views_in_the_window(analyzer):
+    activity, uploads = analyzer.get_channel_activity(['UCactive001'], {})
+
+    assert [video['video_id'] for video in uploads['UCactive001']] == ['active-1', 'active-2']
+    assert activity['UCactive001']['weekly_uploads'] == pytest.approx(2 * 7 / 30)
+    assert activity['UCactive001']['monthly_views'] == 1500
+    assert activity['UCactive001']['views_7days'] == 1000
+
+
+def test_channel_without_recent_uploads_has_zero_activity(analyzer):
+    activity, uploads = analyzer.get_channel_activity(['UCdormant01'], {})
+
+    assert uploads == {'UCdormant01': []}
+    assert activity['UCdormant01'] == {'weekly_uploads': 0, 'monthly_views': 0, 'views_7days': 0, 'uploads_counted': 0}
+
+
+def test_channel_whose_playlist_cannot_be_read_is_left_out(analyzer):
+    activity, uploads = analyzer.get_channel_activity(['UCmissing01'], {})
+
+    assert activity == {} and uploads == {}
+
+
+def test_malformed_creation_date_counts_as_an_unknown_age(analyzer):
+    activity, _ = analyzer.get_channel_activity(['UCactive001'], {'UCactive001': {'created_at': 'last spring'}})
+
+    assert activity['UCactive001']['weekly_uploads'] == pytest.approx(2 * 7 / 30)
+
+
+def test_channel_is_left_out_once_the_quota_is_exhausted(exhausted_analyzer):
+    activity, uploads = exhausted_analyzer.get_channel_activity(['UCactive001', 'UCdormant01'], {})
+
+    assert activity == {} and uploads == {}
+    assert exhausted_analyzer.quota.refusals('playlistItems') == 2
+
+
+def test_channel_is_left_out_when_upload_statistics_are_refused(analyzer):
+    analyzer.quota = QuotaBudget(session_limit=quota_cost('playlistItems'))
+
+    activity, uploads = analyzer.get_channel_activity(['UCactive001'], {})
+
+    assert 'UCactive001' in uploads and activity == {}
+    assert analyzer.quota.refusals('videos') == 1
+
+
+def test_video_lookups_are_cached_per_id(tmp_path):
+    from response_cache import ResponseCache
+
+    api = MockYouTubeAPI({'channels': [channel('UCactive001', 60)],
+                          'videos': [video(f'video-{i}', 'UCactive001', 1, 100) for i in range(3)]})
+    api.start()
+    try:
+        analyzer = YouTubeAnalyzer(base_url=api.base_url, cache=ResponseCache(path=str(tmp_path / 'responses.db')))
+        analyzer.get_video_details(['video-0', 'video-1', 'missing'])
+        before = dict(api.request_counts)
+
+        details = analyzer.get_video_details(['video-1', 'missing', 'video-0'])
+        assert set(details) == {'video-0', 'video-1'}
+        assert api.request_counts == before
+
+        analyzer.get_video_details(['video-0', 'video-2'])
+        assert api.request_counts['videos'] == before['videos'] + 1
+    finally:
+        api.stop()
@@ -0,0 +1,123 @@
+import pytest
+
+pytest.importorskip('cv2')
+pytest.importorskip('flask_sqlalchemy')
+
+from app import app, db
+from channel_store import ChannelStore
+from face_detector import FaceDetector
+from models import ChannelFaceResult
+from quota import QuotaBudget, QuotaExceededError
+import routes
+
+
+class FakeYouTubeAnalyzer:
+    def __init__(self, uploads, session_limit=10000):
+        self.uploads = uploads
+        self.requested = []
+        self.quota = QuotaBudget(session_limit=session_limit)
+
+    def get_channel_uploads(self, channel_ids, max_results=None, on_progress=None, published_after=None):
+        self.requested.extend(channel_ids)
+        readable = {}
+        for channel_id in channel_ids:
+            try:
+                self.quota.charge('playlistItems')
+            except QuotaExceededError:
+                continue
+            if channel_id in self.uploads:
+                readable[channel_id] = self.uploads[channel_id]
+        return readable
+
+
+def uploads_for(channel_id, count=12):
+    return [{'video_id': f'{channel_id}-{i}', 'thumbnail_url': f'http://thumbs.test/{channel_id}/{i}.jpg'}
+            for i in range(count)]
+
+
+@pytest.fixture
+def store():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield ChannelStore()
+
+
+@pytest.fixture
+def face_detector(monkeypatch):
+    detector = FaceDetector(use_cache=False)
+
+    def detect_faces_in_urls(image_urls, video_ids=None, threshold=None, **kwargs):
+        return [(True, 0.95) if '/UCfaces' in url else (False, 0.05) for url in image_urls]
+
+    monkeypatch.setattr(detector, 'detect_faces_in_urls', detect_faces_in_urls)
+    return detector
+
+
+def test_channel_with_faces_in_every_thumbnail_is_removed(store, face_detector):
+    params = dict(routes.Config.DEFAULT_PARAMS)
+    videos = [{'video_id': f'{channel_id}-hit{i}', 'channel_id': channel_id}
+              for channel_id in ('UCfaces01', 'UCclean01') for i in range(2)]
+    analyzer = FakeYouTubeAnalyzer({'UCfaces01': uploads_for('UCfaces01'), 'UCclean01': uploads_for('UCclean01')})
+
+    survivors, stats = routes.filter_face_heavy_channels(videos, params, analyzer, face_detector, store)
+
+    assert {v['channel_id'] for v in survivors} == {'UCclean01'}
+    assert stats['face_heavy'] == 1
+    assert stats['scored'] == 2
+
+    record = ChannelFaceResult.query.filter_by(channel_id='UCfaces01').one()
+    assert record.face_percentage == 100
+    assert record.avg_confidence == pytest.approx(0.95)
+
+
+def test_stored_channel_scores_are_reused(store, face_detector):
+    params = dict(routes.Config.DEFAULT_PARAMS)
+    videos = [{'video_id': 'UCfaces01-hit', 'channel_id': 'UCfaces01'}]
+    routes.filter_face_heavy_channels(videos, params, FakeYouTubeAnalyzer({'UCfaces01': uploads_for('UCfaces01')}),
+                                      face_detector, store)
+
+    analyzer = FakeYouTubeAnalyzer({})
+    survivors, stats = routes.filter_face_heavy_channels(videos, params, analyzer, face_detector, store)
+
+    assert survivors == []
+    assert stats['reused'] == 1
+    assert analyzer.requested == []
+
+
+def test_channel_without_readable_uploads_is_kept_and_not_stored(store, face_detector):
+    params = dict(routes.Config.DEFAULT_PARAMS)
+    videos = [{'video_id': 'UCfaces02-hit', 'channel_id': 'UCfaces02'}]
+
+    survivors, stats = routes.filter_face_heavy_channels(videos, params, FakeYouTubeAnalyzer({}), face_detector, store)
+
+    assert survivors == videos
+    assert stats['unavailable'] == 1
+    assert ChannelFaceResult.query.count() == 0
+    assert stats['dropped_unchecked'] == 0
+
+
+def test_channel_left_unread_by_an_exhausted_quota_is_dropped(store, face_detector):
+    params = dict(routes.Config.DEFAULT_PARAMS)
+    videos = [{'video_id': 'UCclean02-hit', 'channel_id': 'UCclean02'}]
+    analyzer = FakeYouTubeAnalyzer({'UCclean02': uploads_for('UCclean02')}, session_limit=0)
+
+    survivors, stats = routes.filter_face_heavy_channels(videos, params, analyzer, face_detector, store)
+
+    assert survivors == []
+    assert stats['unavailable'] == 1 and stats['dropped_unchecked'] == 1
+    assert ChannelFaceResult.query.count() == 0
+
+
+def test_activity_uploads_are_reused_only_when_they_fill_the_sample(store, face_detector):
+    params = dict(routes.Config.DEFAULT_PARAMS)
+    videos = [{'video_id': f'{channel_id}-hit', 'channel_id': channel_id} for channel_id in ('UCclean03', 'UCclean04')]
+    analyzer = FakeYouTubeAnalyzer({'UCclean03': uploads_for('UCclean03'), 'UCclean04': uploads_for('UCclean04')})
+    activity_uploads = {'UCclean03': uploads_for('UCclean03', routes.Config.CHANNEL_FACE_SAMPLE),
+                        'UCclean04': uploads_for('UCclean04', 2)}
+
+    survivors, stats = routes.filter_face_heavy_channels(videos, params, analyzer, face_detector, store,
+                                                         channel_uploads=activity_uploads)
+
+    assert analyzer.requested == ['UCclean04']
+    assert stats['scored'] == 2
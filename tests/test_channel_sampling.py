@@ -0,0 +1,79 @@
+import math
+
+import pytest
+
+from channel_sampling import sequential_face_scan, wilson_interval
+
+
+def scan(faces, max_face_ratio, first_round=None):
+    detected = []
+
+    def detect(indices):
+        detected.append(list(indices))
+        return [faces[i] for i in indices]
+
+    results, decision = sequential_face_scan(detect, list(range(len(faces))), lambda result: result,
+                                             max_face_ratio=max_face_ratio, first_round=first_round)
+    return results, decision, detected
+
+
+def test_wilson_interval_before_any_trial_is_uninformative():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_wilson_interval_brackets_the_observed_share():
+    low, high = wilson_interval(3, 10, z=1.96)
+    assert low < 0.3 < high
+    assert low == pytest.approx(0.1078, abs=1e-4)
+    assert high == pytest.approx(0.6032, abs=1e-4)
+
+
+def test_wilson_upper_bound_with_no_faces_needs_25_thumbnails_at_10_percent():
+    needed = math.ceil(1.645 ** 2 * 0.9 / 0.1)
+    assert needed == 25
+    assert wilson_interval(0, needed - 1, z=1.645)[1] > 0.1
+    assert wilson_interval(0, needed, z=1.645)[1] <= 0.1
+
+
+def test_face_heavy_channel_stops_after_the_first_round():
+    results, decision, detected = scan([True] * 12, 0.1)
+
+    assert decision == 'face-heavy'
+    assert len(results) == 4
+    assert detected == [[0, 1, 2, 3]]
+
+
+def test_faceless_channel_at_10_percent_stops_after_two_rounds():
+    results, decision, detected = scan([False] * 12, 0.1)
+
+    assert decision == 'faceless'
+    assert len(results) == 8
+    assert detected == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+
+def test_faceless_channel_stops_after_the_first_round_at_a_looser_limit():
+    results, decision, _ = scan([False] * 12, 0.3)
+
+    assert decision == 'faceless'
+    assert len(results) == 4
+
+
+def test_single_face_keeps_the_scan_going_until_the_share_is_settled():
+    results, decision, _ = scan([True] + [False] * 11, 0.1)
+
+    assert decision == 'faceless'
+    assert len(results) == 12
+
+
+def test_first_round_covers_cached_thumbnails():
+    _, _, detected = scan([False] * 12, 0.1, first_round=6)
+
+    assert [len(batch) for batch in detected] == [6, 4]
+
+
+def test_without_a_limit_everything_is_scanned_in_one_round():
+    results, decision, detected = scan([False, True, False], None)
+
+    assert decision == 'exhausted'
+    assert results == {0: False, 1: True, 2: False}
+    assert detected == [[0, 1, 2]]
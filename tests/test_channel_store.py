@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+
+from app import app, db
+from channel_store import ChannelStore
+from models import DisqualifiedChannel
+
+
+@pytest.fixture
+def store():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield ChannelStore()
+
+
+def test_disqualified_channel_fails_thresholds_up_to_the_rejecting_one(store):
+    store.record_disqualified({'UCold'}, 90)
+
+    assert store.load_disqualified(30) == {'UCold'}
+    assert store.load_disqualified(90) == {'UCold'}
+    assert store.load_disqualified(91) == set()
+
+
+def test_later_weaker_rejection_keeps_the_stronger_one(store):
+    store.record_disqualified({'UCold'}, 365)
+    store.record_disqualified({'UCold'}, 30)
+
+    record = DisqualifiedChannel.query.one()
+    assert record.threshold == 365
+    assert store.load_disqualified(365) == {'UCold'}
+
+    store.record_disqualified({'UCold'}, 400)
+    assert DisqualifiedChannel.query.one().threshold == 400
+
+
+def test_rejection_grows_with_elapsed_time(store):
+    store.record_disqualified({'UCold'}, 30)
+    record = DisqualifiedChannel.query.one()
+    record.rejected_at -= timedelta(days=10)
+    record.created_before -= timedelta(days=10)
+    db.session.commit()
+
+    assert store.load_disqualified(40) == {'UCold'}
+    assert store.load_disqualified(41) == set()
@@ -0,0 +1,83 @@
+import random
+import threading
+import time
+
+from concurrency import RateLimiter, map_concurrently
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_rate_limiter_allows_a_burst_then_paces_calls():
+    limiter = RateLimiter(rate=20, burst=3)
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - started < 0.04
+
+    for _ in range(4):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.18
+
+
+def test_rate_limiter_serves_lower_priority_values_first():
+    limiter = RateLimiter(rate=4, burst=1)
+    limiter.acquire()  # empty the bucket so later callers queue
+    served = []
+
+    def call(name, priority):
+        limiter.acquire(priority)
+        served.append(name)
+
+    background = threading.Thread(target=call, args=('background', 1))
+    background.start()
+    wait_for(lambda: len(limiter.waiters) == 1)
+    urgent = threading.Thread(target=call, args=('urgent', 0))
+    urgent.start()
+    wait_for(lambda: len(limiter.waiters) == 2)
+
+    background.join(timeout=5)
+    urgent.join(timeout=5)
+    assert served == ['urgent', 'background']
+
+
+def test_rate_limiter_serves_equal_priorities_in_arrival_order():
+    limiter = RateLimiter(rate=20, burst=1)
+    limiter.acquire()
+    served = []
+    threads = []
+
+    for i in range(4):
+        thread = threading.Thread(target=lambda i=i: (limiter.acquire(), served.append(i)))
+        thread.start()
+        threads.append(thread)
+        wait_for(lambda: len(limiter.waiters) == i + 1)
+
+    for thread in threads:
+        thread.join(timeout=5)
+    assert served == [0, 1, 2, 3]
+
+
+def test_map_concurrently_keeps_input_order():
+    def slow_square(x):
+        time.sleep(random.random() * 0.01)
+        return x * x
+
+    progress = []
+    results = map_concurrently(slow_square, range(50), max_workers=8,
+                               on_progress=lambda done, total: progress.append((done, total)))
+
+    assert results == [x * x for x in range(50)]
+    assert progress == [(done, 50) for done in range(1, 51)]
+
+
+def test_map_concurrently_runs_inline_with_one_worker():
+    callers = set()
+    results = map_concurrently(lambda x: callers.add(threading.get_ident()) or -x, [1, 2, 3], max_workers=1)
+
+    assert results == [-1, -2, -3]
+    assert callers == {threading.get_ident()}
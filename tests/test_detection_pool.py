@@ -0,0 +1,78 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+import numpy as np
+
+import face_detector
+from config import Config
+from face_detector import FaceDetector, get_detection_pool
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    monkeypatch.setattr(Config, 'FACE_DETECTION_PROCESSES', True)
+    monkeypatch.setattr(Config, 'FACE_DETECTION_WORKERS', 2)
+    monkeypatch.setattr(face_detector, '_detection_pool', None)
+    monkeypatch.setattr(face_detector, '_detection_pool_engine', None)
+    monkeypatch.setattr(face_detector, '_detection_pool_restarts', 0)
+    yield
+    if face_detector._detection_pool is not None:
+        face_detector._detection_pool.shutdown()
+
+
+def break_pool(detector):
+    pool, engine = get_detection_pool(detector.cascade_path, detector.dnn_model)
+    assert engine == 'process'
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(os._exit, 1).result()
+    return pool
+
+
+def blank_thumbnail():
+    return np.full((90, 120, 3), 200, dtype=np.uint8)
+
+
+def test_image_batch_is_retried_on_a_new_pool(process_pool):
+    detector = FaceDetector(use_cache=False)
+    broken = break_pool(detector)
+
+    assert detector.detect_faces_in_images([blank_thumbnail()] * 3) == [(False, 0.0)] * 3
+    assert detector.stats['images'] == 3  # detected, not the error fallback
+    assert face_detector._detection_pool is not broken
+
+
+def test_url_detection_survives_a_dead_worker(process_pool, monkeypatch):
+    detector = FaceDetector(use_cache=False)
+    detector.prefilter = None
+    content = cv2.imencode('.jpg', blank_thumbnail())[1].tobytes()
+    monkeypatch.setattr(detector, '_download_thumbnail', lambda url, with_phash=False: (content, None))
+    monkeypatch.setattr(Config, 'FACE_PHASH_DEDUPE', False)
+    broken = break_pool(detector)
+
+    results = detector.detect_faces_in_urls([f'http://thumbs.test/{i}.jpg' for i in range(4)])
+
+    assert results == [(False, 0.0)] * 4
+    assert detector.stats['cascade_runs'] == 4
+    assert face_detector._detection_pool is not broken
+
+
+def test_falls_back_to_threads_after_repeated_breaks(process_pool, monkeypatch):
+    monkeypatch.setattr(Config, 'FACE_DETECTION_MAX_RESTARTS', 0)
+    detector = FaceDetector(use_cache=False)
+    broken = break_pool(detector)
+
+    face_detector.reset_detection_pool(broken)
+
+    assert get_detection_pool(detector.cascade_path, detector.dnn_model)[1] == 'thread'
+
+
+def test_pool_is_only_started_by_a_detection(process_pool, monkeypatch):
+    detector = FaceDetector(use_cache=False)
+    monkeypatch.setattr(detector, '_download_thumbnail', lambda url, with_phash=False: (None, None))
+
+    assert detector.detect_faces_in_urls(['http://thumbs.test/missing.jpg']) == [(False, 0.0)]
+    assert detector.get_stats()['pool'] is None
+    assert face_detector._detection_pool is None
@@ -0,0 +1,62 @@
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+import numpy as np
+
+from config import Config
+from face_cache import FaceResultCache
+from face_detector import FaceDetector
+
+
+def test_undecodable_thumbnail_is_not_cached_as_faceless(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'FACE_PHASH_DEDUPE', False)
+    cache = FaceResultCache(path=str(tmp_path / 'face_results.db'))
+    detector = FaceDetector(cache=cache)
+    detector.prefilter = None
+    thumbnail = cv2.imencode('.jpg', np.full((90, 120, 3), 200, dtype=np.uint8))[1].tobytes()
+    downloads = {'http://thumbs.test/broken.jpg': b'<html>not an image</html>', 'http://thumbs.test/ok.jpg': thumbnail}
+    monkeypatch.setattr(detector, '_download_thumbnail', lambda url, with_phash=False: (downloads[url], None))
+
+    results = detector.detect_faces_in_urls(list(downloads), video_ids=['broken', 'ok'])
+
+    assert results == [(False, 0.0), (False, 0.0)]
+    threshold = Config.DEFAULT_PARAMS['face_detection_threshold']
+    assert set(cache.get_by_video(['broken', 'ok'], detector.get_engine_key(False, threshold))) == {'ok'}
+
+
+def test_channel_scan_reuses_results_of_the_per_video_pass(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'FACE_PHASH_DEDUPE', False)
+    monkeypatch.setattr(Config, 'FACE_DETECTION_MULTIRES', True)
+    detector = FaceDetector(cache=FaceResultCache(path=str(tmp_path / 'face_results.db')))
+    detector.prefilter = None
+    thumbnail = cv2.imencode('.jpg', np.full((90, 120, 3), 200, dtype=np.uint8))[1].tobytes()
+    downloaded = []
+
+    def download(url, with_phash=False):
+        downloaded.append(url)
+        return thumbnail, None
+
+    monkeypatch.setattr(detector, '_download_thumbnail', download)
+    urls = [f'http://thumbs.test/{i}.jpg' for i in range(3)]
+    coarse_urls = [f'http://thumbs.test/{i}-medium.jpg' for i in range(3)]
+    video_ids = [f'video-{i}' for i in range(3)]
+    detector.detect_faces_in_urls(urls, video_ids=video_ids, coarse_urls=coarse_urls)
+    downloaded.clear()
+
+    _, face_percentage, scanned = detector.analyze_channel_thumbnails(urls, video_ids=video_ids, max_face_percentage=10,
+                                                                      coarse_urls=coarse_urls)
+
+    assert (face_percentage, scanned) == (0, 3)
+    assert downloaded == []
+
+
+def test_dnn_detections_are_not_held_to_the_haar_threshold():
+    detector = FaceDetector(use_cache=False)
+    detector.engine = 'dnn'
+
+    assert detector.counts_as_face((True, 0.6), threshold=0.7)
+    assert not detector.counts_as_face((False, 0.4), threshold=0.3)
+
+    detector.engine = 'haar'
+    assert not detector.counts_as_face((True, 0.6), threshold=0.7)
+    assert detector.counts_as_face((True, 0.8), threshold=0.7)
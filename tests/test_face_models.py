@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('cv2')
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_command_line_checks_the_models():
+    # The FaceModelError messages point users at this entry point
+    result = subprocess.run([sys.executable, os.path.join(APP_DIR, 'face_detector.py'), '--engine', 'haar'],
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert 'Face models OK' in result.stdout
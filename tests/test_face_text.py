@@ -0,0 +1,54 @@
+from face_text import FaceTextScorer
+
+
+def test_keywords_match_whole_words_and_plurals():
+    scorer = FaceTextScorer()
+
+    assert scorer.count('Two faces, three smiles') == (2, 0)
+    assert scorer.count('Surface interface preface') == (0, 0)
+    assert scorer.count('How to draw maps: tips and facts') == (0, 4)
+
+
+def test_triage_decides_clear_cases_from_text():
+    scorer = FaceTextScorer()
+    texts = [
+        ('Minecraft animation facts', 'AI generated voiceover'),  # faceless keywords only
+        ('Selfie portrait of a smiling woman', 'Talking about my face'),  # face keywords only
+    ]
+
+    decided, undecided = scorer.triage(texts, threshold=0.5)
+
+    assert decided == {0: (False, 0.0), 1: (True, 1.0)}
+    assert undecided == []
+
+
+def test_triage_leaves_weak_or_mixed_signals_for_the_detector():
+    scorer = FaceTextScorer()
+    texts = [
+        ('Cooking pasta', ''),  # no keywords
+        ('Game tutorial', 'my face reacting'),  # mixed
+        ('Code tips', ''),  # two faceless keywords are enough
+        ('A man', ''),  # a single face keyword is not enough
+    ]
+
+    decided, undecided = scorer.triage(texts, threshold=0.5)
+
+    assert 2 in decided and decided[2] == (False, 0.0)
+    assert sorted(undecided) == [0, 1, 3]
+
+
+def test_undecided_videos_are_ranked_most_likely_faceless_first():
+    scorer = FaceTextScorer()
+    texts = [('A man', ''), ('Cooking pasta', ''), ('Game tutorial', 'a man talking')]
+
+    _, undecided = scorer.triage(texts, threshold=0.5)
+
+    assert undecided == [1, 2, 0]  # probabilities 0.3, 0.5, 1.0
+
+
+def test_face_decision_needs_the_detection_threshold():
+    scorer = FaceTextScorer()
+    texts = [('Selfie portrait', '')]
+
+    assert scorer.triage(texts, threshold=0.5)[0] == {0: (True, 1.0)}
+    assert scorer.triage(texts, threshold=1.0) == ({}, [0])
@@ -0,0 +1,84 @@
+import os
+import random
+
+import pytest
+
+pytest.importorskip('sklearn')
+
+from niche_model import NicheModel
+
+TOPICS = {
+    'space': ['planet', 'galaxy', 'astronaut', 'rocket', 'orbit', 'nebula', 'telescope', 'comet'],
+    'cooking': ['recipe', 'pasta', 'kitchen', 'chef', 'sauce', 'baking', 'garlic', 'dessert']
+}
+
+
+def topic_videos(count, seed=1):
+    rng = random.Random(seed)
+    videos = []
+    for i in range(count):
+        topic = sorted(TOPICS)[i % len(TOPICS)]
+        videos.append((f'{topic}-{seed}-{i}', ' '.join(rng.sample(TOPICS[topic], 5))))
+    return videos
+
+
+def assign(model, videos):
+    return model.assign([key for key, _ in videos], [text for _, text in videos])
+
+
+def test_model_is_written_once_per_save_and_stays_small(tmp_path):
+    path = tmp_path / 'niche_model.pkl'
+    model = NicheModel(path=str(path))
+
+    assign(model, topic_videos(40))
+    assert not path.exists()  # nothing is written until the session saves
+
+    model.save()
+    assert 0 < os.path.getsize(path) < 1024 * 1024
+
+    modified = os.path.getmtime(path)
+    model.save()  # unchanged since the last save
+    assert os.path.getmtime(path) == modified
+
+
+def test_saved_model_keeps_assignments(tmp_path):
+    path = str(tmp_path / 'niche_model.pkl')
+    videos = topic_videos(40)
+    model = NicheModel(path=path)
+    labels = assign(model, videos)
+    model.save()
+
+    assert assign(NicheModel(path=path), videos) == labels
+
+
+def test_small_sessions_do_not_seed_the_model(tmp_path):
+    model = NicheModel(path=str(tmp_path / 'niche_model.pkl'))
+
+    assert assign(model, topic_videos(model.min_seed - 1)) is None
+    assert not model.fitted
+
+
+def test_seed_with_two_topics_gets_two_niches(tmp_path):
+    model = NicheModel(path=str(tmp_path / 'niche_model.pkl'))
+    videos = topic_videos(40)
+
+    labels = assign(model, videos)
+
+    assert model.n_clusters == 2
+    by_topic = {}
+    for (key, _), label in zip(videos, labels):
+        by_topic.setdefault(key.split('-')[0], set()).add(label)
+    assert all(len(topic_labels) == 1 for topic_labels in by_topic.values())
+    assert by_topic['space'] != by_topic['cooking']
+
+
+def test_niche_ids_are_stable_as_new_videos_arrive(tmp_path):
+    model = NicheModel(path=str(tmp_path / 'niche_model.pkl'))
+    seed = topic_videos(40)
+    seed_labels = dict(zip((key for key, _ in seed), assign(model, seed)))
+    space_niche = seed_labels['space-1-1']
+
+    # A lopsided later session must not move the sparse niche elsewhere
+    later = [(key, text) for key, text in topic_videos(200, seed=2) if key.startswith('cooking')]
+    assert set(assign(model, later)) == {1 - space_niche}
+    assert assign(model, [('space-3-0', 'galaxy rocket orbit planet comet')]) == [space_niche]
@@ -0,0 +1,85 @@
+import pytest
+
+from config import Config
+from quota import QuotaBudget, QuotaExceededError, QuotaLedger, quota_cost
+
+
+def test_charge_within_budget_is_recorded():
+    budget = QuotaBudget(session_limit=250)
+    budget.charge('search')
+    budget.charge('videos')
+
+    assert budget.used == quota_cost('search') + quota_cost('videos')
+    assert budget.calls == {'search': 1, 'videos': 1}
+
+
+def test_headroom_must_remain_after_the_charge():
+    cost = quota_cost('search')
+    budget = QuotaBudget(session_limit=cost + 10)
+
+    budget.charge('search', headroom=10)  # exactly the headroom left over
+    assert budget.used == cost
+
+    with pytest.raises(QuotaExceededError):
+        budget.charge('videos', headroom=10)
+    assert budget.used == cost  # refused calls are not charged
+    assert budget.calls == {'search': 1}
+    assert budget.refusals('videos') == 1 and budget.refusals('search') == 0
+
+
+def test_headroom_still_left_for_the_calls_it_protects():
+    budget = QuotaBudget(session_limit=quota_cost('search') + 2 * quota_cost('videos'))
+    budget.charge('search', headroom=2 * quota_cost('videos'))
+
+    with pytest.raises(QuotaExceededError):
+        budget.charge('search', headroom=2 * quota_cost('videos'))
+    budget.charge('videos')
+    budget.charge('videos')
+    assert budget.remaining()['session_remaining'] == 0
+
+
+def test_daily_ledger_enforces_headroom_across_sessions(tmp_path):
+    ledger = QuotaLedger(path=str(tmp_path / 'quota.db'), daily_limit=quota_cost('search') + 5)
+    QuotaBudget(session_limit=Config.API_SESSION_QUOTA, ledger=ledger).charge('search')
+
+    other_session = QuotaBudget(session_limit=Config.API_SESSION_QUOTA, ledger=ledger)
+    with pytest.raises(QuotaExceededError):
+        other_session.charge('videos', headroom=5)
+    assert other_session.used == 0
+    other_session.charge('videos')
+    assert ledger.used_today() == quota_cost('search') + quota_cost('videos')
+
+
+class FakeSearchClient:
+    """Answers every search with a full page and another page to follow"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_json(self, url, params=None, **kwargs):
+        endpoint = url.rsplit('/', 1)[-1]
+        self.calls.append(endpoint)
+        items = [{'id': {'videoId': f'v{len(self.calls)}-{i}'},
+                  'snippet': {'title': 't', 'channelId': 'UCx', 'channelTitle': 'c',
+                              'publishedAt': '2026-01-01T00:00:00Z', 'thumbnails': {}}}
+                 for i in range(params['maxResults'])]
+        return {'items': items, 'nextPageToken': 'more'}
+
+
+def test_searches_leave_the_lookup_share_of_the_session_budget(tmp_path, monkeypatch):
+    pytest.importorskip('requests')
+    from concurrency import RateLimiter
+    from response_cache import ResponseCache
+    from youtube_analyzer import YouTubeAnalyzer
+
+    monkeypatch.setattr(Config, 'API_SEARCH_QUOTA_SHARE', 0.6)
+    client = FakeSearchClient()
+    analyzer = YouTubeAnalyzer(api_key='test-key', http_client=client, rate_limiter=RateLimiter(0),
+                               cache=ResponseCache(path=str(tmp_path / 'responses.db'), ttls={'search': 0}),
+                               quota=QuotaBudget(session_limit=1000), base_url='http://127.0.0.1:8765')
+
+    analyzer.search_many([f'query {i}' for i in range(5)], max_results=200)
+
+    assert analyzer.quota.used <= 600
+    assert analyzer.quota.used > 600 - quota_cost('search')
+    assert analyzer.quota.remaining()['session_remaining'] >= 400
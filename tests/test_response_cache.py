@@ -0,0 +1,51 @@
+from response_cache import ResponseCache
+
+
+def test_key_ignores_the_api_key():
+    assert (ResponseCache.make_key('videos', {'part': 'statistics', 'id': 'a', 'key': 'secret-1'}) ==
+            ResponseCache.make_key('videos', {'part': 'statistics', 'id': 'a', 'key': 'secret-2'}))
+    assert 'secret' not in ResponseCache.make_key('videos', {'id': 'a', 'key': 'secret-1'})
+
+
+def test_key_ignores_parameter_and_id_order():
+    assert (ResponseCache.make_key('videos', {'part': 'statistics', 'id': 'b,a,c'}) ==
+            ResponseCache.make_key('videos', {'id': 'a,b,c', 'part': 'statistics'}))
+
+
+def test_key_keeps_the_order_of_other_lists():
+    assert (ResponseCache.make_key('videos', {'part': 'snippet,statistics', 'id': 'a'}) !=
+            ResponseCache.make_key('videos', {'part': 'statistics,snippet', 'id': 'a'}))
+
+
+def test_key_normalizes_value_types():
+    assert (ResponseCache.make_key('search', {'q': 'ai', 'maxResults': 50}) ==
+            ResponseCache.make_key('search', {'q': 'ai', 'maxResults': '50'}))
+
+
+def test_key_separates_endpoints_and_values():
+    params = {'id': 'a'}
+    assert ResponseCache.make_key('videos', params) != ResponseCache.make_key('channels', params)
+    assert ResponseCache.make_key('videos', {'id': 'a'}) != ResponseCache.make_key('videos', {'id': 'a,b'})
+
+
+def test_normalized_requests_share_an_entry(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / 'responses.db'), ttls={'videos': 60})
+    cache.set('videos', {'part': 'statistics', 'id': 'b,a', 'key': 'secret-1'}, {'items': [1, 2]})
+
+    assert cache.get('videos', {'id': 'a,b', 'part': 'statistics', 'key': 'secret-2'}) == {'items': [1, 2]}
+
+
+def test_endpoints_without_a_ttl_are_not_stored(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / 'responses.db'), ttls={'videos': 60})
+    cache.set('search', {'q': 'ai'}, {'items': []})
+
+    assert cache.get('search', {'q': 'ai'}) is None
+
+
+def test_many_entries_are_read_back_in_request_order(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / 'responses.db'), ttls={'videos': 60})
+    cache.set_many('videos', [({'part': 'statistics', 'id': 'a'}, {'items': ['a']}),
+                              ({'part': 'statistics', 'id': 'c'}, {'items': []})])
+
+    assert cache.get_many('videos', [{'part': 'statistics', 'id': video_id} for video_id in 'abc']) == [
+        {'items': ['a']}, None, {'items': []}]
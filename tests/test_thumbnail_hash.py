@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+cv2 = pytest.importorskip('cv2')
+import numpy as np
+
+from thumbnail_hash import HASH_BITS, PerceptualHashIndex, dhash, dhash_bytes, hamming
+
+
+def flip_bits(phash, count, rng):
+    for bit in rng.sample(range(HASH_BITS), count):
+        phash ^= 1 << bit
+    return phash
+
+
+def brute_force(stored, phash, max_distance):
+    distances = [hamming(phash, candidate) for candidate in stored]
+    best = min(distances, default=None)
+    return best if best is not None and best <= max_distance else None
+
+
+@pytest.mark.parametrize('max_distance', [0, 4, 10])
+def test_find_agrees_with_brute_force(max_distance):
+    rng = random.Random(max_distance)
+    index = PerceptualHashIndex(max_distance=max_distance)
+    stored = {}
+    for n in range(500):
+        phash = rng.getrandbits(HASH_BITS)
+        stored[phash] = (n % 2 == 0, n / 500)
+        index.add(phash, stored[phash])
+
+    queries = [flip_bits(rng.choice(list(stored)), rng.randint(0, max_distance + 3), rng) for _ in range(1000)]
+    queries += [rng.getrandbits(HASH_BITS) for _ in range(200)]
+
+    for query in queries:
+        expected = brute_force(stored, query, max_distance)
+        found = index.find(query)
+        if expected is None:
+            assert found is None
+        else:
+            result, distance = found
+            assert distance == expected
+            assert any(stored[phash] == result for phash in stored if hamming(phash, query) == distance)
+
+
+def test_find_on_an_empty_index():
+    assert PerceptualHashIndex(max_distance=4).find(0) is None
+
+
+def test_rescaled_and_reencoded_thumbnail_hashes_alike():
+    rng = np.random.default_rng(1)
+    image = cv2.resize(rng.integers(0, 255, (9, 16, 3), dtype=np.uint8), (480, 270), interpolation=cv2.INTER_CUBIC)
+    small = cv2.resize(image, (320, 180), interpolation=cv2.INTER_AREA)
+    content = cv2.imencode('.jpg', small, [cv2.IMWRITE_JPEG_QUALITY, 70])[1].tobytes()
+
+    assert hamming(dhash(image), dhash_bytes(content)) <= 4
+    assert dhash_bytes(b'not an image') is None
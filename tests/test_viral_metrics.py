@@ -0,0 +1,79 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip('pandas')
+pytest.importorskip('requests')
+
+from youtube_analyzer import YouTubeAnalyzer
+
+
+def iso_days_ago(days, suffix='Z'):
+    # Half a day off the boundary, so the scalar and batch clocks round to the same day count
+    moment = datetime.now(timezone.utc) - timedelta(days=days, hours=12)
+    return moment.strftime('%Y-%m-%dT%H:%M:%S') + suffix
+
+
+def random_rows(count, seed=7):
+    rng = random.Random(seed)
+    videos, channels = [], []
+    for _ in range(count):
+        views = rng.choice([0, 5, 900, 12000, 75000, 3000000])
+        videos.append({
+            'published_at': iso_days_ago(rng.choice([0, 1, 3, 20, 400]), rng.choice(['Z', '+00:00'])),
+            'view_count': views,
+            'like_count': int(views * rng.choice([0, 0.008, 0.03, 0.2])),
+            'comment_count': rng.randint(0, 50)
+        })
+        channels.append({
+            'created_at': rng.choice([iso_days_ago(rng.choice([2, 45, 120, 300, 2000])), None, '']),
+            'video_count': rng.choice([0, 1, 40]),
+            'view_count': rng.choice([0, 1000, 600000, 9000000])
+        })
+    return videos, channels
+
+
+@pytest.fixture
+def analyzer():
+    return YouTubeAnalyzer(api_key='test-key')
+
+
+def assert_rows_match(batch, videos, channels, analyzer):
+    assert len(batch) == len(videos)
+    for row, video, channel in zip(batch.to_dict('records'), videos, channels):
+        expected = analyzer.calculate_viral_metrics(video, channel)
+        assert row['viral_score'] == expected['viral_score']
+        assert row['channel_age_days'] == expected['channel_age_days']
+        assert row['days_since_published'] == expected['days_since_published']
+        assert row['views_per_day'] == pytest.approx(expected['views_per_day'])
+        assert row['engagement_ratio'] == pytest.approx(expected['engagement_ratio'])
+
+
+def test_batch_metrics_match_the_scalar_version(analyzer):
+    videos, channels = random_rows(300)
+
+    assert_rows_match(analyzer.calculate_viral_metrics_batch(videos, channels), videos, channels, analyzer)
+
+
+def test_unparseable_dates_fall_back_like_the_scalar_version(analyzer):
+    videos, channels = random_rows(4, seed=3)
+    videos[1]['published_at'] = 'not a date'
+    channels[2]['created_at'] = 'yesterday'
+
+    batch = analyzer.calculate_viral_metrics_batch(videos, channels)
+
+    assert_rows_match(batch, videos, channels, analyzer)
+    assert batch.loc[1, 'viral_score'] == 0 and batch.loc[1, 'days_since_published'] == 1
+    # A malformed creation date is an unknown age, not a failed row
+    assert batch.loc[2, 'channel_age_days'] == 365 and batch.loc[2, 'views_per_day'] > 0
+
+
+def test_known_channel_age_only_comes_from_a_parsed_creation_date():
+    from youtube_analyzer import known_channel_age_days
+
+    assert known_channel_age_days({'created_at': iso_days_ago(400)}) == 400
+    assert known_channel_age_days({'created_at': iso_days_ago(3, '+00:00')}) == 3
+    assert known_channel_age_days({'created_at': 'last spring'}) is None
+    assert known_channel_age_days({'created_at': ''}) is None
+    assert known_channel_age_days({}) is None
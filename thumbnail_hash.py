@@ -0,0 +1,109 @@
+import cv2
+import logging
+import threading
+import numpy as np
+from typing import Dict, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+
+
+def dhash(image: np.ndarray) -> int:
+    """
+    64-bit difference hash of a BGR or grayscale image: one bit per horizontally adjacent
+    pair of cells in a 9x8 grayscale thumbnail, set when brightness increases.
+    Survives re-encoding, rescaling and small overlays, so reuploads hash alike.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    cells = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    bits = (cells[:, 1:] > cells[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def dhash_bytes(content: bytes) -> Optional[int]:
+    """dHash of encoded image bytes, decoded at 1/8 scale in grayscale (cheap for JPEGs); None if undecodable"""
+    image = cv2.imdecode(np.frombuffer(content, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if image is None or image.size == 0:
+        return None
+    return dhash(image)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class PerceptualHashIndex:
+    """
+    In-memory map of perceptual hash -> detection result with near-duplicate lookup.
+    Hashes are split into max_distance + 1 bands, so any hash within max_distance of a
+    stored one matches it exactly on at least one band; only those bucket-mates are compared.
+    """
+
+    def __init__(self, max_distance: int = None):
+        self.max_distance = max_distance if max_distance is not None else Config.FACE_PHASH_MAX_DISTANCE
+        band_count = self.max_distance + 1
+        widths = [HASH_BITS // band_count + (1 if n < HASH_BITS % band_count else 0) for n in range(band_count)]
+        self.bands = []  # (shift, mask) per band
+        shift = 0
+        for width in widths:
+            self.bands.append((shift, (1 << width) - 1))
+            shift += width
+        self.buckets = [{} for _ in self.bands]
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def add(self, phash: int, result: Tuple[bool, float]):
+        with self.lock:
+            if phash not in self.results:
+                for buckets, (shift, mask) in zip(self.buckets, self.bands):
+                    buckets.setdefault((phash >> shift) & mask, []).append(phash)
+            self.results[phash] = result
+
+    def find(self, phash: int) -> Optional[Tuple[Tuple[bool, float], int]]:
+        """Closest stored (result, distance) within max_distance, or None"""
+        best = None
+        with self.lock:
+            if phash in self.results:
+                return self.results[phash], 0
+            for buckets, (shift, mask) in zip(self.buckets, self.bands):
+                for candidate in buckets.get((phash >> shift) & mask, ()):
+                    distance = hamming(phash, candidate)
+                    if distance <= self.max_distance and (best is None or distance < best[1]):
+                        best = (self.results[candidate], distance)
+        return best
+
+
+_phash_indexes: Dict[str, PerceptualHashIndex] = {}
+_phash_indexes_lock = threading.Lock()
+
+
+def get_phash_index(engine: str, cache=None) -> PerceptualHashIndex:
+    """
+    Return the process-wide hash index for a detector engine signature, loaded from the
+    persistent face result cache the first time it is used
+    """
+    index = _phash_indexes.get(engine)
+    if index is None:
+        with _phash_indexes_lock:
+            index = _phash_indexes.get(engine)
+            if index is None:
+                index = PerceptualHashIndex()
+                if cache is not None:
+                    try:
+                        for phash, result in cache.get_phashes(engine).items():
+                            index.add(phash, result)
+                    except Exception as e:
+                        logger.error(f"Error loading perceptual hash index: {str(e)}")
+                _phash_indexes[engine] = index
+    return index
+
+
+def clear_phash_indexes():
+    """Drop every in-memory index (the persistent entries are cleared with the face cache)"""
+    with _phash_indexes_lock:
+        _phash_indexes.clear()
@@ -1,42 +1,185 @@
 import os
-import requests
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import json
-from config import Config
+from config import Config, api_namespace
+from http_client import HTTPClient, get_http_client
+from concurrency import RateLimiter, get_api_rate_limiter, map_concurrently
+from response_cache import ResponseCache, get_response_cache
+from quota import QuotaBudget, QuotaExceededError, get_quota_ledger, quota_cost
 
 logger = logging.getLogger(__name__)
 
+
+def parse_api_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Datetime of an ISO 8601 API timestamp, or None if it is missing or malformed"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        logger.warning(f"Ignoring malformed timestamp {value!r}")
+        return None
+
+
+def known_channel_age_days(channel_data: Dict) -> Optional[int]:
+    """Whole days since the channel was created, or None if its creation date is missing or malformed"""
+    channel_created = parse_api_datetime(channel_data.get('created_at'))
+    if channel_created is None:
+        return None
+    return (datetime.now(channel_created.tzinfo) - channel_created).days
+
+
 class YouTubeAnalyzer:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, http_client: HTTPClient = None,
+                 rate_limiter: RateLimiter = None, max_workers: int = None,
+                 cache: ResponseCache = None, use_cache: bool = True, quota: QuotaBudget = None,
+                 base_url: str = None):
         self.api_key = api_key or Config.YOUTUBE_API_KEY
-        self.base_url = "https://www.googleapis.com/youtube/v3"
+        self.base_url = (base_url or Config.YOUTUBE_API_BASE_URL).rstrip('/')
+        self.namespace = api_namespace(self.base_url)  # '' for the real API
+        self.http = http_client or get_http_client()
+        self.rate_limiter = rate_limiter or get_api_rate_limiter()
+        self.max_workers = max_workers or Config.API_MAX_WORKERS
+        
+        # Cache reads can be bypassed per session; fresh responses are still written back
+        self.cache = cache or get_response_cache()
+        self.use_cache = use_cache
+        self.cache_stats = {'hits': 0, 'misses': 0}
+        self._stats_lock = threading.Lock()
+        
+        # Only the real API spends the daily quota; other hosts are held to the session budget alone
+        self.quota = quota or QuotaBudget(ledger=None if self.namespace else get_quota_ledger())
+    
+    def _api_get(self, endpoint: str, params: Dict, quota_headroom: int = 0) -> Dict:
+        """
+        Call a YouTube Data API endpoint, serving from the response cache when possible.
+        Network calls are charged to the quota budget and scheduled cheapest-first.
+        """
+        if self.cache and self.use_cache:
+            cached = self.cache.get(endpoint, params, self.namespace)
+            with self._stats_lock:
+                self.cache_stats['hits' if cached is not None else 'misses'] += 1
+            if cached is not None:
+                return cached
+        
+        self.quota.charge(endpoint, headroom=quota_headroom)
+        self.rate_limiter.acquire(priority=quota_cost(endpoint))
+        data = self.http.get_json(f"{self.base_url}/{endpoint}", params={**params, 'key': self.api_key})
+        
+        if self.cache:
+            self.cache.set(endpoint, params, data, self.namespace)
+        return data
+    
+    def _api_get_by_id(self, endpoint: str, params: Dict) -> Dict:
+        """
+        Call an endpoint that takes an 'id' list, caching each ID's item on its own, so a
+        request for any mix of IDs reuses what earlier requests fetched. Only uncached IDs are
+        requested; an ID the API returns nothing for is cached as having no item.
+        Returns: {'items': [...]} for the IDs that have one
+        """
+        ids = params['id'].split(',')
+        items = []
+        missing = ids
+        if self.cache and self.use_cache:
+            cached = self.cache.get_many(endpoint, [{**params, 'id': item_id} for item_id in ids], self.namespace)
+            missing = [item_id for item_id, body in zip(ids, cached) if body is None]
+            items = [item for body in cached if body is not None for item in body.get('items', [])]
+            with self._stats_lock:
+                self.cache_stats['misses' if missing else 'hits'] += 1
+        if not missing:
+            return {'items': items}
+        
+        self.quota.charge(endpoint)
+        self.rate_limiter.acquire(priority=quota_cost(endpoint))
+        data = self.http.get_json(f"{self.base_url}/{endpoint}",
+                                  params={**params, 'id': ','.join(missing), 'key': self.api_key})
+        fetched = {item['id']: item for item in data.get('items', [])}
+        
+        if self.cache:
+            self.cache.set_many(endpoint, [({**params, 'id': item_id},
+                                            {'items': [fetched[item_id]] if item_id in fetched else []})
+                                           for item_id in missing], self.namespace)
+        return {'items': items + list(fetched.values())}
+    
+    def get_cache_stats(self) -> Dict:
+        """Return this session's response cache hit/miss counters"""
+        with self._stats_lock:
+            hits = self.cache_stats['hits']
+            misses = self.cache_stats['misses']
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+            'enabled': bool(self.cache and self.use_cache)
+        }
         
     def search_shorts(self, query: str, days_back: int = 7, max_results: int = 50) -> List[Dict]:
         """Search for YouTube Shorts based on query and date range"""
         try:
-            # Calculate date range
-            published_after = (datetime.utcnow() - timedelta(days=days_back)).isoformat() + 'Z'
+            videos = [video for page in self.iter_search_pages(query, days_back, max_results) for video in page]
             
-            # Search parameters
-            params = {
-                'part': 'snippet',
-                'q': query,
-                'type': 'video',
-                'videoDuration': 'short',  # Videos under 4 minutes
-                'publishedAfter': published_after,
-                'order': 'viewCount',
-                'maxResults': max_results,
-                'key': self.api_key
-            }
+            logger.info(f"Found {len(videos)} videos for query: {query}")
+            return videos
+            
+        except Exception as e:
+            logger.error(f"Error searching videos for query '{query}': {str(e)}")
+            return []
+    
+    def iter_search_pages(self, query: str, days_back: int = 7, max_results: int = 50,
+                          max_pages: int = None) -> Iterator[List[Dict]]:
+        """
+        Yield search results page by page, following nextPageToken until max_results
+        videos or max_pages pages have been fetched. The next page is only requested
+        once the caller asks for it.
+        """
+        max_pages = max_pages or Config.SEARCH_MAX_PAGES
+        
+        # Calculate date range
+        # Truncated to the hour so repeated searches share a response cache key
+        published_after = (datetime.utcnow() - timedelta(days=days_back)).replace(
+            minute=0, second=0, microsecond=0).isoformat() + 'Z'
+        
+        # Search parameters
+        params = {
+            'part': 'snippet',
+            'q': query,
+            'type': 'video',
+            'videoDuration': 'short',  # Videos under 4 minutes
+            'publishedAfter': published_after,
+            'order': 'viewCount'
+        }
+        
+        # Keep budget for the lookups the results will create: at least one video and channel call,
+        # and the share of the session budget searches may not spend
+        headroom = max(quota_cost('videos') + quota_cost('channels'),
+                       int(self.quota.session_limit * (1 - Config.API_SEARCH_QUOTA_SHARE)))
+        
+        fetched = 0
+        page_token = None
+        
+        for page_number in range(max_pages):
+            if fetched >= max_results:
+                break
             
-            response = requests.get(f"{self.base_url}/search", params=params)
-            response.raise_for_status()
+            page_params = {**params, 'maxResults': min(50, max_results - fetched)}  # API caps pages at 50
+            if page_token:
+                page_params['pageToken'] = page_token
             
-            data = response.json()
-            videos = []
+            try:
+                data = self._api_get('search', page_params, quota_headroom=headroom)
+            except QuotaExceededError as e:
+                logger.warning(f"Stopping search for query '{query}' at page {page_number + 1}: {str(e)}")
+                return
+            except Exception as e:
+                logger.error(f"Error searching videos for query '{query}' page {page_number + 1}: {str(e)}")
+                return
             
+            videos = []
             for item in data.get('items', []):
                 video_data = {
                     'video_id': item['id']['videoId'],
@@ -45,120 +188,324 @@ class YouTubeAnalyzer:
                     'channel_title': item['snippet']['channelTitle'],
                     'published_at': item['snippet']['publishedAt'],
                     'thumbnail_url': item['snippet']['thumbnails'].get('high', {}).get('url', ''),
+                    'thumbnail_medium_url': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
                     'description': item['snippet'].get('description', '')
                 }
                 videos.append(video_data)
             
-            logger.info(f"Found {len(videos)} videos for query: {query}")
-            return videos
+            fetched += len(videos)
+            yield videos
             
-        except Exception as e:
-            logger.error(f"Error searching videos for query '{query}': {str(e)}")
-            return []
+            page_token = data.get('nextPageToken')
+            if not page_token or not videos:
+                break
+    
+    def search_many(self, queries: List[str], days_back: int = 7, max_results: int = 50,
+                    on_progress: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+        """Run several searches concurrently; results keep the order of the queries"""
+        results = map_concurrently(
+            lambda query: self.search_shorts(query, days_back, max_results),
+            queries,
+            max_workers=self.max_workers,
+            on_progress=on_progress
+        )
+        return [video for videos in results for video in videos]
     
-    def get_video_details(self, video_ids: List[str]) -> Dict[str, Dict]:
+    def search_with_details(self, queries: List[str], days_back: int = 7, max_results: int = 50,
+                            on_progress: Optional[Callable[[int, int], None]] = None,
+                            video_filter: Optional[Callable[[Dict], bool]] = None) -> Tuple[List[Dict], Dict[str, Dict]]:
+        """
+        Search all queries concurrently, streaming each results page straight into a
+        video detail lookup so details for page 1 are fetched while page 2 is in flight.
+        Videos rejected by video_filter are dropped before any detail lookup; the filter
+        is called from one thread at a time.
+        Returns (all_videos, video_details).
+        """
+        seen_ids = set()
+        seen_lock = threading.Lock()
+        detail_futures = []
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as detail_executor:
+            def run_query(query):
+                videos = []
+                for page in self.iter_search_pages(query, days_back, max_results):
+                    with seen_lock:
+                        if video_filter:
+                            page = [v for v in page if video_filter(v)]
+                        new_ids = [video_id for video_id in dict.fromkeys(v['video_id'] for v in page)
+                                   if video_id not in seen_ids]
+                        seen_ids.update(new_ids)
+                        if new_ids:
+                            detail_futures.append(detail_executor.submit(self._fetch_video_chunk, new_ids))
+                    videos.extend(page)
+                logger.info(f"Found {len(videos)} videos for query: {query}")
+                return videos
+            
+            results = map_concurrently(run_query, queries, max_workers=self.max_workers, on_progress=on_progress)
+            
+            video_details = {}
+            for future in detail_futures:
+                video_details.update(future.result())
+        
+        all_videos = [video for videos in results for video in videos]
+        logger.info(f"Retrieved details for {len(video_details)} valid shorts")
+        return all_videos, video_details
+    
+    def get_video_details(self, video_ids: List[str],
+                          on_progress: Optional[Callable[[int, int], None]] = None,
+                          shorts_only: bool = True) -> Dict[str, Dict]:
         """Get detailed statistics for videos"""
+        # Split into chunks of 50 (API limit) and fetch them concurrently
+        chunks = [video_ids[i:i+50] for i in range(0, len(video_ids), 50)]
+        video_details = {}
+        
+        for chunk_details in map_concurrently(lambda chunk: self._fetch_video_chunk(chunk, shorts_only), chunks,
+                                              max_workers=self.max_workers, on_progress=on_progress):
+            video_details.update(chunk_details)
+        
+        logger.info(f"Retrieved details for {len(video_details)} {'valid shorts' if shorts_only else 'videos'}")
+        return video_details
+    
+    def _fetch_video_chunk(self, chunk: List[str], shorts_only: bool = True) -> Dict[str, Dict]:
+        """Fetch one chunk of up to 50 videos; a failed chunk is skipped, not fatal"""
+        video_details = {}
+        
         try:
-            # Split into chunks of 50 (API limit)
-            video_details = {}
+            params = {
+                'part': 'statistics,contentDetails,snippet',
+                'id': ','.join(chunk)
+            }
             
-            for i in range(0, len(video_ids), 50):
-                chunk = video_ids[i:i+50]
-                
-                params = {
-                    'part': 'statistics,contentDetails,snippet',
-                    'id': ','.join(chunk),
-                    'key': self.api_key
-                }
-                
-                response = requests.get(f"{self.base_url}/videos", params=params)
-                response.raise_for_status()
+            data = self._api_get_by_id('videos', params)
+            
+            for item in data.get('items', []):
+                video_id = item['id']
                 
-                data = response.json()
+                # Parse duration
+                duration_str = item['contentDetails']['duration']
+                duration_seconds = self._parse_duration(duration_str)
                 
-                for item in data.get('items', []):
-                    video_id = item['id']
-                    
-                    # Parse duration
-                    duration_str = item['contentDetails']['duration']
-                    duration_seconds = self._parse_duration(duration_str)
-                    
-                    # Only include shorts (< 60 seconds)
-                    if duration_seconds <= 60:
-                        stats = item['statistics']
-                        video_details[video_id] = {
-                            'duration_seconds': duration_seconds,
-                            'view_count': int(stats.get('viewCount', 0)),
-                            'like_count': int(stats.get('likeCount', 0)),
-                            'comment_count': int(stats.get('commentCount', 0)),
-                            'published_at': item['snippet']['publishedAt']
-                        }
-            
-            logger.info(f"Retrieved details for {len(video_details)} valid shorts")
-            return video_details
+                # Only include shorts (< 60 seconds)
+                if duration_seconds <= 60 or not shorts_only:
+                    stats = item['statistics']
+                    video_details[video_id] = {
+                        'duration_seconds': duration_seconds,
+                        'view_count': int(stats.get('viewCount', 0)),
+                        'like_count': int(stats.get('likeCount', 0)),
+                        'comment_count': int(stats.get('commentCount', 0)),
+                        'published_at': item['snippet']['publishedAt']
+                    }
             
+        except QuotaExceededError as e:
+            logger.warning(f"Skipping video details for chunk starting at {chunk[0]}: {str(e)}")
         except Exception as e:
-            logger.error(f"Error getting video details: {str(e)}")
-            return {}
+            logger.error(f"Error getting video details for chunk starting at {chunk[0]}: {str(e)}")
+        
+        return video_details
     
-    def get_channel_details(self, channel_ids: List[str]) -> Dict[str, Dict]:
+    def get_channel_details(self, channel_ids: List[str],
+                            on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Dict]:
         """Get channel statistics and details"""
+        # Split into chunks of 50 (API limit) and fetch them concurrently
+        chunks = [channel_ids[i:i+50] for i in range(0, len(channel_ids), 50)]
+        channel_details = {}
+        
+        for chunk_details in map_concurrently(self._fetch_channel_chunk, chunks,
+                                              max_workers=self.max_workers, on_progress=on_progress):
+            channel_details.update(chunk_details)
+        
+        logger.info(f"Retrieved details for {len(channel_details)} channels")
+        return channel_details
+    
+    def _fetch_channel_chunk(self, chunk: List[str]) -> Dict[str, Dict]:
+        """Fetch one chunk of up to 50 channels; a failed chunk is skipped, not fatal"""
+        channel_details = {}
+        
         try:
-            channel_details = {}
+            params = {
+                'part': 'statistics,snippet',
+                'id': ','.join(chunk)
+            }
             
-            for i in range(0, len(channel_ids), 50):
-                chunk = channel_ids[i:i+50]
+            data = self._api_get_by_id('channels', params)
+            
+            for item in data.get('items', []):
+                channel_id = item['id']
+                stats = item['statistics']
+                snippet = item['snippet']
                 
-                params = {
-                    'part': 'statistics,snippet',
-                    'id': ','.join(chunk),
-                    'key': self.api_key
+                channel_details[channel_id] = {
+                    'title': snippet['title'],
+                    'subscriber_count': int(stats.get('subscriberCount', 0)),
+                    'video_count': int(stats.get('videoCount', 0)),
+                    'view_count': int(stats.get('viewCount', 0)),
+                    'created_at': snippet.get('publishedAt'),
+                    'thumbnail_url': snippet['thumbnails'].get('default', {}).get('url', '')
                 }
+            
+        except QuotaExceededError as e:
+            logger.warning(f"Skipping channel details for chunk starting at {chunk[0]}: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error getting channel details for chunk starting at {chunk[0]}: {str(e)}")
+        
+        return channel_details
+    
+    def get_channel_uploads(self, channel_ids: List[str], max_results: int = None,
+                            on_progress: Optional[Callable[[int, int], None]] = None,
+                            published_after: datetime = None) -> Dict[str, List[Dict]]:
+        """
+        Most recent uploads of each channel, newest first, fetched concurrently.
+        With published_after (UTC), paging stops at the first older upload, so a channel with
+        nothing newer maps to an empty list. Channels whose playlist could not be read are left out.
+        """
+        max_results = max_results or Config.CHANNEL_FACE_SAMPLE
+        results = map_concurrently(lambda channel_id: self._fetch_channel_uploads(channel_id, max_results, published_after),
+                                   channel_ids, max_workers=self.max_workers, on_progress=on_progress)
+        return {channel_id: videos for channel_id, videos in zip(channel_ids, results) if videos is not None}
+    
+    def _fetch_channel_uploads(self, channel_id: str, max_results: int,
+                               published_after: datetime = None) -> Optional[List[Dict]]:
+        """Read a channel's uploads playlist; None if it could not be read in full"""
+        cutoff = published_after.strftime('%Y-%m-%dT%H:%M:%SZ') if published_after else None
+        # The uploads playlist ID is the channel ID with UC swapped for UU, so no channels.list call is needed
+        params = {
+            'part': 'snippet,contentDetails',
+            'playlistId': 'UU' + channel_id[2:]
+        }
+        videos = []
+        page_token = None
+        
+        try:
+            while len(videos) < max_results:
+                page_params = {**params, 'maxResults': min(50, max_results - len(videos))}
+                if page_token:
+                    page_params['pageToken'] = page_token
                 
-                response = requests.get(f"{self.base_url}/channels", params=params)
-                response.raise_for_status()
-                
-                data = response.json()
+                data = self._api_get('playlistItems', page_params)
                 
+                reached_cutoff = False
                 for item in data.get('items', []):
-                    channel_id = item['id']
-                    stats = item['statistics']
                     snippet = item['snippet']
-                    
-                    channel_details[channel_id] = {
-                        'title': snippet['title'],
-                        'subscriber_count': int(stats.get('subscriberCount', 0)),
-                        'video_count': int(stats.get('videoCount', 0)),
-                        'view_count': int(stats.get('viewCount', 0)),
-                        'created_at': snippet.get('publishedAt'),
-                        'thumbnail_url': snippet['thumbnails'].get('default', {}).get('url', '')
-                    }
-            
-            logger.info(f"Retrieved details for {len(channel_details)} channels")
-            return channel_details
+                    thumbnails = snippet.get('thumbnails', {})
+                    published_at = item['contentDetails'].get('videoPublishedAt', snippet.get('publishedAt'))
+                    # ISO 8601 UTC timestamps compare correctly as strings
+                    if cutoff and published_at and published_at[:19] < cutoff[:19]:
+                        reached_cutoff = True
+                        break
+                    videos.append({
+                        'video_id': item['contentDetails']['videoId'],
+                        'title': snippet.get('title', ''),
+                        'channel_id': channel_id,
+                        'published_at': published_at,
+                        'thumbnail_url': thumbnails.get('high', {}).get('url', ''),
+                        'thumbnail_medium_url': thumbnails.get('medium', {}).get('url', '')
+                    })
+                
+                page_token = data.get('nextPageToken')
+                if reached_cutoff or not page_token or not data.get('items'):
+                    break
             
+        except QuotaExceededError as e:
+            logger.warning(f"Skipping uploads of channel {channel_id}: {str(e)}")
+            return None
         except Exception as e:
-            logger.error(f"Error getting channel details: {str(e)}")
-            return {}
+            logger.error(f"Error getting uploads of channel {channel_id}: {str(e)}")
+            return None
+        
+        return videos[:max_results]
+    
+    def get_channel_activity(self, channel_ids: List[str], channel_details: Dict[str, Dict],
+                             known_videos: Dict[str, Dict] = None,
+                             on_progress: Optional[Callable[[int, int], None]] = None
+                             ) -> Tuple[Dict[str, Dict], Dict[str, List[Dict]]]:
+        """
+        Upload cadence and trailing view totals of each channel over the last
+        CHANNEL_ACTIVITY_WINDOW_DAYS, from its uploads playlist. Upload statistics come from
+        50-ID videos.list chunks; videos already in known_videos are not fetched again.
+        A channel with no uploads in the window gets zero activity; a channel whose uploads, or
+        their statistics once the quota ran out, could not be read gets none.
+        Returns: ({channel_id: activity}, {channel_id: uploads}) for channels whose uploads could be read
+        """
+        known_videos = known_videos or {}
+        now = datetime.utcnow()
+        window_start = now - timedelta(days=Config.CHANNEL_ACTIVITY_WINDOW_DAYS)
+        
+        uploads = self.get_channel_uploads(channel_ids, max_results=Config.CHANNEL_ACTIVITY_MAX_UPLOADS,
+                                           on_progress=on_progress, published_after=window_start)
+        
+        missing = list({video['video_id'] for videos in uploads.values() for video in videos} - set(known_videos))
+        refused = self.quota.refusals('videos')
+        video_stats = {**known_videos, **self.get_video_details(missing, shorts_only=False)}
+        # Deleted or private uploads have no statistics either; only a refused lookup makes them unknown
+        stats_refused = self.quota.refusals('videos') > refused
+        
+        activity = {
+            channel_id: self.calculate_channel_activity(videos, video_stats, channel_details.get(channel_id, {}), now)
+            for channel_id, videos in uploads.items()
+            if not (stats_refused and any(video['video_id'] not in video_stats for video in videos))
+        }
+        return activity, uploads
+    
+    def calculate_channel_activity(self, uploads: List[Dict], video_stats: Dict[str, Dict],
+                                   channel_data: Dict, now: datetime = None) -> Dict:
+        """
+        Activity of one channel from its recent uploads (newest first).
+        weekly_uploads averages over the window, or over the channel's lifetime when it is younger
+        (at least a week, so a single upload from a day-old channel is not seven a week).
+        A missing or malformed created_at counts as an unknown age, i.e. the full window.
+        """
+        now = now or datetime.utcnow()
+        window_days = Config.CHANNEL_ACTIVITY_WINDOW_DAYS
+        channel_created = parse_api_datetime(channel_data.get('created_at'))
+        if channel_created:
+            window_days = min(window_days, (now - channel_created.replace(tzinfo=None)).days)
+        
+        week_start = (now - timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%S')
+        monthly_views = 0
+        views_7days = 0
+        for video in uploads:
+            views = video_stats.get(video['video_id'], {}).get('view_count', 0)
+            monthly_views += views
+            if (video['published_at'] or '')[:19] >= week_start:
+                views_7days += views
+        
+        return {
+            'weekly_uploads': len(uploads) * 7 / max(7, window_days),
+            'monthly_views': monthly_views,
+            'views_7days': views_7days,
+            'uploads_counted': len(uploads)
+        }
+    
+    def _video_metrics(self, video_data: Dict) -> Dict:
+        # Parse published date
+        published_at = datetime.fromisoformat(video_data['published_at'].replace('Z', '+00:00'))
+        days_since_published = (datetime.now(published_at.tzinfo) - published_at).days
+        days_since_published = max(1, days_since_published)  # Avoid division by zero
+        
+        # Calculate metrics
+        views_per_day = video_data['view_count'] / days_since_published
+        engagement_ratio = (video_data['like_count'] + video_data['comment_count']) / max(video_data['view_count'], 1)
+        
+        return {
+            'views_per_day': views_per_day,
+            'engagement_ratio': engagement_ratio,
+            'days_since_published': days_since_published
+        }
     
     def calculate_viral_metrics(self, video_data: Dict, channel_data: Dict) -> Dict:
         """Calculate viral score and metrics for a video"""
         try:
-            # Parse published date
-            published_at = datetime.fromisoformat(video_data['published_at'].replace('Z', '+00:00'))
-            days_since_published = (datetime.now(published_at.tzinfo) - published_at).days
-            days_since_published = max(1, days_since_published)  # Avoid division by zero
-            
-            # Calculate metrics
-            views_per_day = video_data['view_count'] / days_since_published
-            engagement_ratio = (video_data['like_count'] + video_data['comment_count']) / max(video_data['view_count'], 1)
+            video_metrics = self._video_metrics(video_data)
+            views_per_day = video_metrics['views_per_day']
+            engagement_ratio = video_metrics['engagement_ratio']
+            days_since_published = video_metrics['days_since_published']
             
             # Channel age factor
-            if channel_data.get('created_at'):
-                channel_created = datetime.fromisoformat(channel_data['created_at'].replace('Z', '+00:00'))
+            channel_created = parse_api_datetime(channel_data.get('created_at'))
+            if channel_created:
                 channel_age_days = (datetime.now(channel_created.tzinfo) - channel_created).days
             else:
-                channel_age_days = 365  # Default if unknown
+                channel_age_days = 365  # Default if unknown or malformed
             
             # Calculate viral score (0-100)
             viral_score = 0
@@ -221,6 +568,93 @@ class YouTubeAnalyzer:
                 'days_since_published': 1
             }
     
+    def calculate_viral_metrics_batch(self, video_stats, channel_stats=None):
+        """
+        Vectorized calculate_viral_metrics for a whole candidate set.
+        video_stats and channel_stats are row-aligned columnar inputs (DataFrames, dicts of
+        columns or lists of stat dicts); channel_stats may be omitted for video-only metrics.
+        Returns a DataFrame with the same columns and values as the scalar version.
+        """
+        # Imported lazily: the lightweight deployment (requirements_simple.txt) ships without pandas
+        import numpy as np
+        import pandas as pd
+        
+        videos = pd.DataFrame(video_stats).reset_index(drop=True)
+        channels = pd.DataFrame(channel_stats).reset_index(drop=True) if channel_stats is not None else pd.DataFrame(index=videos.index)
+        now = pd.Timestamp.now(tz='UTC')
+        
+        def column(frame, name, default):
+            if name in frame:
+                return frame[name]
+            return pd.Series(default, index=frame.index)
+        
+        def parse_dates(values):
+            # Parse each distinct timestamp once; channel dates repeat across a channel's videos
+            # (missing values get code -1, which picks the trailing NaT)
+            codes, uniques = pd.factorize(values)
+            parsed = pd.to_datetime(pd.Series(np.append(np.asarray(uniques, dtype=object), None)), utc=True, errors='coerce', format='ISO8601')
+            if parsed.dt.tz is None:
+                parsed = parsed.dt.tz_localize('UTC')  # all-missing input parses as naive NaT
+            parsed = parsed.take(codes)
+            parsed.index = values.index
+            return parsed
+        
+        # Parse published date
+        published_at = parse_dates(column(videos, 'published_at', None))
+        days_since_published = (now - published_at).dt.days.clip(lower=1)  # Avoid division by zero
+        
+        # Calculate metrics
+        view_count = column(videos, 'view_count', 0).astype('float64')
+        views_per_day = view_count / days_since_published
+        engagement_ratio = (column(videos, 'like_count', 0) + column(videos, 'comment_count', 0)) / view_count.clip(lower=1)
+        
+        # Channel age factor; missing or malformed creation dates count as unknown
+        created_raw = column(channels, 'created_at', None)
+        has_created = created_raw.notna() & created_raw.astype(bool)
+        created_at = parse_dates(created_raw.where(has_created))
+        channel_age_days = (now - created_at).dt.days.where(created_at.notna(), 365)
+        
+        # Rows the scalar version would reject with an exception fall back to its defaults
+        failed = published_at.isna()
+        
+        # Views per day component (40% of score)
+        viral_score = np.select(
+            [views_per_day >= 100000, views_per_day >= 50000, views_per_day >= 10000, views_per_day >= 1000],
+            [40, 30, 20, 10], 0)
+        
+        # Engagement component (30% of score)
+        viral_score += np.select(
+            [engagement_ratio >= 0.1, engagement_ratio >= 0.05, engagement_ratio >= 0.02, engagement_ratio >= 0.01],
+            [30, 20, 15, 10], 0)
+        
+        # Channel newness component (20% of score)
+        viral_score += np.select(
+            [channel_age_days <= 30, channel_age_days <= 90, channel_age_days <= 180, channel_age_days <= 365],
+            [20, 15, 10, 5], 0)
+        
+        # Video performance consistency (10% of score)
+        channel_videos = column(channels, 'video_count', 0).fillna(0)
+        avg_views_per_video = column(channels, 'view_count', 0).fillna(0) / channel_videos.where(channel_videos > 0)
+        viral_score += np.select(
+            [avg_views_per_video >= 100000, avg_views_per_video >= 50000, avg_views_per_video >= 10000],
+            [10, 7, 5], 0)
+        
+        metrics = pd.DataFrame({
+            'viral_score': np.minimum(100, viral_score),
+            'views_per_day': views_per_day,
+            'engagement_ratio': engagement_ratio,
+            'channel_age_days': channel_age_days,
+            'days_since_published': days_since_published
+        }, index=videos.index)
+        
+        if failed.any():
+            logger.error(f"Error calculating viral metrics for {int(failed.sum())} videos: unparseable publish dates")
+            metrics.loc[failed, ['viral_score', 'views_per_day', 'engagement_ratio']] = 0
+            metrics.loc[failed, 'channel_age_days'] = 365
+            metrics.loc[failed, 'days_since_published'] = 1
+        
+        return metrics.astype({'viral_score': 'int64', 'channel_age_days': 'int64', 'days_since_published': 'int64'})
+    
     def _parse_duration(self, duration_str: str) -> int:
         """Parse ISO 8601 duration to seconds"""
         try: